@@ -0,0 +1,5 @@
+from warehouse.forms import ItemSearchForm, PlaceItemSearchForm
+
+
+class PlaceItemFilterForm(PlaceItemSearchForm, ItemSearchForm):
+    """Фильтры стока API: поля форм Поиск партии и Поиск товара вместе"""
@@ -0,0 +1,22 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по первичному ключу
+    Следующая страница выбирается условием WHERE id > <последний id>,
+    без OFFSET: стоимость запроса не растет с номером страницы,
+    а вставки между запросами не сдвигают выдачу
+
+    Направление задается атрибутом представления cursor_ordering ("id" / "-id")
+    Размер страницы: ?limit=, не больше API_MAX_PAGE_SIZE
+    """
+
+    ordering = "id"
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "limit"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_ordering(self, request, queryset, view):
+        return (getattr(view, "cursor_ordering", self.ordering),)
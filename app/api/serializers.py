@@ -0,0 +1,54 @@
+from django.conf import settings
+from rest_framework import serializers
+from warehouse.services import SYNC_EVENT_TYPES
+
+
+class SyncEventSerializer(serializers.Serializer):
+    """Событие офлайн-очереди ТСД (см. warehouse.services.sync_events)"""
+
+    key = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=SYNC_EVENT_TYPES)
+    item_code = serializers.CharField(max_length=100)
+    quantity = serializers.IntegerField(min_value=0)
+    from_address = serializers.CharField(max_length=500, required=False)
+    to_address = serializers.CharField(max_length=500, required=False)
+    address = serializers.CharField(max_length=500, required=False)
+
+    def validate(self, attrs):
+        required = ("from_address", "to_address") if attrs["type"] == "move" else ("address",)
+        missing = {field: "Обязательное поле." for field in required if not attrs.get(field)}
+        if missing:
+            raise serializers.ValidationError(missing)
+        if attrs["type"] == "move" and attrs["quantity"] < 1:
+            raise serializers.ValidationError({"quantity": "Количество должно быть больше 0"})
+        return attrs
+
+
+class SyncBatchSerializer(serializers.Serializer):
+    events = SyncEventSerializer(many=True, allow_empty=False)
+
+    def validate_events(self, events):
+        if len(events) > settings.SYNC_MAX_EVENTS:
+            raise serializers.ValidationError(
+                f"Не более {settings.SYNC_MAX_EVENTS} событий в пакете"
+            )
+        return events
+
+
+class CycleCountEntrySerializer(serializers.Serializer):
+    """Подсчет пары на адресе (см. warehouse.services.record_cycle_counts)"""
+
+    address = serializers.CharField(max_length=500)
+    item_code = serializers.CharField(max_length=100)
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CycleCountBatchSerializer(serializers.Serializer):
+    counts = CycleCountEntrySerializer(many=True, allow_empty=False)
+
+    def validate_counts(self, counts):
+        if len(counts) > settings.CYCLE_COUNT_MAX_ENTRIES:
+            raise serializers.ValidationError(
+                f"Не более {settings.CYCLE_COUNT_MAX_ENTRIES} подсчетов в пакете"
+            )
+        return counts
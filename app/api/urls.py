@@ -0,0 +1,78 @@
+from django.urls import path
+
+from .views import (CycleCountAPIView, CycleCountCancelAPIView,
+                    CycleCountCountsAPIView, CycleCountReconcileAPIView,
+                    CycleCountVariancesAPIView, HistoryListAPIView,
+                    InboundListAPIView, InboundPutawayAPIView,
+                    InventoryAsOfAPIView, ItemListAPIView,
+                    OutboundConsolidationAPIView, OutboundListAPIView,
+                    OutboundPickListAPIView, PickBatchClaimAPIView,
+                    PickBatchReleaseAPIView, PickTaskConfirmAPIView,
+                    PlaceItemChangeFeedAPIView, PlaceItemListAPIView,
+                    PlaceListAPIView, ScanLookupAPIView, SyncBatchAPIView)
+
+app_name = "api"
+
+urlpatterns = [
+    path("place-items/", PlaceItemListAPIView.as_view(), name="place-items"),
+    path(
+        "place-items/changes/",
+        PlaceItemChangeFeedAPIView.as_view(),
+        name="place-item-changes",
+    ),
+    path("place-items/as-of/", InventoryAsOfAPIView.as_view(), name="place-items-as-of"),
+    path("items/", ItemListAPIView.as_view(), name="items"),
+    path("places/", PlaceListAPIView.as_view(), name="places"),
+    path("history/", HistoryListAPIView.as_view(), name="history"),
+    path("inbounds/", InboundListAPIView.as_view(), name="inbounds"),
+    path(
+        "inbounds/<int:pk>/putaway/",
+        InboundPutawayAPIView.as_view(),
+        name="inbound-putaway",
+    ),
+    path("outbounds/", OutboundListAPIView.as_view(), name="outbounds"),
+    path(
+        "outbounds/consolidate/",
+        OutboundConsolidationAPIView.as_view(),
+        name="outbound-consolidate",
+    ),
+    path(
+        "outbounds/<int:pk>/pick-list/",
+        OutboundPickListAPIView.as_view(),
+        name="outbound-pick-list",
+    ),
+    path("pick-batches/claim/", PickBatchClaimAPIView.as_view(), name="pick-batch-claim"),
+    path(
+        "pick-batches/<int:pk>/release/",
+        PickBatchReleaseAPIView.as_view(),
+        name="pick-batch-release",
+    ),
+    path(
+        "pick-tasks/<int:pk>/confirm/",
+        PickTaskConfirmAPIView.as_view(),
+        name="pick-task-confirm",
+    ),
+    path("scan/", ScanLookupAPIView.as_view(), name="scan"),
+    path("sync/", SyncBatchAPIView.as_view(), name="sync"),
+    path("cycle-counts/", CycleCountAPIView.as_view(), name="cycle-counts"),
+    path(
+        "cycle-counts/<int:pk>/counts/",
+        CycleCountCountsAPIView.as_view(),
+        name="cycle-count-counts",
+    ),
+    path(
+        "cycle-counts/<int:pk>/variances/",
+        CycleCountVariancesAPIView.as_view(),
+        name="cycle-count-variances",
+    ),
+    path(
+        "cycle-counts/<int:pk>/reconcile/",
+        CycleCountReconcileAPIView.as_view(),
+        name="cycle-count-reconcile",
+    ),
+    path(
+        "cycle-counts/<int:pk>/cancel/",
+        CycleCountCancelAPIView.as_view(),
+        name="cycle-count-cancel",
+    ),
+]
@@ -0,0 +1,726 @@
+import json
+import logging
+import time
+from datetime import datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from structure.forms import StructureSearchForm
+from warehouse.forms import HistorySearchForm, ItemSearchForm
+from warehouse.models import CycleCount, History, Item, Place, PlaceItem, Zone
+from warehouse.services import (cancel_cycle_count, cycle_count_variances,
+                                filter_history, filter_items, filter_places,
+                                filter_place_items, inventory_as_of,
+                                inventory_as_of_exact, iter_place_item_changes,
+                                lookup_address, lookup_item, normalize_address,
+                                place_item_changes_head, reconcile_cycle_count,
+                                record_cycle_counts, start_cycle_count,
+                                sync_events)
+from wave.forms import InboundSearchForm, OutboundSearchForm
+from wave.models import Inbound, Outbound
+from wave.services import (claim_pick_batch, confirm_pick_task,
+                           consolidate_outbounds, consolidation_groups,
+                           filter_waves, inbound_putaway_plan, pick_list_route,
+                           putaway_inbound, release_pick_batch)
+
+from .forms import PlaceItemFilterForm
+from .pagination import KeysetPagination
+from .serializers import CycleCountBatchSerializer, SyncBatchSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectedListView(ListAPIView):
+    """
+    Базовое представление списка с проекцией полей
+
+    Основная логика:
+    - Валидирует query-параметры формой поиска соответствующей HTML-страницы
+      и применяет те же фильтры (filter_form, apply_filters)
+    - ?fields=a,b,c - в ответ попадают только перечисленные поля.
+      Поля выбираются через values(): из БД читаются только нужные колонки,
+      модели и сериализаторы не создаются
+    - Постраничная выдача курсором по id (KeysetPagination)
+
+    Атрибуты:
+        model          - модель
+        filter_form    - форма валидации фильтров
+        fields_map     - {поле ответа: путь ORM}
+        default_fields - поля ответа без ?fields=
+        cursor_ordering - "id" или "-id"
+    """
+
+    model = None
+    filter_form = None
+    fields_map = {}
+    default_fields = ()
+    cursor_ordering = "id"
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def apply_filters(self, qs, data: dict):
+        return qs
+
+    def filter_queryset(self, queryset):
+        if self.filter_form is None:
+            return queryset
+        form = self.filter_form(self.request.query_params)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        return self.apply_filters(queryset, form.cleaned_data)
+
+    def get_fields(self) -> list[str]:
+        """Поля ответа из ?fields=, id нужен курсору и выбирается всегда"""
+        raw = self.request.query_params.get("fields")
+        if not raw:
+            fields = list(self.default_fields or self.fields_map)
+        else:
+            fields = [name.strip() for name in raw.split(",") if name.strip()]
+            unknown = [name for name in fields if name not in self.fields_map]
+            if unknown:
+                raise ValidationError(
+                    {
+                        "fields": f"Неизвестные поля: {', '.join(unknown)}. "
+                        f"Доступны: {', '.join(self.fields_map)}"
+                    }
+                )
+        return ["id", *[name for name in fields if name != "id"]]
+
+    def project(self, qs, fields: list[str]):
+        """values() по выбранным полям: связанные поля - через F() с JOIN"""
+        own = [name for name in fields if self.fields_map.get(name, name) == name]
+        related = {
+            name: F(self.fields_map[name]) for name in fields if name not in own
+        }
+        return qs.values(*own, **related)
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        qs = self.project(self.filter_queryset(self.get_queryset()), fields)
+        page = self.paginate_queryset(qs)
+        logger.debug(
+            "%s.list(): fields = %s, rows = %s", type(self).__name__, fields, len(page)
+        )
+        return self.get_paginated_response(page)
+
+
+class PlaceItemListAPIView(ProjectedListView):
+    """
+    Сток: партии товаров на местах
+    Фильтры страниц Поиск партии / Поиск товара:
+        stock, zone, place, item_code, status, qty_min, qty_max, weight_min, weight_max
+    """
+
+    model = PlaceItem
+    filter_form = PlaceItemFilterForm
+    fields_map = {
+        "id": "id",
+        "item_id": "item_id",
+        "item_code": "item__item_code",
+        "weight": "item__weight",
+        "place_id": "place_id",
+        "full_address": "full_address",
+        "quantity": "quantity",
+        "status": "status",
+    }
+    default_fields = ("item_code", "full_address", "quantity", "status")
+
+    def apply_filters(self, qs, data: dict):
+        return filter_place_items(qs, data)
+
+
+class ItemListAPIView(ProjectedListView):
+    """
+    Справочник товаров. Фильтры: item_code, weight_min, weight_max,
+    stock, zone, place, status - есть заселение товара с такими параметрами
+    """
+
+    model = Item
+    filter_form = ItemSearchForm
+    fields_map = {
+        "id": "id",
+        "item_code": "item_code",
+        "weight": "weight",
+        "description": "description",
+        "created_at": "created_at",
+    }
+    default_fields = ("item_code", "weight")
+
+    def apply_filters(self, qs, data: dict):
+        return filter_items(qs, data)
+
+
+class PlaceListAPIView(ProjectedListView):
+    """Места хранения. Фильтры страницы Структура: stock, zone, place"""
+
+    model = Place
+    filter_form = StructureSearchForm
+    fields_map = {
+        "id": "id",
+        "title": "title",
+        "zone_id": "zone_id",
+        "zone_title": "zone__title",
+        "stock_id": "zone__stock_id",
+        "stock_title": "zone__stock__title",
+        "description": "description",
+    }
+    default_fields = ("title", "zone_title", "stock_title")
+
+    def apply_filters(self, qs, data: dict):
+        return filter_places(qs, data)
+
+
+class HistoryListAPIView(ProjectedListView):
+    """
+    История перемещений, новые записи первыми
+    Фильтры страницы История: item_code, stock, zone, place, user, date_from, date_to
+    """
+
+    model = History
+    filter_form = HistorySearchForm
+    cursor_ordering = "-id"
+    fields_map = {
+        "id": "id",
+        "date": "date",
+        "item_code": "item_code",
+        "count": "count",
+        "old_address": "old_address",
+        "new_address": "new_address",
+        "username": "user__username",
+    }
+
+    def apply_filters(self, qs, data: dict):
+        return filter_history(qs, data)
+
+
+WAVE_FIELDS = {
+    "id": "id",
+    "stock_id": "stock_id",
+    "stock_title": "stock__title",
+    "status": "status",
+    "planned_date": "planned_date",
+    "actual_date": "actual_date",
+    "description": "description",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+
+class InboundListAPIView(ProjectedListView):
+    """
+    Поставки, новые первыми
+    Фильтры страницы Поиск поставки:
+        stock, status, inbound_number, supplier, planned_date, actual_date
+    """
+
+    model = Inbound
+    filter_form = InboundSearchForm
+    cursor_ordering = "-id"
+    fields_map = {"inbound_number": "inbound_number", "supplier": "supplier", **WAVE_FIELDS}
+    default_fields = ("inbound_number", "supplier", "stock_title", "status", "planned_date")
+
+    def apply_filters(self, qs, data: dict):
+        return filter_waves(qs, "inbound", data)
+
+
+class OutboundListAPIView(ProjectedListView):
+    """
+    Отгрузки, новые первыми
+    Фильтры страницы Поиск отгрузки:
+        stock, status, outbound_number, recipient, planned_date, actual_date
+    """
+
+    model = Outbound
+    filter_form = OutboundSearchForm
+    cursor_ordering = "-id"
+    fields_map = {
+        "outbound_number": "outbound_number",
+        "recipient": "recipient",
+        "packing_list_status": "packing_list_status",
+        **WAVE_FIELDS,
+    }
+    default_fields = ("outbound_number", "recipient", "stock_title", "status", "planned_date")
+
+    def apply_filters(self, qs, data: dict):
+        return filter_waves(qs, "outbound", data)
+
+
+class ScanLookupAPIView(APIView):
+    """
+    Поиск по штрихкоду для ТСД
+
+    Параметры (один из):
+        item    - точный код товара: где лежит товар
+        address - полный адрес Склад/Зона/Место: что лежит на адресе
+        code    - код или адрес, адрес определяется по "/"
+
+    Ответ:
+        {"item": код, "places": [{full_address, quantity, status}]}
+        {"address": адрес, "items": [{item_code, quantity, status}]}
+        404 - товара / места нет
+
+    Только точные совпадения по индексам и кеш адресов процесса,
+    без форм, пагинации и COUNT.
+    Время обработки - в заголовке Server-Timing (app;dur=мс)
+    """
+
+    def initial(self, request, *args, **kwargs):
+        self.started = time.perf_counter()
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        elapsed = (time.perf_counter() - self.started) * 1000
+        response["Server-Timing"] = f"app;dur={elapsed:.2f}"
+        logger.debug(
+            "ScanLookupAPIView: %s %s, %.2f мс",
+            request.query_params.urlencode(),
+            response.status_code,
+            elapsed,
+        )
+        return response
+
+    def get(self, request):
+        params = request.query_params
+        item_code = params.get("item", "").strip()
+        address = params.get("address", "").strip()
+        code = params.get("code", "").strip()
+        if code:
+            if "/" in code:
+                address = code
+            else:
+                item_code = code
+
+        if address:
+            address = normalize_address(address)
+            items = lookup_address(address)
+            if items is None:
+                return Response({"detail": "Место не найдено", "address": address}, status=404)
+            return Response({"address": address, "items": items})
+
+        if item_code:
+            item_code = item_code.upper()
+            places = lookup_item(item_code)
+            if places is None:
+                return Response({"detail": "Товар не найден", "item": item_code}, status=404)
+            return Response({"item": item_code, "places": places})
+
+        raise ValidationError({"code": "Укажите item, address или code"})
+
+
+class SyncBatchAPIView(APIView):
+    """
+    Офлайн-синхронизация ТСД: пакет накопленных событий одним запросом
+
+    POST {"events": [{key, type: move|confirm, item_code, quantity,
+                      from_address, to_address | address}, ...]}
+
+    События применяются по порядку в одной транзакции,
+    уже примененные ключи не применяются повторно (см. sync_events)
+
+    Ответ: {"results": [{key, status, quantity?, error?, duplicate?}]}
+    """
+
+    def post(self, request):
+        if not request.user.has_perm("warehouse.change_placeitem"):
+            raise PermissionDenied("Недостаточно прав для перемещения товаров")
+        serializer = SyncBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = sync_events(
+            user=request.user, events=serializer.validated_data["events"]
+        )
+        return Response({"results": results})
+
+
+class PlaceItemChangeFeedAPIView(APIView):
+    """
+    Лента изменений стока для инкрементальной синхронизации (NDJSON)
+
+    GET ?since=<ревизия>&limit=<кол-во>
+    Каждая строка ответа - одно изменение:
+        {"revision", "place_id", "item_id", "item_code", "full_address",
+         "quantity", "status", "deleted"}
+    Заголовок X-Revision-Head - последняя опубликованная ревизия:
+    клиент продолжает с ревизии последней полученной строки
+
+    since=0 - полное состояние стока (с учетом компактизации журнала)
+    Изменения появляются в ленте после публикации командой
+    publish_place_item_changes (раз в CHANGE_FEED_PUBLISH_INTERVAL сек)
+    """
+
+    def get(self, request):
+        params = {}
+        for name in ("since", "limit"):
+            try:
+                params[name] = int(request.query_params.get(name, 0))
+            except ValueError:
+                raise ValidationError({name: "Ожидается целое число"})
+            if params[name] < 0:
+                raise ValidationError({name: "Ожидается неотрицательное число"})
+        since, limit = params["since"], params["limit"] or None
+
+        head = place_item_changes_head()
+        lines = (
+            json.dumps(change, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for change in iter_place_item_changes(since, limit)
+        )
+        response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+        response["X-Revision-Head"] = str(head)
+        return response
+
+
+class InventoryAsOfAPIView(APIView):
+    """
+    Сток на момент времени
+
+    GET ?at=<ГГГГ-ММ-ДД[THH:MM:SS]>&address=<Склад[/Зона[/Место]]>&item_code=<код>
+        at        - момент (дата без времени - начало дня), без пояса - в TIME_ZONE
+        address   - весь склад, зона или место (поддерево адреса), пусто - все
+        item_code - точный код товара
+
+    Ответ:
+        {"at", "exact", "checkpoint": {"revision", "taken_at"} | null,
+         "results": [{place_id, item_id, item_code, full_address, quantity, status}]}
+    exact=false - момент старше окна журнала без компактизации,
+    количество точно только на моменты ежедневных снимков
+    """
+
+    def get(self, request):
+        params = request.query_params
+        raw_at = params.get("at", "").strip()
+        at = parse_datetime(raw_at)
+        if at is None and parse_date(raw_at):
+            at = datetime.combine(parse_date(raw_at), datetime.min.time())
+        if at is None:
+            raise ValidationError({"at": "Ожидается дата ГГГГ-ММ-ДД или ГГГГ-ММ-ДДTЧЧ:ММ:СС"})
+        if timezone.is_naive(at):
+            at = timezone.make_aware(at)
+
+        try:
+            checkpoint, rows = inventory_as_of(
+                at,
+                address=normalize_address(params.get("address", "")),
+                item_code=params.get("item_code", "").strip().upper(),
+            )
+        except Exception as e:
+            raise ValidationError({"at": str(e)})
+
+        return Response(
+            {
+                "at": at.isoformat(),
+                "exact": inventory_as_of_exact(at),
+                "checkpoint": checkpoint
+                and {
+                    "revision": checkpoint.revision,
+                    "taken_at": checkpoint.taken_at.isoformat(),
+                },
+                "results": rows,
+            }
+        )
+
+
+def _check_cycle_count_permission(request):
+    """Создание, сверка и отмена инвентаризации меняют сток"""
+    if not request.user.has_perm("warehouse.change_cyclecount"):
+        raise PermissionDenied("Недостаточно прав для инвентаризации")
+
+
+def _cycle_count_data(count: CycleCount) -> dict:
+    return {
+        "id": count.pk,
+        "number": str(count),
+        "zone": count.zone.full_address,
+        "status": count.status,
+        "created_at": count.created_at.isoformat(),
+        "reconciled_at": count.reconciled_at and count.reconciled_at.isoformat(),
+    }
+
+
+class CycleCountAPIView(APIView):
+    """
+    Инвентаризация зоны
+
+    GET  - открытые инвентаризации
+    POST {"zone": pk} - новая инвентаризация: ожидаемые количества зоны
+         фиксируются одним запросом, склад продолжает работать
+    """
+
+    def get(self, request):
+        counts = CycleCount.objects.filter(status="open").select_related("zone__stock")
+        return Response({"results": [_cycle_count_data(count) for count in counts]})
+
+    def post(self, request):
+        _check_cycle_count_permission(request)
+        zone = (
+            Zone.objects.select_related("stock")
+            .filter(pk=str(request.data.get("zone", "")).strip() or None)
+            .first()
+        )
+        if zone is None:
+            raise ValidationError({"zone": "Зона не найдена"})
+        try:
+            count = start_cycle_count(zone=zone, user=request.user)
+        except Exception as e:
+            raise ValidationError({"zone": str(e)})
+        return Response(
+            {**_cycle_count_data(count), "lines": count.lines.count()},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class CycleCountCountsAPIView(APIView):
+    """
+    Подсчеты инвентаризации пакетом с ТСД
+
+    POST {"counts": [{address, item_code, quantity}, ...]}
+    quantity - итоговое количество пары на адресе, повтор заменяет прежний подсчет
+
+    Ответ: {"recorded": кол-во, "rejected": [{address, item_code, error}]}
+    """
+
+    def post(self, request, pk):
+        serializer = CycleCountBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = record_cycle_counts(
+                count_id=pk, counts=serializer.validated_data["counts"]
+            )
+        except Exception as e:
+            raise ValidationError({"count": str(e)})
+        return Response(result)
+
+
+class CycleCountVariancesAPIView(APIView):
+    """
+    Расхождения инвентаризации
+
+    Ответ: {"count", "results": [{id, place_id, item_id, item_code, full_address,
+                                  expected, counted, variance}]}
+    Непосчитанный товар посчитанного места - counted = 0
+    """
+
+    def get(self, request, pk):
+        count = CycleCount.objects.select_related("zone__stock").filter(pk=pk).first()
+        if count is None:
+            raise ValidationError({"count": "Инвентаризация не найдена"})
+        return Response(
+            {"count": _cycle_count_data(count), "results": cycle_count_variances(count)}
+        )
+
+
+class CycleCountReconcileAPIView(APIView):
+    """
+    POST - сверка: все корректировки стока одной транзакцией
+    Ответ: {"lines", "surplus", "shortage", "reserved",
+            "reserved_lines": [{full_address, item_code, quantity}]}
+    reserved - недостача, не списанная из-за резерва открытых задач подбора
+    """
+
+    def post(self, request, pk):
+        _check_cycle_count_permission(request)
+        try:
+            result = reconcile_cycle_count(count_id=pk, user=request.user)
+        except Exception as e:
+            raise ValidationError({"count": str(e)})
+        return Response(result)
+
+
+class CycleCountCancelAPIView(APIView):
+    """POST - отмена открытой инвентаризации без изменения стока"""
+
+    def post(self, request, pk):
+        _check_cycle_count_permission(request)
+        try:
+            count = cancel_cycle_count(count_id=pk)
+        except Exception as e:
+            raise ValidationError({"count": str(e)})
+        return Response(_cycle_count_data(count))
+
+
+class InboundPutawayAPIView(APIView):
+    """
+    Размещение завершенной поставки с адреса NEW
+
+    GET  - план: {"inbound", "lines": [{item_id, item_code, place_id, full_address,
+                  quantity}], "unplaced": [{item_id, item_code, quantity}]}
+           места, где товар уже лежит, затем пустые, затем со свободным объемом
+    POST - размещение по плану одной транзакцией (план пересчитывается),
+           ответ в том же формате, lines - фактически перемещенное
+    Размещенное учитывается по позициям поставки: повторный POST размещает
+    только остаток, по полностью размещенной поставке - ошибка 400
+    """
+
+    def _inbound(self, pk) -> Inbound:
+        inbound = Inbound.objects.filter(pk=pk).first()
+        if inbound is None:
+            raise ValidationError({"inbound": "Поставка не найдена"})
+        return inbound
+
+    def get(self, request, pk):
+        inbound = self._inbound(pk)
+        try:
+            plan = inbound_putaway_plan(inbound)
+        except Exception as e:
+            raise ValidationError({"inbound": str(e)})
+        return Response({"inbound": str(inbound), **plan})
+
+    def post(self, request, pk):
+        if not request.user.has_perm("warehouse.change_placeitem"):
+            raise PermissionDenied("Недостаточно прав для размещения")
+        inbound = self._inbound(pk)
+        try:
+            result = putaway_inbound(inbound=inbound, user=request.user)
+        except Exception as e:
+            raise ValidationError({"inbound": str(e)})
+        return Response({"inbound": str(inbound), **result})
+
+
+class OutboundPickListAPIView(APIView):
+    """
+    Лист подбора отгрузки в порядке маршрута обхода склада
+
+    Ответ: {"outbound", "stops", "distance",
+            "results": [{full_address, item_code, quantity}]}
+    distance - длина пути по координатам мест (м), null - координаты заданы не у всех
+    """
+
+    def get(self, request, pk):
+        outbound = Outbound.objects.filter(pk=pk).first()
+        if outbound is None:
+            raise ValidationError({"outbound": "Отгрузка не найдена"})
+        try:
+            data = pick_list_route(outbound)
+        except Exception as e:
+            raise ValidationError({"outbound": str(e)})
+        return Response(
+            {
+                "outbound": str(outbound),
+                "stops": data["stops"],
+                "distance": data["distance"],
+                "results": [
+                    {"full_address": address, "item_code": item_code, "quantity": quantity}
+                    for address, item_code, quantity in data["lines"]
+                ],
+            }
+        )
+
+
+def _check_picking_permission(request):
+    if not request.user.has_perm("wave.change_outbound"):
+        raise PermissionDenied("Недостаточно прав для подбора")
+
+
+def _pick_batch_data(batch) -> dict:
+    return {
+        "id": batch.pk,
+        "outbound": str(batch.outbound),
+        "number": batch.number,
+        "status": batch.status,
+        "tasks": [
+            {
+                "id": task.pk,
+                "full_address": task.full_address,
+                "item_code": task.item_code,
+                "quantity": task.quantity,
+                "status": task.status,
+            }
+            for task in batch.picks.order_by("walk_sequence", "full_address", "pk")
+        ],
+    }
+
+
+class PickBatchClaimAPIView(APIView):
+    """
+    POST - взять следующий свободный пакет задач подбора
+    Тело: {"outbound": pk} - только пакеты этой отгрузки (необязательно)
+    Ответ: {"id", "outbound", "number", "status",
+            "tasks": [{id, full_address, item_code, quantity, status}]}
+    или 204, если свободных пакетов нет
+    """
+
+    def post(self, request):
+        _check_picking_permission(request)
+        outbound_id = request.data.get("outbound")
+        if outbound_id is not None and not str(outbound_id).isdigit():
+            raise ValidationError({"outbound": "Некорректный id отгрузки"})
+        batch = claim_pick_batch(
+            user=request.user,
+            outbound_id=int(outbound_id) if outbound_id is not None else None,
+        )
+        if batch is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(_pick_batch_data(batch))
+
+
+class PickBatchReleaseAPIView(APIView):
+    """POST - вернуть взятый пакет, неподтвержденные задачи смогут взять другие"""
+
+    def post(self, request, pk):
+        _check_picking_permission(request)
+        try:
+            batch = release_pick_batch(batch_id=pk, user=request.user)
+        except Exception as e:
+            raise ValidationError({"batch": str(e)})
+        return Response(_pick_batch_data(batch))
+
+
+class PickTaskConfirmAPIView(APIView):
+    """
+    POST - подтверждение задачи подбора из взятого пакета:
+    на OUTBOUND переносится только количество задачи
+    Ответ: {"id", "status", "batch_status"}
+    """
+
+    def post(self, request, pk):
+        _check_picking_permission(request)
+        try:
+            task = confirm_pick_task(task_id=pk, user=request.user)
+        except DjangoValidationError as e:
+            raise ValidationError({"task": e.messages[0]})
+        except Exception as e:
+            raise ValidationError({"task": str(e)})
+        task.batch.refresh_from_db(fields=["status"])
+        return Response({"id": task.pk, "status": task.status, "batch_status": task.batch.status})
+
+
+class OutboundConsolidationAPIView(APIView):
+    """
+    Консолидированный запуск подбора запланированных отгрузок по складу и дате
+    Параметры (query для GET, тело для POST): stock - pk склада, planned_date - YYYY-MM-DD
+
+    GET  - группы: {"results": [{stock_id, stock, planned_date, outbounds: [pk], lines}]}
+    POST - перевод групп в in_progress с общим резервированием по каждой группе:
+           {"results": [{stock, planned_date, results: [{pk, number, old_status,
+                          status, ok, error}]}]}
+    """
+
+    def _params(self, data) -> dict:
+        stock_id = data.get("stock")
+        if stock_id is not None and not str(stock_id).isdigit():
+            raise ValidationError({"stock": "Некорректный id склада"})
+        planned_date = data.get("planned_date")
+        if planned_date is not None:
+            planned_date = parse_date(str(planned_date))
+            if planned_date is None:
+                raise ValidationError({"planned_date": "Ожидается дата YYYY-MM-DD"})
+        return {
+            "stock_id": int(stock_id) if stock_id is not None else None,
+            "planned_date": planned_date,
+        }
+
+    def get(self, request):
+        return Response({"results": consolidation_groups(**self._params(request.query_params))})
+
+    def post(self, request):
+        _check_picking_permission(request)
+        return Response({"results": consolidate_outbounds(**self._params(request.data))})
@@ -48,6 +48,8 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "widget_tweaks",
+    "rest_framework",
+    "rest_framework.authtoken",
     "allauth",
     "allauth.account",
     "allauth.socialaccount",
@@ -56,6 +58,7 @@ INSTALLED_APPS = [
     "structure.apps.StructureConfig",
     "staff.apps.StaffConfig",
     "wave.apps.WaveConfig",
+    "api.apps.ApiConfig",
 ]
 
 MIDDLEWARE = [
@@ -172,7 +175,7 @@ STATICFILES_DIRS = [
 ]
 
 # допустимые типы загружаемых файлов
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FILE_SIZE = int(os.getenv("MAX_FILE_SIZE", 200 * 1024 * 1024))  # 200MB
 ALLOWED_EXTS_DOCS = (
     ".pdf",
     ".doc",
@@ -191,9 +194,74 @@ ALLOWED_EXTS_DOCS = (
     ".rar",
     ".txt",
 )
+# допустимые MIME-типы содержимого (libmagic) по расширению, сравнение по префиксу
+OLE_MIME_TYPES = ("application/msword", "application/vnd.ms-excel", "application/CDFV2", "application/x-ole-storage")
+ZIP_MIME_TYPES = ("application/zip",)
+ALLOWED_MIME_DOCS = {
+    ".pdf": ("application/pdf",),
+    ".doc": OLE_MIME_TYPES,
+    ".docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", *ZIP_MIME_TYPES),
+    ".xls": OLE_MIME_TYPES,
+    ".xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", *ZIP_MIME_TYPES),
+    ".xlsb": ("application/vnd.ms-excel", "application/octet-stream", *ZIP_MIME_TYPES),
+    ".jpg": ("image/jpeg",),
+    ".jpeg": ("image/jpeg",),
+    ".png": ("image/png",),
+    ".tiff": ("image/tiff",),
+    ".bmp": ("image/bmp", "image/x-ms-bmp"),
+    ".ods": ("application/vnd.oasis.opendocument.spreadsheet", *ZIP_MIME_TYPES),
+    ".csv": ("text/", "application/csv"),
+    ".zip": ZIP_MIME_TYPES,
+    ".rar": ("application/x-rar", "application/vnd.rar"),
+    ".txt": ("text/",),
+}
+# кол-во потоков обработки загружаемых файлов одного запроса
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 4))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# докачиваемая загрузка документов: макс. размер части и время жизни сессии (сек)
+UPLOAD_MAX_CHUNK = 8 * 1024 * 1024
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", 24 * 3600))
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "uploads"
 MEDIA_ROOT.mkdir(exist_ok=True)
+# готовые архивы документов волн (пересобираются при изменении папки волны)
+ARCHIVE_CACHE_DIR = MEDIA_ROOT / "cache" / "archives"
+# архивы документов архивных волн по месяцам (холодный том)
+ARCHIVE_COLD_DIR = os.getenv("ARCHIVE_COLD_DIR", BASE_DIR / "cold")
+# хранилище загруженных документов по sha256 содержимого
+DOCUMENT_STORE_DIR = MEDIA_ROOT / "documents"
+# содержимое без ссылок удаляется не раньше, чем через DOCUMENT_GC_MIN_AGE секунд
+DOCUMENT_GC_MIN_AGE = int(os.getenv("DOCUMENT_GC_MIN_AGE", 3600))
+
+# отдача файлов: "django" - FileResponse, "nginx" - X-Accel-Redirect
+FILE_DELIVERY = os.getenv("FILE_DELIVERY", "django")
+# каталог -> internal location nginx (vhost.d)
+X_ACCEL_LOCATIONS = {
+    MEDIA_ROOT: "/protected/uploads/",
+    STATICFILES_DIRS[0] / "forms": "/protected/forms/",
+}
+
+# кол-во фоновых потоков формирования упаковочных листов на процесс
+PACKING_LIST_WORKERS = int(os.getenv("PACKING_LIST_WORKERS", 2))
+# через сколько минут лист в статусе "pending" считается потерянным
+# (процесс перезапущен до формирования), см. команду requeue_packing_lists
+PACKING_LIST_PENDING_TIMEOUT = int(os.getenv("PACKING_LIST_PENDING_TIMEOUT", 15))
+# отгрузок на один запрос строк при пересоздании листов (regenerate_packing_lists)
+PACKING_LIST_CHUNK_SIZE = int(os.getenv("PACKING_LIST_CHUNK_SIZE", 50))
+
+# горячая папка форм INB-FORM / OUT-FORM (watch_wave_folder):
+# каталог, кол-во одновременно обрабатываемых файлов, период опроса без inotify (сек)
+HOT_FOLDER_DIR = os.getenv("HOT_FOLDER_DIR", str(BASE_DIR / "hot_folder"))
+HOT_FOLDER_WORKERS = int(os.getenv("HOT_FOLDER_WORKERS", 2))
+HOT_FOLDER_POLL_INTERVAL = float(os.getenv("HOT_FOLDER_POLL_INTERVAL", 5))
+# склад (pk или название) и автор создаваемых волн, если не заданы в команде
+HOT_FOLDER_STOCK = os.getenv("HOT_FOLDER_STOCK", "")
+HOT_FOLDER_USER = os.getenv("HOT_FOLDER_USER", "")
+# порядок списания товара при подборе отгрузки: walk - по маршруту обхода склада
+# (Place.walk_sequence, см. compute_walk_sequence), fifo - по порядку заселения
+PICK_ALLOCATION_ORDER = os.getenv("PICK_ALLOCATION_ORDER", "walk")
+# кол-во задач подбора в пакете одного сборщика (подряд по маршруту обхода)
+PICK_BATCH_SIZE = int(os.getenv("PICK_BATCH_SIZE", 20))
 ####################################################
 
 
@@ -205,6 +273,55 @@ SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 ####################################################
 
 
+##### Конфигурация API #####
+# Доступ по сессии (браузер) или токену (сканеры, ERP): Authorization: Token <key>
+# Только JSON без отступов, кириллица без \u-экранирования
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.TokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    "COMPACT_JSON": True,
+    "UNICODE_JSON": True,
+}
+# размер страницы курсорной выдачи по умолчанию и максимальный (?limit=)
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", 500))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", 5000))
+# время жизни кеша полных адресов мест в процессе (сек)
+ADDRESS_CACHE_TTL = int(os.getenv("ADDRESS_CACHE_TTL", 300))
+# макс. кол-во событий в пакете офлайн-синхронизации ТСД
+SYNC_MAX_EVENTS = int(os.getenv("SYNC_MAX_EVENTS", 1000))
+# макс. кол-во подсчетов в пакете инвентаризации
+CYCLE_COUNT_MAX_ENTRIES = int(os.getenv("CYCLE_COUNT_MAX_ENTRIES", 10000))
+# пауза между публикациями журнала изменений стока (publish_place_item_changes, сек):
+# задержка появления изменения в ленте /api/place-items/changes/
+CHANGE_FEED_PUBLISH_INTERVAL = float(os.getenv("CHANGE_FEED_PUBLISH_INTERVAL", 1))
+# перекрытые изменения стока старше N дней удаляются compact_inventory_changes
+# в пределах этого окна сток на момент времени восстанавливается с точностью до секунды
+CHANGE_FEED_RETENTION_DAYS = int(os.getenv("CHANGE_FEED_RETENTION_DAYS", 35))
+# час (TIME_ZONE), с которого publish_place_item_changes снимает ежедневный снимок стока
+# и компактизирует журнал
+INVENTORY_CHECKPOINT_HOUR = int(os.getenv("INVENTORY_CHECKPOINT_HOUR", 3))
+# срок хранения ежедневных снимков стока (take_inventory_checkpoint):
+# сток на момент времени восстанавливается не дальше самого старого снимка
+INVENTORY_CHECKPOINT_RETENTION_DAYS = int(
+    os.getenv("INVENTORY_CHECKPOINT_RETENTION_DAYS", 400)
+)
+# доставка вебхуков (deliver_webhooks): событий в одном POST, таймаут (сек),
+# попыток до статуса failed, задержка повтора base * 2^(n-1) но не больше max (сек)
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", 100))
+WEBHOOK_TIMEOUT = float(os.getenv("WEBHOOK_TIMEOUT", 10))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", 10))
+WEBHOOK_BACKOFF_BASE = int(os.getenv("WEBHOOK_BACKOFF_BASE", 10))
+WEBHOOK_BACKOFF_MAX = int(os.getenv("WEBHOOK_BACKOFF_MAX", 3600))
+# доставленные события outbox старше N дней удаляются
+WEBHOOK_RETENTION_DAYS = int(os.getenv("WEBHOOK_RETENTION_DAYS", 7))
+####################################################
+
+
 ##### Конфигурация логирования #####
 # Логирование в файл и в консоль
 # Ротация файлов: 5 по 5mb
@@ -13,6 +13,7 @@ urlpatterns = [
     path("warehouse/", include("structure.urls")),
     path("warehouse/", include("staff.urls")),
     path("warehouse/", include("wave.urls")),
+    path("api/", include("api.urls")),
 ]
 
 if settings.DEBUG:
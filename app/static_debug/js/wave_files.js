@@ -1,41 +1,173 @@
 const input = document.getElementById("documents");
 const preview = document.getElementById("preview");
+const form = input.closest("form");
+const uploadUrl = input.dataset.uploadUrl;
+const csrfToken = form.querySelector("[name=csrfmiddlewaretoken]").value;
 
+const MAX_FILES = 15;
+const DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024;
+
+// {file, id, offset, status: pending|uploading|done|error, error}
 let filesList = [];
+let uploading = false;
 
 input.addEventListener("change", function (e) {
     for (let f of Array.from(e.target.files)) {
-        filesList.push(f);
+        filesList.push({file: f, id: null, offset: 0, status: "pending", error: ""});
     }
 
-    if (filesList.length > 15) {
+    if (filesList.length > MAX_FILES) {
         alert("Можно загрузить не более 15 файлов.");
-        filesList = filesList.slice(0, 15);
+        filesList = filesList.slice(0, MAX_FILES);
     }
 
+    // документы загружаются частями заранее, в форму уходят только id загрузок
+    input.value = "";
     updatePreview();
+    uploadAll();
+});
+
+form.addEventListener("submit", function (e) {
+    if (filesList.some(entry => entry.status !== "done")) {
+        e.preventDefault();
+        alert("Дождитесь загрузки документов или удалите файлы с ошибкой.");
+    }
 });
 
+async function uploadAll() {
+    if (uploading) return;
+    uploading = true;
+    try {
+        let entry;
+        while ((entry = filesList.find(x => x.status === "pending"))) {
+            await uploadFile(entry);
+        }
+    } finally {
+        uploading = false;
+    }
+}
+
+function storageKey(file) {
+    return `upload:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function uploadFile(entry) {
+    const key = storageKey(entry.file);
+    entry.status = "uploading";
+    updatePreview();
+
+    try {
+        // продолжение прерванной загрузки того же файла
+        entry.id = entry.id || localStorage.getItem(key);
+        if (entry.id) {
+            const response = await fetch(`${uploadUrl}${entry.id}/`);
+            if (response.ok) {
+                entry.offset = (await response.json()).offset;
+            } else {
+                entry.id = null;
+            }
+        }
+
+        let chunkSize = DEFAULT_CHUNK_SIZE;
+        if (!entry.id) {
+            const body = new FormData();
+            body.append("name", entry.file.name);
+            body.append("size", entry.file.size);
+            const response = await fetch(uploadUrl, {
+                method: "POST",
+                headers: {"X-CSRFToken": csrfToken},
+                body: body,
+            });
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.error);
+            entry.id = data.id;
+            entry.offset = data.offset;
+            chunkSize = Math.min(chunkSize, data.chunk_size);
+            localStorage.setItem(key, entry.id);
+        }
+
+        while (entry.offset < entry.file.size) {
+            const chunk = entry.file.slice(entry.offset, entry.offset + chunkSize);
+            const headers = {
+                "X-CSRFToken": csrfToken,
+                "Content-Type": "application/octet-stream",
+                "Upload-Offset": String(entry.offset),
+            };
+            const checksum = await sha256Hex(chunk);
+            if (checksum) headers["Upload-Checksum"] = checksum;
+
+            const response = await fetch(`${uploadUrl}${entry.id}/chunk/`, {
+                method: "PUT",
+                headers: headers,
+                body: chunk,
+            });
+            const data = await response.json();
+            if (response.status === 409) {
+                entry.offset = data.offset;
+                continue;
+            }
+            if (!response.ok) {
+                if (response.status === 404) localStorage.removeItem(key);
+                throw new Error(data.error);
+            }
+            entry.offset = data.offset;
+            updatePreview();
+        }
+
+        entry.status = "done";
+    } catch (err) {
+        entry.status = "error";
+        entry.error = err.message || "Ошибка загрузки";
+    }
+    updatePreview();
+}
+
+async function sha256Hex(blob) {
+    // crypto.subtle доступен только в защищенном контексте (https/localhost)
+    if (!(window.crypto && crypto.subtle)) return null;
+    const digest = await crypto.subtle.digest("SHA-256", await blob.arrayBuffer());
+    return Array.from(new Uint8Array(digest))
+        .map(b => b.toString(16).padStart(2, "0"))
+        .join("");
+}
+
+function statusText(entry) {
+    if (entry.status === "done") return "✓";
+    if (entry.status === "error") return entry.error;
+    const percent = entry.file.size ? Math.floor(entry.offset * 100 / entry.file.size) : 0;
+    return `${percent}%`;
+}
+
 function updatePreview() {
     preview.innerHTML = "";
 
-    filesList.forEach((file, index) => {
+    filesList.forEach((entry, index) => {
         const row = document.createElement("div");
         row.className = "d-flex align-items-center mb-2";
 
         row.innerHTML = `
-            <span class="me-2">${truncateName(file.name)}</span>
-            <button type="button" class="btn btn-sm btn-danger">✕</button>
+            <span class="me-2">${truncateName(entry.file.name)}</span>
+            <span class="me-2 small ${entry.status === "error" ? "text-danger" : "text-muted"}"></span>
+            ${entry.status === "error" ? '<button type="button" class="btn btn-sm btn-outline-secondary me-1 retry">↻</button>' : ""}
+            <button type="button" class="btn btn-sm btn-danger remove">✕</button>
         `;
+        row.querySelector("span.small").textContent = statusText(entry);
 
-        row.querySelector("button").onclick = () => {
+        const retry = row.querySelector(".retry");
+        if (retry) {
+            retry.onclick = () => {
+                entry.status = "pending";
+                uploadAll();
+            };
+        }
+        row.querySelector(".remove").onclick = () => {
             removeFile(index);
         };
 
         preview.appendChild(row);
     });
 
-    updateInputFiles();
+    updateUploadIds();
 }
 
 function truncateName(name, limit = 40) {
@@ -48,8 +180,15 @@ function removeFile(index) {
     updatePreview();
 }
 
-function updateInputFiles() {
-    const dataTransfer = new DataTransfer();
-    filesList.forEach(f => dataTransfer.items.add(f));
-    input.files = dataTransfer.files;
+function updateUploadIds() {
+    form.querySelectorAll("input[name=upload_ids]").forEach(el => el.remove());
+    filesList
+        .filter(entry => entry.status === "done")
+        .forEach(entry => {
+            const hidden = document.createElement("input");
+            hidden.type = "hidden";
+            hidden.name = "upload_ids";
+            hidden.value = entry.id;
+            form.appendChild(hidden);
+        });
 }
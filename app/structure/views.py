@@ -5,6 +5,7 @@ from django.db import transaction
 from django.shortcuts import redirect, render
 from django.views.generic import FormView, ListView
 from warehouse.models import Place, Stock, Zone
+from warehouse.services import filter_places
 
 from .forms import StructureActionForm, StructureSearchForm
 
@@ -197,14 +198,7 @@ class StructureSearchView(LoginRequiredMixin, ListView):
             return qs.none()
 
         if form.is_valid():
-            data = form.cleaned_data
-            if data.get("stock"):
-                qs = qs.filter(zone__stock=data["stock"])
-            if data.get("zone"):
-                qs = qs.filter(zone__title__icontains=data["zone"])
-            if data.get("place"):
-                qs = qs.filter(title__icontains=data["place"])
-
+            qs = filter_places(qs, form.cleaned_data)
             qs = qs.order_by("zone__stock__title", "zone__title", "title")
         else:
             return qs.none()
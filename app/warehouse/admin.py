@@ -1,7 +1,10 @@
 from django import forms
 from django.contrib import admin
 
-from .models import History, Item, Place, PlaceItem, Stock, Zone
+from .models import (CycleCount, CycleCountLine, History, InventoryCheckpoint,
+                     Item, OutboxDelivery, Place, PlaceItem, Stock, SyncEvent,
+                     WebhookEndpoint, Zone)
+from .services import compute_walk_sequence
 
 """
 Опции административной панели
@@ -101,6 +104,9 @@ class PlaceAdmin(admin.ModelAdmin):
         "pk",
         "full_address",
         "description_short",
+        "capacity",
+        "pick_sequence",
+        "walk_sequence",
         "created_at",
     )
     list_display_links = (
@@ -121,6 +127,12 @@ class PlaceAdmin(admin.ModelAdmin):
     search_help_text = "title , description"
     list_per_page = 50
 
+    def save_related(self, request, form, formsets, change):
+        """Порядок обхода и координаты места меняют маршрут обхода склада"""
+        super().save_related(request, form, formsets, change)
+        if form.instance.zone_id:
+            compute_walk_sequence(form.instance.zone.stock_id)
+
 
 @admin.register(PlaceItem)
 class PlaceItemAdmin(admin.ModelAdmin):
@@ -150,6 +162,7 @@ class ZoneAdmin(admin.ModelAdmin):
         "pk",
         "full_address",
         "description_short",
+        "pick_sequence",
         "created_at",
     )
     list_display_links = (
@@ -170,6 +183,12 @@ class ZoneAdmin(admin.ModelAdmin):
     search_help_text = "title , description"
     list_per_page = 50
 
+    def save_related(self, request, form, formsets, change):
+        """Порядок обхода зоны и ее мест меняет маршрут обхода склада"""
+        super().save_related(request, form, formsets, change)
+        if form.instance.stock_id:
+            compute_walk_sequence(form.instance.stock_id)
+
 
 @admin.register(Stock)
 class StockAdmin(admin.ModelAdmin):
@@ -226,3 +245,82 @@ class HistoryAdmin(admin.ModelAdmin):
 
     def get_readonly_fields(self, request, obj=None):
         return [f.name for f in History._meta.fields]
+
+
+@admin.register(SyncEvent)
+class SyncEventAdmin(admin.ModelAdmin):
+    list_display = ("key", "event_type", "status", "user", "created_at")
+    ordering = ("-pk",)
+    list_filter = ["event_type", "status"]
+    readonly_fields = [field.name for field in SyncEvent._meta.fields]
+    search_fields = ("key",)
+    search_help_text = "key"
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ("title", "url", "event_types", "is_active", "created_at")
+    ordering = ("pk",)
+    list_filter = ["is_active"]
+    search_fields = ("title", "url")
+    search_help_text = "title / url"
+
+
+@admin.register(OutboxDelivery)
+class OutboxDeliveryAdmin(admin.ModelAdmin):
+    list_display = (
+        "event",
+        "endpoint",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "delivered_at",
+    )
+    ordering = ("-pk",)
+    list_filter = ["status", "endpoint"]
+    list_select_related = ("event", "endpoint")
+    readonly_fields = [field.name for field in OutboxDelivery._meta.fields]
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(InventoryCheckpoint)
+class InventoryCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("taken_at", "revision", "lines")
+    ordering = ("-taken_at",)
+    readonly_fields = [field.name for field in InventoryCheckpoint._meta.fields]
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+class CycleCountLineInline(admin.TabularInline):
+    model = CycleCountLine
+    fields = ("full_address", "item_code", "expected", "counted", "adjustment")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CycleCount)
+class CycleCountAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "zone", "status", "created_by", "created_at", "reconciled_at")
+    ordering = ("-pk",)
+    list_filter = ["status"]
+    list_select_related = ("zone__stock", "created_by")
+    readonly_fields = [field.name for field in CycleCount._meta.fields]
+    inlines = [CycleCountLineInline]
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
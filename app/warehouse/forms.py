@@ -289,9 +289,14 @@ class MoveItemForm(forms.Form):
 
         try:
             place_item = PlaceItem.objects.get(place=from_place, item=item)
-            if place_item.quantity < quantity:
+            if place_item.quantity - place_item.reserved < quantity:
                 raise forms.ValidationError(
                     f"Недостаточно товара: есть {place_item.quantity} шт."
+                    + (
+                        f", из них в резерве подбора {place_item.reserved} шт."
+                        if place_item.reserved
+                        else ""
+                    )
                 )
         except PlaceItem.DoesNotExist:
             raise forms.ValidationError("Товара нет на указанном месте ОТКУДА")
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from warehouse.services import (compact_place_item_changes,
+                                take_inventory_checkpoint)
+
+
+class Command(BaseCommand):
+    help = (
+        "Компактизация журнала изменений стока: удаляет изменения старше N дней, "
+        "перекрытые более поздним изменением той же пары место/товар. "
+        "Перед компактизацией снимается снимок стока"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.CHANGE_FEED_RETENTION_DAYS,
+            help="Возраст изменений в днях",
+        )
+
+    def handle(self, *args, **options):
+        take_inventory_checkpoint()
+        removed = compact_place_item_changes(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Удалено изменений: {removed}"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from warehouse.models import Stock
+from warehouse.services import compute_walk_sequence
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчет маршрута обхода мест склада по порядку обхода зон и мест "
+        "и координатам мест (запускать после изменения структуры склада)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stock", help="Склад (pk или название), по умолчанию все")
+
+    def handle(self, *args, **options):
+        stock_id = None
+        if options["stock"]:
+            value = options["stock"].strip()
+            stock = (
+                Stock.objects.filter(pk=value).first()
+                if value.isdigit()
+                else Stock.objects.filter(title__iexact=value).first()
+            )
+            if stock is None:
+                raise CommandError(f"Склад {value} не найден")
+            stock_id = stock.pk
+
+        updated = compute_walk_sequence(stock_id)
+        self.stdout.write(self.style.SUCCESS(f"Маршрут обхода пересчитан, изменено мест: {updated}"))
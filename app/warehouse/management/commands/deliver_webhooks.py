@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from warehouse.services import WebhookConnectionPool, deliver_webhooks, purge_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Доставка событий outbox на вебхуки пакетами. "
+        "Без --once работает постоянно, при пустой очереди ждет --interval сек"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Один проход доставки")
+        parser.add_argument(
+            "--interval", type=float, default=2, help="Пауза при пустой очереди (сек)"
+        )
+
+    def handle(self, *args, **options):
+        pool = WebhookConnectionPool(timeout=settings.WEBHOOK_TIMEOUT)
+        try:
+            if options["once"]:
+                delivered = deliver_webhooks(pool)
+                self.stdout.write(self.style.SUCCESS(f"Доставлено событий: {delivered}"))
+                return
+
+            purged_at = 0
+            while True:
+                if time.monotonic() - purged_at > 3600:
+                    purge_outbox(settings.WEBHOOK_RETENTION_DAYS)
+                    purged_at = time.monotonic()
+                if not deliver_webhooks(pool):
+                    time.sleep(options["interval"])
+        finally:
+            pool.close()
@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from warehouse.services import (compact_place_item_changes,
+                                publish_place_item_changes)
+
+
+class Command(BaseCommand):
+    help = (
+        "Публикация журнала изменений стока для ленты /api/place-items/changes/. "
+        "Без --once работает постоянно: публикует раз в --interval сек, "
+        "ежедневно в INVENTORY_CHECKPOINT_HOUR снимает снимок стока "
+        "(take_inventory_checkpoint) и компактизирует журнал"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Одна публикация")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=settings.CHANGE_FEED_PUBLISH_INTERVAL,
+            help="Пауза между публикациями (сек)",
+        )
+
+    def daily_maintenance(self):
+        """Снимок стока с удалением старых снимков, затем компактизация журнала"""
+        call_command("take_inventory_checkpoint", stdout=self.stdout)
+        removed = compact_place_item_changes(settings.CHANGE_FEED_RETENTION_DAYS)
+        self.stdout.write(self.style.SUCCESS(f"Удалено изменений: {removed}"))
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            published = publish_place_item_changes()
+            self.stdout.write(self.style.SUCCESS(f"Опубликовано изменений: {published}"))
+            return
+
+        maintained_on = None
+        while True:
+            now = timezone.localtime()
+            if now.hour >= settings.INVENTORY_CHECKPOINT_HOUR and now.date() != maintained_on:
+                self.daily_maintenance()
+                maintained_on = now.date()
+            publish_place_item_changes()
+            time.sleep(options["interval"])
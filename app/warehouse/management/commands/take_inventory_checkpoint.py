@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from warehouse.services import (purge_inventory_checkpoints,
+                                take_inventory_checkpoint)
+
+
+class Command(BaseCommand):
+    help = (
+        "Снимок стока для запросов на момент времени (запускать ежедневно). "
+        "Снимки старше --keep-days дней удаляются"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=settings.INVENTORY_CHECKPOINT_RETENTION_DAYS,
+            help="Срок хранения снимков в днях",
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = take_inventory_checkpoint()
+        removed = purge_inventory_checkpoints(options["keep_days"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Снимок {checkpoint}: строк {checkpoint.lines}, удалено снимков: {removed}"
+            )
+        )
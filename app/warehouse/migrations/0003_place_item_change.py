@@ -0,0 +1,144 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+# Журнал изменений стока пишется триггерами уровня оператора:
+# set-based UPDATE/INSERT на тысячи строк дает один INSERT в журнал
+PLACE_ITEM_CHANGE_SQL = """
+CREATE FUNCTION warehouse_placeitem_log_changes() RETURNS trigger AS $$
+DECLARE
+    tx bigint := pg_current_xact_id()::text::bigint;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO warehouse_placeitemchange
+            (txid, place_item_id, place_id, item_id, item_code, full_address,
+             quantity, status, deleted, changed_at)
+        SELECT tx, n.id, n.place_id, n.item_id, COALESCE(i.item_code, ''),
+               n.full_address, n.quantity, n.status, false, now()
+        FROM new_rows n
+        LEFT JOIN warehouse_item i ON i.id = n.item_id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        -- строка перенесена на другой адрес / товар: старая пара удалена
+        INSERT INTO warehouse_placeitemchange
+            (txid, place_item_id, place_id, item_id, item_code, full_address,
+             quantity, status, deleted, changed_at)
+        SELECT tx, o.id, o.place_id, o.item_id, COALESCE(i.item_code, ''),
+               o.full_address, 0, o.status, true, now()
+        FROM old_rows o
+        JOIN new_rows n ON n.id = o.id
+        LEFT JOIN warehouse_item i ON i.id = o.item_id
+        WHERE (n.place_id, n.item_id) IS DISTINCT FROM (o.place_id, o.item_id);
+
+        INSERT INTO warehouse_placeitemchange
+            (txid, place_item_id, place_id, item_id, item_code, full_address,
+             quantity, status, deleted, changed_at)
+        SELECT tx, n.id, n.place_id, n.item_id, COALESCE(i.item_code, ''),
+               n.full_address, n.quantity, n.status, false, now()
+        FROM new_rows n
+        JOIN old_rows o ON o.id = n.id
+        LEFT JOIN warehouse_item i ON i.id = n.item_id
+        WHERE (n.place_id, n.item_id, n.quantity, n.status, n.full_address)
+            IS DISTINCT FROM (o.place_id, o.item_id, o.quantity, o.status, o.full_address);
+    ELSE
+        INSERT INTO warehouse_placeitemchange
+            (txid, place_item_id, place_id, item_id, item_code, full_address,
+             quantity, status, deleted, changed_at)
+        SELECT tx, o.id, o.place_id, o.item_id, COALESCE(i.item_code, ''),
+               o.full_address, 0, o.status, true, now()
+        FROM old_rows o
+        LEFT JOIN warehouse_item i ON i.id = o.item_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER warehouse_placeitem_log_insert
+    AFTER INSERT ON warehouse_placeitem
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION warehouse_placeitem_log_changes();
+
+CREATE TRIGGER warehouse_placeitem_log_update
+    AFTER UPDATE ON warehouse_placeitem
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION warehouse_placeitem_log_changes();
+
+CREATE TRIGGER warehouse_placeitem_log_delete
+    AFTER DELETE ON warehouse_placeitem
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION warehouse_placeitem_log_changes();
+"""
+
+# текущий сток - начальные ревизии журнала
+PLACE_ITEM_CHANGE_SEED_SQL = """
+INSERT INTO warehouse_placeitemchange
+    (txid, place_item_id, place_id, item_id, item_code, full_address,
+     quantity, status, deleted, changed_at)
+SELECT pg_current_xact_id()::text::bigint, pi.id, pi.place_id, pi.item_id, i.item_code,
+       pi.full_address, pi.quantity, pi.status, false, now()
+FROM warehouse_placeitem pi
+JOIN warehouse_item i ON i.id = pi.item_id
+ORDER BY pi.id;
+"""
+
+PLACE_ITEM_CHANGE_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS warehouse_placeitem_log_insert ON warehouse_placeitem;
+DROP TRIGGER IF EXISTS warehouse_placeitem_log_update ON warehouse_placeitem;
+DROP TRIGGER IF EXISTS warehouse_placeitem_log_delete ON warehouse_placeitem;
+DROP FUNCTION IF EXISTS warehouse_placeitem_log_changes();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0002_sync_event"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlaceItemChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "revision",
+                    models.BigIntegerField(blank=True, null=True, unique=True),
+                ),
+                ("txid", models.BigIntegerField()),
+                ("place_item_id", models.BigIntegerField()),
+                ("place_id", models.BigIntegerField()),
+                ("item_id", models.BigIntegerField()),
+                ("item_code", models.CharField(blank=True, max_length=100)),
+                ("full_address", models.CharField(blank=True, max_length=500)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                ("status", models.CharField(blank=True, max_length=20)),
+                ("deleted", models.BooleanField(default=False)),
+                ("changed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Изменение стока",
+                "verbose_name_plural": "Изменения стока",
+                "ordering": ["revision"],
+                "indexes": [
+                    models.Index(
+                        fields=["place_id", "item_id", "revision"],
+                        name="warehouse_p_place_i_ffd4da_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("revision__isnull", True)),
+                        fields=["txid", "id"],
+                        name="placeitemchange_pending",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(PLACE_ITEM_CHANGE_SQL, PLACE_ITEM_CHANGE_REVERSE_SQL),
+        migrations.RunSQL(PLACE_ITEM_CHANGE_SEED_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0004_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("revision", models.BigIntegerField(unique=True)),
+                ("taken_at", models.DateTimeField(db_index=True)),
+                ("lines", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Снимок стока",
+                "verbose_name_plural": "Снимки стока",
+                "ordering": ["-taken_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="InventoryCheckpointLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("place_id", models.BigIntegerField()),
+                ("item_id", models.BigIntegerField()),
+                ("item_code", models.CharField(blank=True, max_length=100)),
+                ("full_address", models.CharField(blank=True, max_length=500)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                ("status", models.CharField(blank=True, max_length=20)),
+                (
+                    "checkpoint",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="warehouse.inventorycheckpoint",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Строка снимка стока",
+                "verbose_name_plural": "Строки снимков стока",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("checkpoint", "place_id", "item_id"),
+                        name="inventorycheckpointline_pair",
+                    )
+                ],
+            },
+        ),
+    ]
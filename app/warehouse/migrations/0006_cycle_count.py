@@ -0,0 +1,140 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0005_inventory_checkpoint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CycleCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Открыт"),
+                            ("reconciled", "Сверен"),
+                            ("cancelled", "Отменен"),
+                        ],
+                        default="open",
+                        max_length=20,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "reconciled_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "zone",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="cycle_counts",
+                        to="warehouse.zone",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Инвентаризация",
+                "verbose_name_plural": "Инвентаризации",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CycleCountLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("item_code", models.CharField(max_length=100)),
+                ("full_address", models.CharField(max_length=500)),
+                ("expected", models.PositiveIntegerField(default=0)),
+                ("counted", models.PositiveIntegerField(blank=True, null=True)),
+                ("counted_at", models.DateTimeField(blank=True, null=True)),
+                ("adjustment", models.IntegerField(default=0)),
+                (
+                    "count",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="warehouse.cyclecount",
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="warehouse.item",
+                    ),
+                ),
+                (
+                    "place",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="warehouse.place",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Строка инвентаризации",
+                "verbose_name_plural": "Строки инвентаризации",
+                "ordering": ["full_address", "item_code"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="cyclecount",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "open")),
+                fields=("zone",),
+                name="cyclecount_one_open_per_zone",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="cyclecountline",
+            constraint=models.UniqueConstraint(
+                fields=("count", "place", "item"), name="cyclecountline_pair"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0006_cycle_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="place",
+            name="capacity",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Вместимость, шт"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0007_place_capacity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="place",
+            name="pick_sequence",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Порядок обхода"
+            ),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="walk_sequence",
+            field=models.PositiveIntegerField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="Маршрут обхода",
+            ),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="x",
+            field=models.FloatField(blank=True, null=True, verbose_name="X, м"),
+        ),
+        migrations.AddField(
+            model_name="place",
+            name="y",
+            field=models.FloatField(blank=True, null=True, verbose_name="Y, м"),
+        ),
+        migrations.AddField(
+            model_name="zone",
+            name="pick_sequence",
+            field=models.PositiveIntegerField(
+                blank=True, null=True, verbose_name="Порядок обхода"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0008_walk_sequence"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="placeitem",
+            name="reserved",
+            field=models.PositiveIntegerField(
+                db_default=0, default=0, verbose_name="Резерв подбора"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0009_place_item_reserved"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="syncevent",
+            name="key",
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="syncevent",
+            constraint=models.UniqueConstraint(
+                fields=("user", "key"), name="sync_event_user_key", nulls_distinct=False
+            ),
+        ),
+    ]
@@ -61,6 +61,10 @@ class Place(models.Model):
     description: str: len(description) <= 500
     created_at: datetime: 2000-01-02 10:30:45.123456+00:00
     zone: Zone
+    capacity: int | None: вместимость в единицах товара, None - не ограничена
+    pick_sequence: int | None: порядок обхода места в зоне
+    x, y: float | None: координаты места на плане склада, м
+    walk_sequence: int | None: порядок места в маршруте обхода склада (вычисляется)
     """
 
     title = models.CharField(max_length=100)
@@ -73,6 +77,17 @@ class Place(models.Model):
         null=True,
         blank=True,
     )
+    capacity = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Вместимость, шт"
+    )
+    pick_sequence = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Порядок обхода"
+    )
+    x = models.FloatField(null=True, blank=True, verbose_name="X, м")
+    y = models.FloatField(null=True, blank=True, verbose_name="Y, м")
+    walk_sequence = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, db_index=True, verbose_name="Маршрут обхода"
+    )
 
     def save(self, *args, **kwargs):
         """Приводит код места к верхнему регистру перед сохранением"""
@@ -105,6 +120,20 @@ class Place(models.Model):
                 parts.insert(0, self.zone.stock.title)
         return "/".join(parts)
 
+    @property
+    def item_status(self) -> str:
+        """
+        Статус товара на месте (PlaceItem.status):
+        блокировочные места BS01/BS02 - "blk", технические INBOUND/OUTBOUND/NEW -
+        одноименный статус, остальные места хранения - "ok"
+        """
+        title = (self.title or "").strip().upper()
+        if title in ("BS01", "BS02"):
+            return "blk"
+        if title in ("INBOUND", "OUTBOUND", "NEW"):
+            return title.lower()
+        return "ok"
+
     class Meta:
         ordering = ["title"]
         verbose_name = "Место"
@@ -126,6 +155,7 @@ class PlaceItem(models.Model):
     place: Place
     item: Item
     quantity: int
+    reserved: int: зарезервировано под задачи подбора, остается на месте до подтверждения
     """
 
     place = models.ForeignKey(
@@ -133,6 +163,9 @@ class PlaceItem(models.Model):
     )
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="place_items")
     quantity = models.PositiveIntegerField(default=1)
+    reserved = models.PositiveIntegerField(
+        default=0, db_default=0, verbose_name="Резерв подбора"
+    )
     full_address = models.CharField(max_length=500, blank=True, db_index=True)
     STATUSES_CHOICES = [
         ("inbound", "inbound"),
@@ -162,11 +195,9 @@ class PlaceItem(models.Model):
                 parts.insert(0, self.place.zone.stock.title)
         self.full_address = "/".join(parts)
 
-        address = self.place.title.lower().strip()
-        if address in ("BS01", "BS02"):
-            self.status = "block"
-        elif address in ("inbound", "outbound", "new"):
-            self.status = address
+        status = self.place.item_status
+        if status != "ok":
+            self.status = status
 
         super().save(*args, **kwargs)
 
@@ -192,6 +223,7 @@ class Zone(models.Model):
     description: str: len(description) <= 500
     created_at: datetime: 2000-01-02 10:30:45.123456+00:00
     stock: Stock
+    pick_sequence: int | None: порядок обхода зоны на складе
     """
 
     title = models.CharField(max_length=100)
@@ -204,6 +236,9 @@ class Zone(models.Model):
         null=True,
         blank=True,
     )
+    pick_sequence = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Порядок обхода"
+    )
 
     def save(self, *args, **kwargs):
         """Приводит код зоны к верхнему регистру перед сохранением"""
@@ -316,3 +351,361 @@ class History(models.Model):
 
     def __str__(self):
         return f"History #{self.pk}"
+
+
+class SyncEvent(models.Model):
+    """
+    Событие офлайн-синхронизации ТСД с ключом идемпотентности
+    Повторная отправка события с тем же ключом не применяется заново,
+    а возвращает сохраненный результат
+
+    pk: int
+    key: str: ключ, сгенерированный устройством (uuid), уникален в пределах пользователя
+    user: User
+    event_type: str: move / confirm
+    payload: dict: событие как его прислало устройство
+    status: str: pending / applied / partial / mismatch / rejected
+    result: dict: результат применения
+    created_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    """
+
+    key = models.CharField(max_length=64)
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.SET_NULL, null=True, blank=True
+    )
+    event_type = models.CharField(max_length=20)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, default="pending")
+    result = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-pk"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="sync_event_user_key", nulls_distinct=False
+            )
+        ]
+        verbose_name = "Событие синхронизации"
+        verbose_name_plural = "События синхронизации"
+
+    def __str__(self):
+        return f"{self.event_type} {self.key}"
+
+
+class PlaceItemChange(models.Model):
+    """
+    Журнал изменений стока (PlaceItem) для инкрементальной синхронизации
+
+    Строки пишут триггеры БД на любую запись в PlaceItem:
+    ORM, set-based SQL сервисов, админка.
+    Ревизия присваивается при публикации (publish_place_item_changes)
+    в порядке фиксации транзакций, поэтому читатель ленты по ревизии
+    не пропускает изменения параллельных транзакций
+
+    pk: int
+    revision: int: номер ревизии, None - еще не опубликовано
+    txid: int: транзакция, записавшая изменение
+    place_item_id: int
+    place_id: int
+    item_id: int
+    item_code: str
+    full_address: str
+    quantity: int
+    status: str
+    deleted: bool: сток удален с адреса
+    changed_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    """
+
+    revision = models.BigIntegerField(null=True, blank=True, unique=True)
+    txid = models.BigIntegerField()
+    place_item_id = models.BigIntegerField()
+    place_id = models.BigIntegerField()
+    item_id = models.BigIntegerField()
+    item_code = models.CharField(max_length=100, blank=True)
+    full_address = models.CharField(max_length=500, blank=True)
+    quantity = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, blank=True)
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["revision"]
+        indexes = [
+            models.Index(fields=["place_id", "item_id", "revision"]),
+            models.Index(
+                fields=["txid", "id"],
+                name="placeitemchange_pending",
+                condition=models.Q(revision__isnull=True),
+            ),
+        ]
+        verbose_name = "Изменение стока"
+        verbose_name_plural = "Изменения стока"
+
+    def __str__(self):
+        return f"rev {self.revision}: {self.item_code} @ {self.full_address}"
+
+
+class WebhookEndpoint(models.Model):
+    """
+    Внешняя система, получающая события склада (вебхук)
+
+    pk: int
+    title: str
+    url: str: адрес, на который POST-ом отправляются пакеты событий
+    secret: str: ключ подписи тела запроса (заголовок X-Signature, HMAC-SHA256)
+    event_types: list[str]: типы событий, пусто - все
+    is_active: bool
+    created_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    """
+
+    title = models.CharField(max_length=100)
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=200, blank=True)
+    event_types = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["pk"]
+        verbose_name = "Вебхук"
+        verbose_name_plural = "Вебхуки"
+
+    def __str__(self):
+        return f"{self.title}"
+
+
+class OutboxEvent(models.Model):
+    """
+    Событие склада, записанное в транзакции изменения (transactional outbox)
+    Доставляется внешним системам фоновым процессом deliver_webhooks
+
+    pk: int
+    event_type: str: wave.status_changed / stock.moved
+    payload: dict
+    created_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    """
+
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["pk"]
+        verbose_name = "Событие"
+        verbose_name_plural = "События"
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk}"
+
+
+class OutboxDelivery(models.Model):
+    """
+    Доставка события на один вебхук
+
+    pk: int
+    event: OutboxEvent
+    endpoint: WebhookEndpoint
+    status: str: pending / delivered / failed
+    attempts: int: кол-во неудачных попыток
+    next_attempt_at: datetime: время следующей попытки
+    delivered_at: datetime
+    last_error: str
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Ожидает"),
+        ("delivered", "Доставлено"),
+        ("failed", "Ошибка"),
+    ]
+
+    event = models.ForeignKey(
+        OutboxEvent, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    endpoint = models.ForeignKey(
+        WebhookEndpoint, on_delete=models.CASCADE, related_name="deliveries"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField()
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["pk"]
+        indexes = [
+            models.Index(
+                fields=["endpoint", "next_attempt_at", "id"],
+                name="outboxdelivery_pending",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+        verbose_name = "Доставка события"
+        verbose_name_plural = "Доставки событий"
+
+    def __str__(self):
+        return f"{self.event} -> {self.endpoint}"
+
+
+class InventoryCheckpoint(models.Model):
+    """
+    Снимок стока на ревизию журнала изменений (PlaceItemChange)
+    Состояние стока на любой момент восстанавливается от ближайшего
+    предыдущего снимка повтором журнала (inventory_as_of)
+
+    pk: int
+    revision: int: в снимок вошли все изменения с ревизией <= revision
+    taken_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    lines: int: кол-во строк снимка
+    """
+
+    revision = models.BigIntegerField(unique=True)
+    taken_at = models.DateTimeField(db_index=True)
+    lines = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-taken_at"]
+        verbose_name = "Снимок стока"
+        verbose_name_plural = "Снимки стока"
+
+    def __str__(self):
+        return f"{self.taken_at:%Y-%m-%d %H:%M:%S} (rev {self.revision})"
+
+
+class InventoryCheckpointLine(models.Model):
+    """
+    Строка снимка стока: количество пары (место, товар)
+    Адрес и код товара хранятся на момент снимка:
+    переименование и удаление мест не меняет историю
+
+    pk: int
+    checkpoint: InventoryCheckpoint
+    place_id: int
+    item_id: int
+    item_code: str
+    full_address: str
+    quantity: int
+    status: str
+    """
+
+    checkpoint = models.ForeignKey(
+        InventoryCheckpoint, on_delete=models.CASCADE, related_name="+"
+    )
+    place_id = models.BigIntegerField()
+    item_id = models.BigIntegerField()
+    item_code = models.CharField(max_length=100, blank=True)
+    full_address = models.CharField(max_length=500, blank=True)
+    quantity = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["checkpoint", "place_id", "item_id"],
+                name="inventorycheckpointline_pair",
+            )
+        ]
+        verbose_name = "Строка снимка стока"
+        verbose_name_plural = "Строки снимков стока"
+
+    def __str__(self):
+        return f"{self.item_code} @ {self.full_address}: {self.quantity}"
+
+
+class CycleCount(models.Model):
+    """
+    Инвентаризация зоны (цикловой пересчет)
+
+    При создании ожидаемые количества зоны фиксируются в строках пересчета,
+    дальше склад работает как обычно: пересчет ничего не блокирует.
+    Сверка применяет разницу "посчитано - ожидалось" к текущему стоку,
+    поэтому перемещения во время пересчета не теряются
+
+    pk: int
+    zone: Zone
+    status: str: open / reconciled / cancelled
+    created_by: User
+    created_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    reconciled_by: User
+    reconciled_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    """
+
+    STATUS_CHOICES = [
+        ("open", "Открыт"),
+        ("reconciled", "Сверен"),
+        ("cancelled", "Отменен"),
+    ]
+
+    zone = models.ForeignKey(Zone, on_delete=models.PROTECT, related_name="cycle_counts")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="open")
+    created_by = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    reconciled_by = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["zone"],
+                condition=models.Q(status="open"),
+                name="cyclecount_one_open_per_zone",
+            )
+        ]
+        verbose_name = "Инвентаризация"
+        verbose_name_plural = "Инвентаризации"
+
+    def __str__(self):
+        return f"COUNT-{self.pk}"
+
+
+class CycleCountLine(models.Model):
+    """
+    Строка инвентаризации: пара (место, товар) зоны
+
+    pk: int
+    count: CycleCount
+    place: Place
+    item: Item
+    item_code: str
+    full_address: str
+    expected: int: количество на момент создания инвентаризации
+    counted: int: посчитано, None - пара не считалась
+    counted_at: datetime: 2000-01-02 10:30:45.123456+00:00
+    adjustment: int: примененная при сверке корректировка стока
+    """
+
+    count = models.ForeignKey(CycleCount, on_delete=models.CASCADE, related_name="lines")
+    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name="+")
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="+")
+    item_code = models.CharField(max_length=100)
+    full_address = models.CharField(max_length=500)
+    expected = models.PositiveIntegerField(default=0)
+    counted = models.PositiveIntegerField(null=True, blank=True)
+    counted_at = models.DateTimeField(null=True, blank=True)
+    adjustment = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["full_address", "item_code"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["count", "place", "item"], name="cyclecountline_pair"
+            )
+        ]
+        verbose_name = "Строка инвентаризации"
+        verbose_name_plural = "Строки инвентаризации"
+
+    def __str__(self):
+        return f"{self.item_code} @ {self.full_address}: {self.expected} / {self.counted}"
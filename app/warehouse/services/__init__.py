@@ -0,0 +1,12 @@
+from .outbox import *
+from .place_items import *
+from .search import *
+from .address_cache import *
+from .scan import *
+from .sync import *
+from .changes import *
+from .inventory_history import *
+from .cycle_counts import *
+from .webhooks import *
+from .putaway import *
+from .walk import *
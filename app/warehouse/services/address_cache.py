@@ -0,0 +1,119 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from warehouse.models import Place
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cache = {"addresses": None, "loaded_at": 0.0}
+
+
+def normalize_address(address: str) -> str:
+    """Адрес в виде, в котором он хранится: части без пробелов, верхний регистр"""
+    return "/".join(part.strip() for part in address.upper().split("/") if part.strip())
+
+
+def _full_address(title: str, zone_title: str | None, stock_title: str | None) -> str:
+    """Полный адрес места из названий (как Place.full_address)"""
+    parts = [title]
+    if zone_title is not None:
+        parts.insert(0, zone_title)
+        if stock_title is not None:
+            parts.insert(0, stock_title)
+    return "/".join(parts)
+
+
+def _load_addresses() -> dict[str, int]:
+    """Все полные адреса мест {"СКЛАД/ЗОНА/МЕСТО": place_id} одним запросом"""
+    addresses = {}
+    rows = Place.objects.values_list("id", "title", "zone__title", "zone__stock__title")
+    for place_id, title, zone_title, stock_title in rows.iterator(chunk_size=5000):
+        addresses[_full_address(title, zone_title, stock_title)] = place_id
+    return addresses
+
+
+def _addresses() -> dict[str, int]:
+    with _lock:
+        expired = time.monotonic() - _cache["loaded_at"] > settings.ADDRESS_CACHE_TTL
+        if _cache["addresses"] is None or expired:
+            _cache["addresses"] = _load_addresses()
+            _cache["loaded_at"] = time.monotonic()
+            logger.debug("_addresses(): loaded %s", len(_cache["addresses"]))
+        return _cache["addresses"]
+
+
+def invalidate_address_cache():
+    """Сброс кеша адресов процесса (изменение структуры склада)"""
+    with _lock:
+        _cache["addresses"] = None
+
+
+def _find_place_id(address: str) -> int | None:
+    """id места по нормализованному полному адресу запросом в БД"""
+    parts = address.split("/")
+    if len(parts) > 3:
+        return None
+    filters = {"title": parts[-1], "zone__isnull": len(parts) < 2}
+    if len(parts) >= 2:
+        filters["zone__title"] = parts[-2]
+        filters["zone__stock__isnull"] = len(parts) < 3
+    if len(parts) == 3:
+        filters["zone__stock__title"] = parts[0]
+    return Place.objects.filter(**filters).values_list("id", flat=True).first()
+
+
+def place_id_by_address(address: str) -> int | None:
+    """
+    id места по полному адресу из кеша процесса
+    Кеш сбрасывается сигналами структуры в своем процессе
+    и перечитывается по ADDRESS_CACHE_TTL в остальных.
+    Место, созданное другим процессом, до перечитывания ищется в БД
+    Для записи остатков - place_ids_by_addresses()
+    """
+    address = normalize_address(address)
+    place_id = _addresses().get(address)
+    if place_id is not None:
+        return place_id
+
+    place_id = _find_place_id(address)
+    if place_id is not None:
+        with _lock:
+            if _cache["addresses"] is not None:
+                _cache["addresses"][address] = place_id
+    return place_id
+
+
+def place_ids_by_addresses(addresses) -> dict[str, int | None]:
+    """
+    id мест по полным адресам для записи остатков {address: place_id}
+    Кеш процесса может отставать от структуры склада до ADDRESS_CACHE_TTL
+    (место переименовано или перенесено в другом процессе),
+    поэтому найденные в кеше места сверяются с текущими адресами одним запросом,
+    расхождения ищутся в БД, а кеш процесса сбрасывается
+    """
+    cached = {address: place_id_by_address(address) for address in addresses}
+    rows = Place.objects.filter(pk__in=[pk for pk in cached.values() if pk]).values_list(
+        "id", "title", "zone__title", "zone__stock__title"
+    )
+    actual = {
+        place_id: _full_address(title, zone_title, stock_title)
+        for place_id, title, zone_title, stock_title in rows
+    }
+
+    place_ids, stale = {}, False
+    for address, place_id in cached.items():
+        normalized = normalize_address(address)
+        if place_id is not None and actual.get(place_id) == normalized:
+            place_ids[address] = place_id
+            continue
+        stale = stale or place_id is not None
+        place_ids[address] = _find_place_id(normalized)
+
+    if stale:
+        logger.debug("place_ids_by_addresses(): stale cache")
+        invalidate_address_cache()
+    return place_ids
@@ -0,0 +1,116 @@
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from warehouse.models import InventoryCheckpoint, PlaceItemChange
+
+logger = logging.getLogger(__name__)
+
+CHANGE_TABLE = PlaceItemChange._meta.db_table
+CHECKPOINT_TABLE = InventoryCheckpoint._meta.db_table
+# ключ pg_advisory_xact_lock публикации журнала
+PUBLISH_LOCK_KEY = 4201
+
+CHANGE_FIELDS = (
+    "revision",
+    "place_id",
+    "item_id",
+    "item_code",
+    "full_address",
+    "quantity",
+    "status",
+    "deleted",
+)
+
+
+def publish_place_item_changes() -> int:
+    """
+    Присвоение ревизий записанным триггерами изменениям стока
+
+    Публикуются только изменения транзакций старше xmin текущего снимка:
+    такие транзакции уже завершены, и ни одно изменение с меньшим txid
+    больше не появится. Ревизии идут подряд в порядке (txid, id),
+    поэтому читатель ленты, продолжающий с последней полученной ревизии,
+    ничего не пропускает. Публикация сериализуется advisory-блокировкой
+    Возвращает кол-во опубликованных изменений
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK_KEY])
+        cursor.execute(
+            f"""
+            WITH pending AS (
+                SELECT id, row_number() OVER (ORDER BY txid, id) AS rn
+                FROM {CHANGE_TABLE}
+                WHERE revision IS NULL
+                  AND txid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+            ),
+            head AS (
+                SELECT COALESCE(MAX(revision), 0) AS revision FROM {CHANGE_TABLE}
+            )
+            UPDATE {CHANGE_TABLE} c
+            SET revision = head.revision + pending.rn
+            FROM pending, head
+            WHERE c.id = pending.id
+            """
+        )
+        published = cursor.rowcount
+
+    if published:
+        logger.debug("publish_place_item_changes(): %s", published)
+    return published
+
+
+def place_item_changes_head() -> int:
+    """Последняя опубликованная ревизия"""
+    head = PlaceItemChange.objects.filter(revision__isnull=False).order_by("-revision")
+    return head.values_list("revision", flat=True).first() or 0
+
+
+def iter_place_item_changes(since: int, limit: int | None = None):
+    """Опубликованные изменения стока после ревизии since, по возрастанию ревизии"""
+    qs = (
+        PlaceItemChange.objects.filter(revision__gt=since)
+        .order_by("revision")
+        .values_list(*CHANGE_FIELDS)
+    )
+    if limit:
+        qs = qs[:limit]
+    for row in qs.iterator(chunk_size=5000):
+        yield dict(zip(CHANGE_FIELDS, row))
+
+
+def compact_place_item_changes(days: int) -> int:
+    """
+    Компактизация журнала: из изменений старше days дней удаляются те,
+    что перекрыты более поздним изменением той же пары (место, товар).
+    Последнее состояние каждой пары, включая удаления, остается, поэтому
+    читатель с любой ревизии по-прежнему приходит к актуальному стоку
+    Удаляются только изменения, вошедшие в снимок стока (InventoryCheckpoint):
+    изменения после последнего снимка нужны для восстановления стока на момент
+    Возвращает кол-во удаленных изменений
+    """
+    publish_place_item_changes()
+    cutoff = timezone.now() - timedelta(days=days)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            DELETE FROM {CHANGE_TABLE} c
+            USING (
+                SELECT id, revision,
+                       MAX(revision) OVER (PARTITION BY place_id, item_id) AS latest
+                FROM {CHANGE_TABLE}
+                WHERE revision IS NOT NULL
+            ) v
+            WHERE c.id = v.id
+              AND v.revision < v.latest
+              AND c.changed_at < %s
+              AND c.revision <= (SELECT COALESCE(MAX(revision), 0) FROM {CHECKPOINT_TABLE})
+            """,
+            [cutoff],
+        )
+        removed = cursor.rowcount
+
+    logger.debug("compact_place_item_changes(): days = %s, removed = %s", days, removed)
+    return removed
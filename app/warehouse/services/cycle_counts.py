@@ -0,0 +1,339 @@
+import logging
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from warehouse.models import (CycleCount, CycleCountLine, History, Item, Place,
+                              PlaceItem, Zone)
+
+from .address_cache import normalize_address, place_ids_by_addresses
+
+logger = logging.getLogger(__name__)
+
+LINE_TABLE = CycleCountLine._meta.db_table
+PLACE_ITEM_TABLE = PlaceItem._meta.db_table
+
+# расхождения: посчитанные пары и непосчитанные пары посчитанных мест (= 0)
+# место считается посчитанным, если по нему записан хотя бы один подсчет
+_VARIANCE_SQL = f"""
+    WITH counted_places AS (
+        SELECT DISTINCT place_id FROM {LINE_TABLE}
+        WHERE count_id = %(count)s AND counted IS NOT NULL
+    )
+    SELECT l.id, l.place_id, l.item_id, l.item_code, l.full_address, l.expected,
+           COALESCE(l.counted, 0) AS counted,
+           COALESCE(l.counted, 0) - l.expected AS variance
+    FROM {LINE_TABLE} l
+    JOIN counted_places cp ON cp.place_id = l.place_id
+    WHERE l.count_id = %(count)s AND COALESCE(l.counted, 0) <> l.expected
+    ORDER BY l.full_address, l.item_code
+"""
+VARIANCE_FIELDS = (
+    "id",
+    "place_id",
+    "item_id",
+    "item_code",
+    "full_address",
+    "expected",
+    "counted",
+    "variance",
+)
+
+
+def start_cycle_count(*, zone: Zone, user) -> CycleCount:
+    """
+    Создание инвентаризации зоны: ожидаемые количества всех пар зоны
+    фиксируются одним INSERT ... SELECT из PlaceItem (без блокировок стока)
+    """
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            count = CycleCount.objects.create(zone=zone, created_by=user)
+            cursor.execute(
+                f"""
+                INSERT INTO {LINE_TABLE}
+                    (count_id, place_id, item_id, item_code, full_address,
+                     expected, adjustment)
+                SELECT %s, pi.place_id, pi.item_id, i.item_code, pi.full_address,
+                       pi.quantity, 0
+                FROM {PLACE_ITEM_TABLE} pi
+                JOIN {Place._meta.db_table} p ON p.id = pi.place_id
+                JOIN {Item._meta.db_table} i ON i.id = pi.item_id
+                WHERE p.zone_id = %s
+                """,
+                [count.pk, zone.pk],
+            )
+            lines = cursor.rowcount
+    except IntegrityError:
+        raise Exception(f"По зоне {zone.full_address} уже идет инвентаризация")
+
+    logger.debug("start_cycle_count(): %s zone = %s, lines = %s", count, zone.pk, lines)
+    return count
+
+
+def _open_count(count_id) -> CycleCount:
+    """Открытая инвентаризация, заблокированная до конца транзакции"""
+    count = CycleCount.objects.select_for_update().filter(pk=count_id).first()
+    if count is None:
+        raise Exception("Инвентаризация не найдена")
+    if count.status != "open":
+        raise Exception(
+            f"Инвентаризация {count} в статусе «{count.get_status_display()}»"
+        )
+    return count
+
+
+def record_cycle_counts(*, count_id, counts: list[dict]) -> dict:
+    """
+    Запись пакета подсчетов ТСД [{address, item_code, quantity}]
+    quantity - итоговое количество пары: повторный подсчет заменяет прежний,
+    поэтому пакет можно безопасно отправить повторно.
+    Товары, которых не ожидалось на месте, добавляются строками с expected = 0
+    Все подсчеты пакета записываются одним INSERT ... ON CONFLICT DO UPDATE
+
+    Возвращает {"recorded": кол-во, "rejected": [{address, item_code, error}]}
+    """
+    codes = {entry["item_code"].strip().upper() for entry in counts}
+    item_ids = dict(Item.objects.filter(item_code__in=codes).values_list("item_code", "id"))
+
+    with transaction.atomic():
+        count = _open_count(count_id)
+        addresses = {normalize_address(entry["address"]) for entry in counts}
+        place_ids = place_ids_by_addresses(addresses)
+        zone_places = set(
+            Place.objects.filter(
+                pk__in=[pk for pk in place_ids.values() if pk], zone_id=count.zone_id
+            ).values_list("pk", flat=True)
+        )
+
+        pairs, rejected = {}, []
+        for entry in counts:
+            address = normalize_address(entry["address"])
+            item_code = entry["item_code"].strip().upper()
+            place_id = place_ids.get(address)
+            if place_id is None:
+                error = "Не удалось определить место"
+            elif place_id not in zone_places:
+                error = "Место не относится к зоне инвентаризации"
+            elif item_code not in item_ids:
+                error = "Товар с таким кодом не найден"
+            else:
+                # повтор пары в пакете: действует последний подсчет
+                pairs[(place_id, item_ids[item_code])] = (
+                    item_code,
+                    address,
+                    entry["quantity"],
+                )
+                continue
+            rejected.append(
+                {"address": entry["address"], "item_code": entry["item_code"], "error": error}
+            )
+
+        if pairs:
+            keys = list(pairs)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {LINE_TABLE} AS l
+                        (count_id, place_id, item_id, item_code, full_address,
+                         expected, counted, counted_at, adjustment)
+                    SELECT %s, r.place_id, r.item_id, r.item_code, r.address,
+                           0, r.qty, now(), 0
+                    FROM unnest(%s::bigint[], %s::bigint[], %s::varchar[],
+                                %s::varchar[], %s::integer[])
+                        AS r(place_id, item_id, item_code, address, qty)
+                    ON CONFLICT (count_id, place_id, item_id) DO UPDATE
+                        SET counted = EXCLUDED.counted, counted_at = EXCLUDED.counted_at
+                    """,
+                    [
+                        count.pk,
+                        [place_id for place_id, _ in keys],
+                        [item_id for _, item_id in keys],
+                        [pairs[key][0] for key in keys],
+                        [pairs[key][1] for key in keys],
+                        [pairs[key][2] for key in keys],
+                    ],
+                )
+
+    logger.debug(
+        "record_cycle_counts(): %s recorded = %s, rejected = %s",
+        count,
+        len(pairs),
+        len(rejected),
+    )
+    return {"recorded": len(pairs), "rejected": rejected}
+
+
+def cycle_count_variances(count: CycleCount) -> list[dict]:
+    """Расхождения инвентаризации одним запросом (см. _VARIANCE_SQL)"""
+    with connection.cursor() as cursor:
+        cursor.execute(_VARIANCE_SQL, {"count": count.pk})
+        return [dict(zip(VARIANCE_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def _apply_surplus(rows: list[dict]) -> dict[int, int]:
+    """Излишки: INSERT ... ON CONFLICT DO UPDATE по всем парам сразу"""
+    if not rows:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {PLACE_ITEM_TABLE} AS pi
+                (place_id, item_id, quantity, full_address, status)
+            SELECT r.place_id, r.item_id, r.qty, r.address, 'ok'
+            FROM unnest(%s::bigint[], %s::bigint[], %s::integer[], %s::varchar[])
+                AS r(place_id, item_id, qty, address)
+            ON CONFLICT (place_id, item_id) DO UPDATE
+                SET quantity = pi.quantity + EXCLUDED.quantity
+            """,
+            [
+                [row["place_id"] for row in rows],
+                [row["item_id"] for row in rows],
+                [row["variance"] for row in rows],
+                [row["full_address"] for row in rows],
+            ],
+        )
+    return {row["id"]: row["variance"] for row in rows}
+
+
+def _apply_shortage(rows: list[dict]) -> tuple[dict[int, int], dict[int, int]]:
+    """
+    Недостачи: UPDATE ... FROM по всем парам сразу, списывается не больше,
+    чем лежит сейчас, и не больше свободного остатка (quantity - reserved):
+    резерв принадлежит открытым задачам подбора, его снимает подтверждение
+    или отмена подбора. Опустевшие заселения удаляются
+    Возвращает ({id строки инвентаризации: примененная корректировка (< 0)},
+                {id строки: недостача, не списанная из-за резерва})
+    """
+    if not rows:
+        return {}, {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH req AS (
+                SELECT * FROM unnest(%s::bigint[], %s::bigint[], %s::bigint[], %s::integer[])
+                    AS r(line_id, place_id, item_id, qty)
+            ),
+            src AS (
+                SELECT pi.id, req.line_id,
+                       LEAST(pi.quantity - pi.reserved, req.qty) AS taken,
+                       LEAST(pi.quantity, req.qty) - LEAST(pi.quantity - pi.reserved, req.qty)
+                           AS held
+                FROM {PLACE_ITEM_TABLE} pi
+                JOIN req ON req.place_id = pi.place_id AND req.item_id = pi.item_id
+                FOR UPDATE OF pi
+            )
+            UPDATE {PLACE_ITEM_TABLE} pi
+            SET quantity = pi.quantity - src.taken
+            FROM src
+            WHERE pi.id = src.id
+            RETURNING src.line_id, src.taken, src.held
+            """,
+            [
+                [row["id"] for row in rows],
+                [row["place_id"] for row in rows],
+                [row["item_id"] for row in rows],
+                [-row["variance"] for row in rows],
+            ],
+        )
+        applied, held = {}, {}
+        for line_id, taken, reserved in cursor.fetchall():
+            if taken:
+                applied[line_id] = -taken
+            if reserved:
+                held[line_id] = reserved
+        cursor.execute(
+            f"""
+            DELETE FROM {PLACE_ITEM_TABLE} pi
+            USING unnest(%s::bigint[], %s::bigint[]) AS r(place_id, item_id)
+            WHERE pi.place_id = r.place_id AND pi.item_id = r.item_id AND pi.quantity = 0
+            """,
+            [[row["place_id"] for row in rows], [row["item_id"] for row in rows]],
+        )
+    return applied, held
+
+
+def reconcile_cycle_count(*, count_id, user) -> dict:
+    """
+    Сверка инвентаризации в одной транзакции
+
+    - Расхождения считаются одним запросом (_VARIANCE_SQL)
+    - Разница "посчитано - ожидалось" применяется к текущему стоку:
+      излишки и недостачи - по одному запросу на все пары
+    - Зарезервированное под подбор не списывается: такая недостача
+      возвращается в reserved_lines для разбора вместе с задачами подбора
+    - Каждая корректировка записывается в историю перемещений
+      (с адреса / на адрес COUNT-<pk>) и в строку инвентаризации
+    Блокируются только корректируемые строки стока и только на время сверки
+
+    Возвращает {"lines": кол-во расхождений, "surplus": шт, "shortage": шт,
+                "reserved": шт, "reserved_lines": [{full_address, item_code, quantity}]}
+    """
+    with transaction.atomic():
+        count = _open_count(count_id)
+        variances = cycle_count_variances(count)
+        applied = _apply_surplus([row for row in variances if row["variance"] > 0])
+        shortage, held = _apply_shortage([row for row in variances if row["variance"] < 0])
+        applied.update(shortage)
+
+        line_ids = [row["id"] for row in variances]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {LINE_TABLE} l
+                SET adjustment = r.adjustment, counted = COALESCE(l.counted, 0)
+                FROM unnest(%s::bigint[], %s::integer[]) AS r(id, adjustment)
+                WHERE l.id = r.id
+                """,
+                [line_ids, [applied.get(line_id, 0) for line_id in line_ids]],
+            )
+
+        ledger = str(count)
+        History.objects.bulk_create(
+            History(
+                user=user,
+                item_code=row["item_code"],
+                old_address=ledger if applied[row["id"]] > 0 else row["full_address"],
+                new_address=row["full_address"] if applied[row["id"]] > 0 else ledger,
+                count=abs(applied[row["id"]]),
+            )
+            for row in variances
+            if applied.get(row["id"])
+        )
+
+        count.status = "reconciled"
+        count.reconciled_by = user
+        count.reconciled_at = timezone.now()
+        count.save(update_fields=["status", "reconciled_by", "reconciled_at"])
+
+    result = {
+        "lines": len(variances),
+        "surplus": sum(qty for qty in applied.values() if qty > 0),
+        "shortage": -sum(qty for qty in applied.values() if qty < 0),
+        "reserved": sum(held.values()),
+        "reserved_lines": [
+            {
+                "full_address": row["full_address"],
+                "item_code": row["item_code"],
+                "quantity": held[row["id"]],
+            }
+            for row in variances
+            if row["id"] in held
+        ],
+    }
+    if held:
+        logger.warning(
+            "reconcile_cycle_count(): %s shortage held by reservations: %s",
+            count,
+            result["reserved"],
+        )
+    logger.debug("reconcile_cycle_count(): %s %s", count, result)
+    return result
+
+
+def cancel_cycle_count(*, count_id) -> CycleCount:
+    """Отмена открытой инвентаризации без изменения стока"""
+    with transaction.atomic():
+        count = _open_count(count_id)
+        count.status = "cancelled"
+        count.save(update_fields=["status"])
+    return count
@@ -0,0 +1,187 @@
+import logging
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from warehouse.models import (InventoryCheckpoint, InventoryCheckpointLine,
+                              PlaceItemChange)
+
+from .changes import (PUBLISH_LOCK_KEY, place_item_changes_head,
+                      publish_place_item_changes)
+
+logger = logging.getLogger(__name__)
+
+CHANGE_TABLE = PlaceItemChange._meta.db_table
+LINE_TABLE = InventoryCheckpointLine._meta.db_table
+
+INVENTORY_FIELDS = (
+    "place_id",
+    "item_id",
+    "item_code",
+    "full_address",
+    "quantity",
+    "status",
+)
+
+
+def _state_sql(changes_where: str) -> str:
+    """
+    Состояние стока: строки снимка %(checkpoint)s, поверх которых
+    наложено последнее изменение каждой пары из журнала (changes_where)
+    Изменения в журнале - итоговое количество пары, а не приращение,
+    поэтому из журнала нужна только последняя запись пары
+    """
+    return f"""
+        WITH changes AS (
+            SELECT DISTINCT ON (place_id, item_id)
+                   place_id, item_id, item_code, full_address, quantity, status, deleted
+            FROM {CHANGE_TABLE}
+            WHERE {changes_where}
+            ORDER BY place_id, item_id, revision DESC NULLS FIRST, txid DESC, id DESC
+        )
+        SELECT COALESCE(c.place_id, b.place_id) AS place_id,
+               COALESCE(c.item_id, b.item_id) AS item_id,
+               COALESCE(c.item_code, b.item_code) AS item_code,
+               COALESCE(c.full_address, b.full_address) AS full_address,
+               CASE
+                   WHEN c.place_id IS NULL THEN b.quantity
+                   WHEN c.deleted THEN 0
+                   ELSE c.quantity
+               END AS quantity,
+               COALESCE(c.status, b.status) AS status
+        FROM (SELECT * FROM {LINE_TABLE} WHERE checkpoint_id = %(checkpoint)s) b
+        FULL JOIN changes c ON c.place_id = b.place_id AND c.item_id = b.item_id
+    """
+
+
+def take_inventory_checkpoint() -> InventoryCheckpoint:
+    """
+    Снимок стока на последнюю опубликованную ревизию журнала
+    Снимок строится из предыдущего снимка и изменений после него
+    (INSERT ... SELECT, без чтения PlaceItem). Публикация ревизий на время
+    снимка блокируется, если изменений не было - возвращается предыдущий снимок
+    """
+    publish_place_item_changes()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUBLISH_LOCK_KEY])
+        head = place_item_changes_head()
+        previous = InventoryCheckpoint.objects.order_by("-revision").first()
+        if previous and previous.revision == head:
+            return previous
+
+        checkpoint = InventoryCheckpoint.objects.create(
+            revision=head, taken_at=timezone.now()
+        )
+        state_sql = _state_sql("revision > %(since)s AND revision <= %(head)s")
+        cursor.execute(
+            f"""
+            INSERT INTO {LINE_TABLE}
+                (checkpoint_id, place_id, item_id, item_code, full_address, quantity, status)
+            SELECT %(new)s, s.place_id, s.item_id, s.item_code, s.full_address,
+                   s.quantity, s.status
+            FROM ({state_sql}) s
+            WHERE s.quantity > 0
+            """,
+            {
+                "new": checkpoint.pk,
+                "checkpoint": previous.pk if previous else None,
+                "since": previous.revision if previous else 0,
+                "head": head,
+            },
+        )
+        checkpoint.lines = cursor.rowcount
+        checkpoint.save(update_fields=["lines"])
+
+    logger.debug(
+        "take_inventory_checkpoint(): revision = %s, lines = %s",
+        checkpoint.revision,
+        checkpoint.lines,
+    )
+    return checkpoint
+
+
+def purge_inventory_checkpoints(days: int) -> int:
+    """Удаление снимков старше days дней (последний снимок остается всегда)"""
+    latest = InventoryCheckpoint.objects.order_by("-revision").first()
+    if latest is None:
+        return 0
+    cutoff = timezone.now() - timedelta(days=days)
+    removed, _ = (
+        InventoryCheckpoint.objects.filter(taken_at__lt=cutoff)
+        .exclude(pk=latest.pk)
+        .delete()
+    )
+    logger.debug("purge_inventory_checkpoints(): days = %s, removed = %s", days, removed)
+    return removed
+
+
+def inventory_as_of(
+    at: datetime, *, address: str = "", item_code: str = ""
+) -> tuple[InventoryCheckpoint | None, list[dict]]:
+    """
+    Сток на момент at: ближайший снимок не позже at + изменения журнала
+    с ревизией после снимка, начатые не позже at
+
+    address   - поддерево: склад, склад/зона или полный адрес места
+    item_code - точный код товара
+
+    Изменения старше CHANGE_FEED_RETENTION_DAYS компактизируются, поэтому
+    для более ранних моментов ответ точен на моменты снимков (ежедневно),
+    а между ними может показывать более позднее количество пары
+    Возвращает (использованный снимок, [{place_id, item_id, item_code,
+    full_address, quantity, status}]) по адресу и коду товара
+    """
+    checkpoint = (
+        InventoryCheckpoint.objects.filter(taken_at__lte=at).order_by("-taken_at").first()
+    )
+    # до первого снимка сток восстанавливается по журналу с начала,
+    # но только в окне без компактизации: раньше журнал неполон
+    earliest = None if checkpoint else InventoryCheckpoint.objects.order_by("taken_at").first()
+    if earliest and not inventory_as_of_exact(at):
+        raise Exception(f"История стока до {earliest.taken_at:%Y-%m-%d %H:%M:%S} не хранится")
+
+    filters, params = ["s.quantity > 0"], {
+        "checkpoint": checkpoint.pk if checkpoint else None,
+        "since": checkpoint.revision if checkpoint else 0,
+        "at": at,
+    }
+    if address:
+        # адрес целиком или его поддерево: "1/B" -> "1/B", "1/B/..."
+        filters.append(
+            "(s.full_address = %(address)s"
+            " OR left(s.full_address, %(prefix_len)s) = %(address)s || '/')"
+        )
+        params.update(address=address, prefix_len=len(address) + 1)
+    if item_code:
+        filters.append("s.item_code = %(item_code)s")
+        params["item_code"] = item_code
+
+    state_sql = _state_sql(
+        "(revision > %(since)s OR revision IS NULL) AND changed_at <= %(at)s"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT {", ".join(f"s.{field}" for field in INVENTORY_FIELDS)}
+            FROM ({state_sql}) s
+            WHERE {" AND ".join(filters)}
+            ORDER BY s.full_address, s.item_code
+            """,
+            params,
+        )
+        rows = [dict(zip(INVENTORY_FIELDS, row)) for row in cursor.fetchall()]
+
+    logger.debug(
+        "inventory_as_of(): at = %s, checkpoint = %s, rows = %s",
+        at,
+        checkpoint.pk if checkpoint else None,
+        len(rows),
+    )
+    return checkpoint, rows
+
+
+def inventory_as_of_exact(at: datetime) -> bool:
+    """Попадает ли момент в окно журнала без компактизации (ответ точен до секунды)"""
+    return at >= timezone.now() - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS)
@@ -0,0 +1,76 @@
+import json
+import logging
+
+from django.db import connection
+
+from warehouse.models import OutboxDelivery, OutboxEvent, WebhookEndpoint
+
+logger = logging.getLogger(__name__)
+
+EVENT_TABLE = OutboxEvent._meta.db_table
+DELIVERY_TABLE = OutboxDelivery._meta.db_table
+ENDPOINT_TABLE = WebhookEndpoint._meta.db_table
+
+# вебхук подписан на тип события: список типов пуст или содержит тип
+_SUBSCRIBED_SQL = "w.is_active AND (w.event_types = '[]'::jsonb OR w.event_types ? {type})"
+
+
+def subscribed(event_type: str) -> bool:
+    """Есть ли активные вебхуки на тип события (чтобы не собирать payload впустую)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {ENDPOINT_TABLE} w "
+            f"WHERE {_SUBSCRIBED_SQL.format(type='%s')})",
+            [event_type],
+        )
+        return cursor.fetchone()[0]
+
+
+def emit_events(events: list[tuple[str, dict]]):
+    """
+    Запись событий [(event_type, payload)] в outbox одним запросом
+    Вызывается внутри транзакции изменения: события фиксируются или
+    откатываются вместе с ним, HTTP-запросов в транзакции нет.
+    Доставки создаются сразу для всех подписанных вебхуков,
+    события без подписчиков не записываются
+    """
+    if not events:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH ev AS (
+                INSERT INTO {EVENT_TABLE} (event_type, payload, created_at)
+                SELECT e.event_type, e.payload::jsonb, now()
+                FROM unnest(%s::varchar[], %s::text[]) WITH ORDINALITY
+                    AS e(event_type, payload, n)
+                WHERE EXISTS (
+                    SELECT 1 FROM {ENDPOINT_TABLE} w
+                    WHERE {_SUBSCRIBED_SQL.format(type="e.event_type")}
+                )
+                ORDER BY e.n
+                RETURNING id, event_type
+            )
+            INSERT INTO {DELIVERY_TABLE}
+                (event_id, endpoint_id, status, attempts, next_attempt_at, last_error)
+            SELECT ev.id, w.id, 'pending', 0, now(), ''
+            FROM ev
+            JOIN {ENDPOINT_TABLE} w ON {_SUBSCRIBED_SQL.format(type="ev.event_type")}
+            """,
+            [
+                [event_type for event_type, _ in events],
+                [
+                    json.dumps(payload, ensure_ascii=False, default=str)
+                    for _, payload in events
+                ],
+            ],
+        )
+        if cursor.rowcount:
+            logger.debug(
+                "emit_events(): events = %s, deliveries = %s", len(events), cursor.rowcount
+            )
+
+
+def emit_event(event_type: str, payload: dict):
+    """Запись одного события в outbox"""
+    emit_events([(event_type, payload)])
@@ -0,0 +1,325 @@
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+
+from warehouse.models import Item, Place, PlaceItem
+
+from .outbox import emit_event, subscribed
+
+logger = logging.getLogger(__name__)
+
+PLACE_ITEM_TABLE = PlaceItem._meta.db_table
+
+
+def place_full_address(place: Place) -> str:
+    """Полный адрес места одним запросом (вместо обращений place.zone.stock)"""
+    place = Place.objects.select_related("zone__stock").get(pk=place.pk)
+    return place.full_address
+
+
+def _unnest_params(quantities: dict[int, int]) -> tuple[list[int], list[int]]:
+    """Раскладывает {item_id: quantity} на два массива для unnest()"""
+    item_ids = list(quantities.keys())
+    return item_ids, [quantities[item_id] for item_id in item_ids]
+
+
+def add_items_to_place(*, place: Place, quantities: dict[int, int], status: str):
+    """
+    Заселение товаров на место одним запросом
+    INSERT ... ON CONFLICT (place, item) DO UPDATE - к существующему
+    заселению прибавляется количество
+    """
+    logger.debug("add_items_to_place(): place = %s, lines = %s", place.pk, len(quantities))
+    if not quantities:
+        return
+
+    item_ids, qtys = _unnest_params(quantities)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {PLACE_ITEM_TABLE} AS pi
+                (place_id, item_id, quantity, full_address, status)
+            SELECT %s, req.item_id, req.qty, %s, %s
+            FROM unnest(%s::bigint[], %s::integer[]) AS req(item_id, qty)
+            WHERE req.qty > 0
+            ON CONFLICT (place_id, item_id) DO UPDATE
+                SET quantity = pi.quantity + EXCLUDED.quantity,
+                    status = EXCLUDED.status
+            """,
+            [place.pk, place_full_address(place), status, item_ids, qtys],
+        )
+
+
+def _delete_empty(place_item_ids: list[int]):
+    """Удаление опустевших заселений"""
+    if not place_item_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {PLACE_ITEM_TABLE} WHERE id = ANY(%s) AND quantity = 0",
+            [place_item_ids],
+        )
+
+
+def take_items_from_place(*, place: Place, quantities: dict[int, int]) -> dict[int, int]:
+    """
+    Снятие товаров с места одним UPDATE ... FROM
+    Снимается не больше свободного (не зарезервированного под подбор) количества,
+    опустевшие заселения удаляются
+    Возвращает {item_id: снятое количество}
+    """
+    logger.debug(
+        "take_items_from_place(): place = %s, lines = %s", place.pk, len(quantities)
+    )
+    if not quantities:
+        return {}
+
+    item_ids, qtys = _unnest_params(quantities)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH req AS (
+                SELECT item_id, qty
+                FROM unnest(%s::bigint[], %s::integer[]) AS r(item_id, qty)
+            ),
+            src AS (
+                SELECT pi.id, LEAST(pi.quantity - pi.reserved, req.qty) AS taken
+                FROM {PLACE_ITEM_TABLE} pi
+                JOIN req ON req.item_id = pi.item_id
+                WHERE pi.place_id = %s
+                FOR UPDATE OF pi
+            )
+            UPDATE {PLACE_ITEM_TABLE} pi
+            SET quantity = pi.quantity - src.taken
+            FROM src
+            WHERE pi.id = src.id
+            RETURNING pi.id, pi.item_id, src.taken
+            """,
+            [item_ids, qtys, place.pk],
+        )
+        rows = cursor.fetchall()
+
+    _delete_empty([pk for pk, _, _ in rows])
+    return {item_id: taken for _, item_id, taken in rows if taken > 0}
+
+
+def move_items_between_places(
+    *, from_place: Place, to_place: Place, quantities: dict[int, int], status: str
+) -> dict[int, int]:
+    """
+    Переселение товаров с места на место набором из трех запросов:
+    UPDATE ... FROM на источнике, DELETE опустевших, INSERT ... ON CONFLICT на приемнике
+    Возвращает {item_id: перемещенное количество}
+    """
+    moved = take_items_from_place(place=from_place, quantities=quantities)
+    add_items_to_place(place=to_place, quantities=moved, status=status)
+    if moved and subscribed("stock.moved"):
+        emit_stock_moved(from_place=from_place, to_place=to_place, moved=moved)
+    return moved
+
+
+def emit_stock_moved(*, from_place: Place, to_place: Place, moved: dict[int, int]):
+    """Событие stock.moved в outbox: адреса мест и перемещенные коды товаров"""
+    codes = dict(Item.objects.filter(pk__in=moved).values_list("id", "item_code"))
+    emit_event(
+        "stock.moved",
+        {
+            "from_address": place_full_address(from_place),
+            "to_address": place_full_address(to_place),
+            "items": [
+                {"item_code": codes[item_id], "quantity": quantity}
+                for item_id, quantity in moved.items()
+            ],
+        },
+    )
+
+
+def available_quantities(item_ids, source_status: str = "ok") -> dict[int, int]:
+    """
+    Доступный остаток по товарам {item_id: quantity} одним агрегирующим запросом
+    (без резерва подбора)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT item_id, SUM(quantity - reserved)
+            FROM {PLACE_ITEM_TABLE}
+            WHERE item_id = ANY(%s) AND status = %s
+            GROUP BY item_id
+            """,
+            [list(item_ids), source_status],
+        )
+        return {item_id: int(total) for item_id, total in cursor.fetchall()}
+
+
+# порядок списания с заселений товара:
+#   fifo - по pk заселения
+#   walk - сначала одно место, свободный остаток которого закрывает всю потребность
+#          (меньше остановок), затем по маршруту обхода склада;
+#          места вне маршрута - в конце по pk
+ALLOCATION_ORDER = {
+    "fifo": "pi.id",
+    "walk": (
+        "(p.walk_sequence IS NOT NULL AND pi.quantity - pi.reserved >= req.qty) DESC, "
+        "p.walk_sequence NULLS LAST, pi.id"
+    ),
+}
+
+
+def allocate_sources(
+    *,
+    quantities: dict[int, int],
+    source_status: str = "ok",
+    order: str = "fifo",
+    reserve: bool = False,
+) -> list[tuple[int, int, int, str, int | None]]:
+    """
+    Списание (reserve=True - резервирование под подбор) товаров с мест хранения
+    одним UPDATE ... FROM
+    Сколько взять с каждого заселения считается оконной функцией
+    по нарастающему итогу свободного остатка товара в порядке ALLOCATION_ORDER[order].
+    Зарезервированное количество остается на месте до подтверждения подбора
+    (см. pick_reserved_items)
+    Перед вызовом достаточность остатка проверяется через available_quantities()
+    Возвращает источники [(place_id, item_id, взято, full_address, walk_sequence)]
+    в порядке обхода
+    """
+    logger.debug(
+        "allocate_sources(): lines = %s, order = %s, reserve = %s",
+        len(quantities),
+        order,
+        reserve,
+    )
+    if not quantities:
+        return []
+
+    item_ids, qtys = _unnest_params(quantities)
+    update = (
+        "reserved = pi.reserved + alloc.taken"
+        if reserve
+        else "quantity = pi.quantity - alloc.taken"
+    )
+    with connection.cursor() as cursor:
+        # блокируем строки-источники, чтобы параллельное списание не пересчитало остаток
+        cursor.execute(
+            f"""
+            SELECT id FROM {PLACE_ITEM_TABLE}
+            WHERE item_id = ANY(%s) AND status = %s
+            ORDER BY id
+            FOR UPDATE
+            """,
+            [item_ids, source_status],
+        )
+        cursor.execute(
+            f"""
+            WITH req AS (
+                SELECT item_id, qty
+                FROM unnest(%s::bigint[], %s::integer[]) AS r(item_id, qty)
+            ),
+            src AS (
+                SELECT pi.id, pi.quantity - pi.reserved AS free, req.qty, p.walk_sequence,
+                       SUM(pi.quantity - pi.reserved) OVER (
+                           PARTITION BY pi.item_id ORDER BY {ALLOCATION_ORDER[order]}
+                       ) - (pi.quantity - pi.reserved) AS before
+                FROM {PLACE_ITEM_TABLE} pi
+                JOIN req ON req.item_id = pi.item_id
+                JOIN {Place._meta.db_table} p ON p.id = pi.place_id
+                WHERE pi.status = %s AND pi.quantity > pi.reserved
+            ),
+            alloc AS (
+                SELECT id, walk_sequence, LEAST(free, qty - before) AS taken
+                FROM src
+                WHERE before < qty
+            )
+            UPDATE {PLACE_ITEM_TABLE} pi
+            SET {update}
+            FROM alloc
+            WHERE pi.id = alloc.id
+            RETURNING pi.id, pi.place_id, pi.item_id, alloc.taken, pi.full_address,
+                      alloc.walk_sequence
+            """,
+            [item_ids, qtys, source_status],
+        )
+        rows = cursor.fetchall()
+
+    if not reserve:
+        _delete_empty([row[0] for row in rows])
+    rows.sort(key=lambda row: (row[5] is None, row[5] or 0, row[4], row[0]))
+    return [row[1:] for row in rows]
+
+
+def _pair_params(rows) -> tuple[list[int], list[int], list[int]]:
+    """[(place_id, item_id, quantity)] -> три массива для unnest(), повторы пар суммируются"""
+    pairs = {}
+    for place_id, item_id, quantity in rows:
+        pairs[(place_id, item_id)] = pairs.get((place_id, item_id), 0) + quantity
+    keys = list(pairs)
+    return (
+        [place_id for place_id, _ in keys],
+        [item_id for _, item_id in keys],
+        [pairs[key] for key in keys],
+    )
+
+
+def pick_reserved_items(rows) -> int:
+    """
+    Подбор зарезервированного товара [(place_id, item_id, quantity)] одним UPDATE ... FROM:
+    количество и резерв мест уменьшаются, опустевшие заселения удаляются.
+    Если на каком-то месте резерва или товара меньше, чем требуется,
+    выбрасывается ValidationError (вызывается в транзакции, изменения откатываются)
+    Возвращает кол-во пар
+    """
+    place_ids, item_ids, qtys = _pair_params(rows)
+    if not place_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {PLACE_ITEM_TABLE} pi
+            SET quantity = pi.quantity - r.qty, reserved = pi.reserved - r.qty
+            FROM unnest(%s::bigint[], %s::bigint[], %s::integer[]) AS r(place_id, item_id, qty)
+            WHERE pi.place_id = r.place_id AND pi.item_id = r.item_id
+              AND pi.reserved >= r.qty AND pi.quantity >= r.qty
+            RETURNING pi.id
+            """,
+            [place_ids, item_ids, qtys],
+        )
+        picked = [row[0] for row in cursor.fetchall()]
+    if len(picked) != len(place_ids):
+        raise ValidationError("На месте подбора нет зарезервированного количества товара")
+    _delete_empty(picked)
+    return len(picked)
+
+
+def release_reserved_items(rows) -> int:
+    """Снятие резерва подбора [(place_id, item_id, quantity)] одним UPDATE ... FROM"""
+    place_ids, item_ids, qtys = _pair_params(rows)
+    if not place_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {PLACE_ITEM_TABLE} pi
+            SET reserved = GREATEST(pi.reserved - r.qty, 0)
+            FROM unnest(%s::bigint[], %s::bigint[], %s::integer[]) AS r(place_id, item_id, qty)
+            WHERE pi.place_id = r.place_id AND pi.item_id = r.item_id
+            """,
+            [place_ids, item_ids, qtys],
+        )
+        return cursor.rowcount
+
+
+def allocate_items(
+    *, quantities: dict[int, int], source_status: str = "ok"
+) -> dict[int, int]:
+    """
+    Списание товаров с мест хранения в порядке pk (FIFO), см. allocate_sources()
+    Возвращает {item_id: списанное количество}
+    """
+    allocated = {}
+    for _, item_id, taken, _, _ in allocate_sources(
+        quantities=quantities, source_status=source_status
+    ):
+        allocated[item_id] = allocated.get(item_id, 0) + taken
+    return allocated
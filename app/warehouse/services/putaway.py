@@ -0,0 +1,269 @@
+import heapq
+import logging
+from bisect import bisect_left
+
+from django.db import connection, transaction
+
+from warehouse.models import History, Item, Place, PlaceItem, Stock, Zone
+
+from .outbox import emit_events, subscribed
+from .place_items import place_full_address, take_items_from_place
+
+logger = logging.getLogger(__name__)
+
+PLACE_ITEM_TABLE = PlaceItem._meta.db_table
+
+# технические адреса не участвуют в размещении
+TECHNICAL_PLACES = ("BS01", "BS02", "INBOUND", "OUTBOUND", "NEW")
+
+# ключ pg_advisory_xact_lock размещения: планы строятся и исполняются по очереди,
+# иначе два размещения выберут одно и то же свободное место
+PUTAWAY_LOCK_KEY = 4401
+
+# занятость мест склада и товары размещения, уже лежащие на каждом месте
+_INDEX_SQL = f"""
+    SELECT p.id, s.title || '/' || z.title || '/' || p.title, p.capacity,
+           COALESCE(SUM(pi.quantity), 0),
+           COALESCE(array_agg(pi.item_id) FILTER (WHERE pi.item_id = ANY(%(items)s)), '{{}}')
+    FROM {Place._meta.db_table} p
+    JOIN {Zone._meta.db_table} z ON z.id = p.zone_id
+    JOIN {Stock._meta.db_table} s ON s.id = z.stock_id
+    LEFT JOIN {PLACE_ITEM_TABLE} pi ON pi.place_id = p.id
+    WHERE z.stock_id = %(stock)s AND p.title <> ALL(%(technical)s)
+    GROUP BY p.id, s.title, z.title
+    ORDER BY 2
+"""
+
+
+def _free(place: dict) -> int | None:
+    """Свободная вместимость места, None - не ограничена"""
+    if place["capacity"] is None:
+        return None
+    return max(place["capacity"] - place["occupied"], 0)
+
+
+class PutawayIndex:
+    """
+    Индекс занятости мест склада для построения плана размещения
+    Строится одним агрегирующим запросом и обновляется по ходу планирования:
+
+    - holders     - места, где уже лежит товар {item_id: [place_id]}
+    - empty_sized - пустые места с вместимостью, по возрастанию (best fit)
+    - empty_free  - пустые места без ограничения вместимости
+    - mixed       - занятые места со свободным объемом, по возрастанию занятости
+    """
+
+    def __init__(self, *, stock_id: int, item_ids):
+        self.places, self.holders = {}, {}
+        self.empty_sized, self.empty_free, self.mixed = [], [], []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _INDEX_SQL,
+                {"stock": stock_id, "items": list(item_ids), "technical": list(TECHNICAL_PLACES)},
+            )
+            rows = cursor.fetchall()
+
+        for place_id, address, capacity, occupied, items in rows:
+            place = {"address": address, "capacity": capacity, "occupied": int(occupied)}
+            self.places[place_id] = place
+            for item_id in items:
+                self.holders.setdefault(item_id, []).append(place_id)
+            if not place["occupied"]:
+                if capacity is None:
+                    self.empty_free.append(place_id)
+                elif capacity:
+                    self.empty_sized.append((capacity, place_id))
+            elif _free(place) != 0:
+                self.mixed.append((place["occupied"], address, place_id))
+        self.empty_sized.sort()
+        self.empty_free.reverse()
+        heapq.heapify(self.mixed)
+
+    def _take_empty(self, quantity: int) -> int | None:
+        """Пустое место: наименьшее вмещающее количество, иначе без ограничения, иначе наибольшее"""
+        n = bisect_left(self.empty_sized, (quantity, 0))
+        if n < len(self.empty_sized):
+            return self.empty_sized.pop(n)[1]
+        if self.empty_free:
+            return self.empty_free.pop()
+        if self.empty_sized:
+            return self.empty_sized.pop()[1]
+        return None
+
+    def _take_mixed(self) -> int | None:
+        """Наименее занятое место со свободным объемом (устаревшие записи кучи пропускаются)"""
+        while self.mixed:
+            occupied, _, place_id = heapq.heappop(self.mixed)
+            place = self.places[place_id]
+            if occupied == place["occupied"] and _free(place) != 0:
+                return place_id
+        return None
+
+    def _put(self, place_id: int, item_id: int, quantity: int) -> int:
+        """Размещение на место не больше свободного объема, возвращает размещенное"""
+        place = self.places[place_id]
+        free = _free(place)
+        quantity = quantity if free is None else min(quantity, free)
+        if quantity:
+            place["occupied"] += quantity
+            holders = self.holders.setdefault(item_id, [])
+            if place_id not in holders:
+                holders.append(place_id)
+            if _free(place) != 0:
+                heapq.heappush(self.mixed, (place["occupied"], place["address"], place_id))
+        return quantity
+
+    def place_item(self, item_id: int, quantity: int) -> list[tuple[int, int]]:
+        """
+        Места для количества товара [(place_id, quantity)]
+        Порядок: места, где товар уже лежит (больше свободного объема - раньше),
+        затем пустые места, затем занятые места со свободным объемом
+        """
+        result = []
+        holders = sorted(
+            self.holders.get(item_id, ()),
+            key=lambda pk: (_free(self.places[pk]) is not None, -(_free(self.places[pk]) or 0)),
+        )
+        for place_id in holders:
+            if not quantity:
+                break
+            put = self._put(place_id, item_id, quantity)
+            if put:
+                result.append((place_id, put))
+                quantity -= put
+
+        while quantity:
+            place_id = self._take_empty(quantity)
+            if place_id is None:
+                place_id = self._take_mixed()
+            if place_id is None:
+                break
+            put = self._put(place_id, item_id, quantity)
+            result.append((place_id, put))
+            quantity -= put
+        return result
+
+
+def suggest_putaway(*, quantities: dict[int, int], stock_id: int) -> dict:
+    """
+    План размещения товаров {item_id: quantity} по местам склада
+    Индекс занятости строится одним запросом, крупные позиции размещаются первыми
+
+    Возвращает {"lines": [{item_id, item_code, place_id, full_address, quantity}],
+                "unplaced": [{item_id, item_code, quantity}]}
+    """
+    index = PutawayIndex(stock_id=stock_id, item_ids=quantities)
+    codes = dict(Item.objects.filter(pk__in=quantities).values_list("id", "item_code"))
+
+    lines, unplaced = [], []
+    for item_id, quantity in sorted(quantities.items(), key=lambda kv: (-kv[1], kv[0])):
+        if quantity <= 0:
+            continue
+        for place_id, put in index.place_item(item_id, quantity):
+            lines.append(
+                {
+                    "item_id": item_id,
+                    "item_code": codes[item_id],
+                    "place_id": place_id,
+                    "full_address": index.places[place_id]["address"],
+                    "quantity": put,
+                }
+            )
+            quantity -= put
+        if quantity:
+            unplaced.append({"item_id": item_id, "item_code": codes[item_id], "quantity": quantity})
+
+    logger.debug(
+        "suggest_putaway(): stock = %s, places = %s, lines = %s, unplaced = %s",
+        stock_id,
+        len(index.places),
+        len(lines),
+        len(unplaced),
+    )
+    return {"lines": lines, "unplaced": unplaced}
+
+
+def lock_putaway():
+    """Размещения сериализуются до конца транзакции"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [PUTAWAY_LOCK_KEY])
+
+
+def execute_putaway(*, from_place: Place, lines: list[dict], user) -> list[dict]:
+    """
+    Исполнение плана размещения одним пакетом:
+    UPDATE ... FROM на источнике (take_items_from_place), один INSERT ... ON CONFLICT
+    по всем местам плана, история перемещений одним bulk_create.
+    Если на источнике осталось меньше, чем в плане, строки урезаются по порядку плана
+    Возвращает исполненные строки плана
+    """
+    totals = {}
+    for line in lines:
+        totals[line["item_id"]] = totals.get(line["item_id"], 0) + line["quantity"]
+
+    with transaction.atomic():
+        taken = take_items_from_place(place=from_place, quantities=totals)
+        moved = []
+        for line in lines:
+            quantity = min(line["quantity"], taken.get(line["item_id"], 0))
+            if quantity:
+                taken[line["item_id"]] -= quantity
+                moved.append({**line, "quantity": quantity})
+        if not moved:
+            return []
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {PLACE_ITEM_TABLE} AS pi
+                    (place_id, item_id, quantity, full_address, status)
+                SELECT r.place_id, r.item_id, r.qty, r.address, 'ok'
+                FROM unnest(%s::bigint[], %s::bigint[], %s::integer[], %s::varchar[])
+                    AS r(place_id, item_id, qty, address)
+                ON CONFLICT (place_id, item_id) DO UPDATE
+                    SET quantity = pi.quantity + EXCLUDED.quantity,
+                        status = EXCLUDED.status
+                """,
+                [
+                    [line["place_id"] for line in moved],
+                    [line["item_id"] for line in moved],
+                    [line["quantity"] for line in moved],
+                    [line["full_address"] for line in moved],
+                ],
+            )
+
+        from_address = place_full_address(from_place)
+        History.objects.bulk_create(
+            History(
+                user=user,
+                item_code=line["item_code"],
+                old_address=from_address,
+                new_address=line["full_address"],
+                count=line["quantity"],
+            )
+            for line in moved
+        )
+
+        if subscribed("stock.moved"):
+            targets = {}
+            for line in moved:
+                targets.setdefault(line["full_address"], []).append(
+                    {"item_code": line["item_code"], "quantity": line["quantity"]}
+                )
+            emit_events(
+                [
+                    (
+                        "stock.moved",
+                        {"from_address": from_address, "to_address": address, "items": items},
+                    )
+                    for address, items in targets.items()
+                ]
+            )
+
+    logger.debug(
+        "execute_putaway(): from = %s, lines = %s, moved = %s",
+        from_place.pk,
+        len(lines),
+        len(moved),
+    )
+    return moved
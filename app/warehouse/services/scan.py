@@ -0,0 +1,38 @@
+from django.db.models import F
+
+from warehouse.models import Item, PlaceItem
+
+from .address_cache import place_id_by_address
+
+
+def lookup_item(item_code: str) -> list[dict] | None:
+    """
+    Где лежит товар: точное совпадение кода (уникальный индекс item_code)
+    Возвращает [{full_address, quantity, status}] или None, если товара нет
+    """
+    item_code = item_code.strip().upper()
+    places = list(
+        PlaceItem.objects.filter(item__item_code=item_code)
+        .order_by("full_address")
+        .values("full_address", "quantity", "status")
+    )
+    if not places and not Item.objects.filter(item_code=item_code).exists():
+        return None
+    return places
+
+
+def lookup_address(address: str) -> list[dict] | None:
+    """
+    Что лежит на адресе: место по полному адресу из кеша адресов процесса,
+    партии - по индексу place_id
+    Возвращает [{item_code, quantity, status}] или None, если места нет
+    """
+    place_id = place_id_by_address(address)
+    if place_id is None:
+        return None
+    return list(
+        PlaceItem.objects.filter(place_id=place_id)
+        .annotate(item_code=F("item__item_code"))
+        .order_by("item_code")
+        .values("item_code", "quantity", "status")
+    )
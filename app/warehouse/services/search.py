@@ -0,0 +1,111 @@
+from django.db.models import Exists, OuterRef, Q
+
+from warehouse.models import PlaceItem
+
+
+def filter_place_items(qs, data: dict):
+    """
+    Фильтры поиска партий/товаров (PlaceItemSearchForm, ItemSearchForm)
+    Общие для страниц поиска и API
+    """
+    if data.get("stock"):
+        qs = qs.filter(place__zone__stock=data["stock"])
+    if data.get("zone"):
+        qs = qs.filter(place__zone__title__icontains=data["zone"])
+    if data.get("place"):
+        qs = qs.filter(place__title__icontains=data["place"])
+    if data.get("item_code"):
+        qs = qs.filter(item__item_code__icontains=data["item_code"])
+    if data.get("status"):
+        qs = qs.filter(status=data["status"])
+    if data.get("qty_min") is not None:
+        qs = qs.filter(quantity__gte=data["qty_min"])
+    if data.get("qty_max") is not None:
+        qs = qs.filter(quantity__lte=data["qty_max"])
+    if data.get("weight_min") is not None:
+        qs = qs.filter(item__weight__gte=data["weight_min"])
+    if data.get("weight_max") is not None:
+        qs = qs.filter(item__weight__lte=data["weight_max"])
+    return qs
+
+
+def filter_items(qs, data: dict):
+    """
+    Фильтры справочника товаров (ItemSearchForm): код и вес товара,
+    склад, зона, место и статус - товары, у которых есть такое заселение
+    (одно заселение должно подходить под все условия)
+    """
+    if data.get("item_code"):
+        qs = qs.filter(item_code__icontains=data["item_code"])
+    if data.get("weight_min") is not None:
+        qs = qs.filter(weight__gte=data["weight_min"])
+    if data.get("weight_max") is not None:
+        qs = qs.filter(weight__lte=data["weight_max"])
+
+    place_items = PlaceItem.objects.filter(item=OuterRef("pk"))
+    placed = False
+    if data.get("stock"):
+        place_items = place_items.filter(place__zone__stock=data["stock"])
+        placed = True
+    if data.get("zone"):
+        place_items = place_items.filter(place__zone__title__icontains=data["zone"])
+        placed = True
+    if data.get("place"):
+        place_items = place_items.filter(place__title__icontains=data["place"])
+        placed = True
+    if data.get("status"):
+        place_items = place_items.filter(status=data["status"])
+        placed = True
+    if placed:
+        qs = qs.filter(Exists(place_items))
+    return qs
+
+
+def filter_places(qs, data: dict):
+    """Фильтры поиска структуры склада (StructureSearchForm)"""
+    if data.get("stock"):
+        qs = qs.filter(zone__stock=data["stock"])
+    if data.get("zone"):
+        qs = qs.filter(zone__title__icontains=data["zone"])
+    if data.get("place"):
+        qs = qs.filter(title__icontains=data["place"])
+    return qs
+
+
+def filter_history(qs, data: dict):
+    """
+    Фильтры истории перемещений (HistorySearchForm)
+    Каждый фильтр применяется независимо от остальных,
+    склад, зона и место ищутся в старом или новом адресе
+    """
+    if data.get("item_code"):
+        qs = qs.filter(item_code__icontains=data["item_code"].strip().upper())
+
+    address_parts = []
+    if data.get("stock"):
+        address_parts.append(data["stock"].title.strip().upper())
+    if data.get("zone"):
+        address_parts.append(data["zone"].strip().upper())
+    if data.get("place"):
+        address_parts.append(data["place"].strip().upper())
+    for search_text in address_parts:
+        if search_text:
+            qs = qs.filter(
+                Q(old_address__icontains=search_text) | Q(new_address__icontains=search_text)
+            )
+
+    if data.get("user"):
+        user_query = data["user"].strip()
+        qs = qs.filter(
+            Q(user__username__icontains=user_query)
+            | Q(user__first_name__icontains=user_query)
+            | Q(user__last_name__icontains=user_query)
+            | Q(user__email__icontains=user_query)
+        )
+
+    if data.get("date_from"):
+        qs = qs.filter(date__date__gte=data["date_from"])
+    if data.get("date_to"):
+        qs = qs.filter(date__date__lte=data["date_to"])
+
+    return qs
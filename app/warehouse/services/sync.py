@@ -0,0 +1,242 @@
+import json
+import logging
+
+from django.db import connection, transaction
+
+from warehouse.models import History, Item, Place, PlaceItem, SyncEvent
+
+from .address_cache import normalize_address, place_ids_by_addresses
+from .place_items import move_items_between_places
+
+logger = logging.getLogger(__name__)
+
+SYNC_EVENT_TYPES = ("move", "confirm")
+
+
+def _claim_keys(user, events: list[dict]) -> set[str]:
+    """
+    Запись ключей событий пользователя одним INSERT ... ON CONFLICT DO NOTHING
+    (ключ уникален в пределах пользователя: устройства разных пользователей
+    не конфликтуют)
+    Возвращает ключи, записанные этим запросом: только эти события применяются.
+    Параллельный запрос с теми же ключами ждет фиксации и получает конфликт
+    """
+    if not events:
+        return set()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {SyncEvent._meta.db_table}
+                (key, user_id, event_type, payload, status, result, created_at)
+            SELECT e.key, %s, e.event_type, e.payload::jsonb, 'pending', '{{}}'::jsonb, now()
+            FROM unnest(%s::varchar[], %s::varchar[], %s::text[])
+                AS e(key, event_type, payload)
+            ON CONFLICT (user_id, key) DO NOTHING
+            RETURNING key
+            """,
+            [
+                user.pk if user else None,
+                [event["key"] for event in events],
+                [event["type"] for event in events],
+                [json.dumps(event, ensure_ascii=False, default=str) for event in events],
+            ],
+        )
+        return {key for (key,) in cursor.fetchall()}
+
+
+def _resolve(events: list[dict]) -> tuple[dict[str, int], dict[str, Place]]:
+    """
+    Коды товаров и адреса всех событий пакета: товары одним запросом,
+    места - через кеш адресов со сверкой по БД (place_ids_by_addresses)
+    """
+    codes = {event["item_code"] for event in events}
+    item_ids = dict(
+        Item.objects.filter(item_code__in=codes).values_list("item_code", "id")
+    )
+    addresses = {
+        event[field]
+        for event in events
+        for field in ("from_address", "to_address", "address")
+        if event.get(field)
+    }
+    place_ids = place_ids_by_addresses(addresses)
+    places = Place.objects.in_bulk([pk for pk in place_ids.values() if pk])
+    return item_ids, {
+        address: places[pk] for address, pk in place_ids.items() if pk in places
+    }
+
+
+def _validate(event: dict, item_ids: dict, places: dict) -> str | None:
+    if event["item_code"] not in item_ids:
+        return "Товар с таким кодом не найден"
+    if event["type"] == "move":
+        if event["from_address"] not in places:
+            return "Не удалось определить место ОТКУДА"
+        if event["to_address"] not in places:
+            return "Не удалось определить место КУДА"
+        if places[event["from_address"]] == places[event["to_address"]]:
+            return "Товар остался там же"
+    elif event["address"] not in places:
+        return "Не удалось определить место"
+    return None
+
+
+def _runs(events: list[dict], item_ids: dict, places: dict):
+    """
+    Разбиение событий на группы подряд идущих однотипных событий,
+    которые применяются одним набором запросов без изменения порядка:
+    перемещения между одной парой мест / подтверждения, без повторов товара в группе
+    """
+    run, run_key, seen = [], None, set()
+    for event in events:
+        item_id = item_ids[event["item_code"]]
+        if event["type"] == "move":
+            key = ("move", places[event["from_address"]].pk, places[event["to_address"]].pk)
+            mark = item_id
+        else:
+            key = ("confirm",)
+            mark = (places[event["address"]].pk, item_id)
+        if run and (key != run_key or mark in seen):
+            yield run
+            run, seen = [], set()
+        run_key = key
+        run.append(event)
+        seen.add(mark)
+    if run:
+        yield run
+
+
+def _apply_moves(run, item_ids, places, user, results, history):
+    from_place = places[run[0]["from_address"]]
+    to_place = places[run[0]["to_address"]]
+    moved = move_items_between_places(
+        from_place=from_place,
+        to_place=to_place,
+        quantities={item_ids[event["item_code"]]: event["quantity"] for event in run},
+        status=to_place.item_status,
+    )
+    for event in run:
+        quantity = moved.get(item_ids[event["item_code"]], 0)
+        if not quantity:
+            results[event["key"]] = {
+                "status": "rejected",
+                "error": "Товара нет на указанном месте ОТКУДА",
+            }
+            continue
+        results[event["key"]] = {
+            "status": "applied" if quantity == event["quantity"] else "partial",
+            "quantity": quantity,
+        }
+        history.append(
+            History(
+                user=user,
+                item_code=event["item_code"],
+                old_address=event["from_address"],
+                new_address=event["to_address"],
+                count=quantity,
+            )
+        )
+
+
+def _apply_confirms(run, item_ids, places, results):
+    """Сверка количества на адресе: все подтверждения группы одним запросом"""
+    pairs = [(places[event["address"]].pk, item_ids[event["item_code"]]) for event in run]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT r.place_id, r.item_id, COALESCE(pi.quantity, 0)
+            FROM unnest(%s::bigint[], %s::bigint[]) AS r(place_id, item_id)
+            LEFT JOIN {PlaceItem._meta.db_table} pi
+                ON pi.place_id = r.place_id AND pi.item_id = r.item_id
+            """,
+            [[place_id for place_id, _ in pairs], [item_id for _, item_id in pairs]],
+        )
+        actual = {(place_id, item_id): qty for place_id, item_id, qty in cursor.fetchall()}
+    for event, pair in zip(run, pairs):
+        quantity = actual.get(pair, 0)
+        results[event["key"]] = {
+            "status": "applied" if quantity == event["quantity"] else "mismatch",
+            "quantity": quantity,
+        }
+
+
+def sync_events(*, user, events: list[dict]) -> list[dict]:
+    """
+    Применение пакета офлайн-событий ТСД в одной транзакции
+
+    События:
+        move    - {key, type, item_code, from_address, to_address, quantity}
+        confirm - {key, type, item_code, address, quantity}: сверка остатка на адресе
+
+    - Ключи записываются в SyncEvent: события с уже известным ключом
+      этого пользователя не применяются, возвращается их сохраненный результат
+      (duplicate: true)
+    - Новые события применяются строго по порядку, подряд идущие однотипные
+      события - одним набором запросов (move_items_between_places / unnest)
+    - Перемещается не больше, чем лежит на месте ОТКУДА (partial)
+
+    Возвращает результаты в порядке событий: [{key, status, quantity?, error?}]
+    """
+    for event in events:
+        event["item_code"] = event["item_code"].strip().upper()
+        for field in ("from_address", "to_address", "address"):
+            if event.get(field):
+                event[field] = normalize_address(event[field])
+
+    unique, seen = [], set()
+    for event in events:
+        if event["key"] not in seen:
+            seen.add(event["key"])
+            unique.append(event)
+
+    results, history = {}, []
+    with transaction.atomic():
+        fresh_keys = _claim_keys(user, unique)
+        fresh = [event for event in unique if event["key"] in fresh_keys]
+        item_ids, places = _resolve(fresh)
+
+        valid = []
+        for event in fresh:
+            error = _validate(event, item_ids, places)
+            if error:
+                results[event["key"]] = {"status": "rejected", "error": error}
+            else:
+                valid.append(event)
+
+        for run in _runs(valid, item_ids, places):
+            if run[0]["type"] == "move":
+                _apply_moves(run, item_ids, places, user, results, history)
+            else:
+                _apply_confirms(run, item_ids, places, results)
+
+        History.objects.bulk_create(history)
+        rows = list(SyncEvent.objects.filter(user=user, key__in=fresh_keys))
+        for row in rows:
+            row.status = results[row.key]["status"]
+            row.result = results[row.key]
+        SyncEvent.objects.bulk_update(rows, ["status", "result"])
+
+    duplicates = {
+        key: {**result, "status": status, "duplicate": True}
+        for key, status, result in SyncEvent.objects.filter(
+            user=user, key__in=seen - fresh_keys
+        ).values_list("key", "status", "result")
+    }
+    logger.debug(
+        "sync_events(): events = %s, applied = %s, duplicates = %s",
+        len(events),
+        len(fresh_keys),
+        len(events) - len(fresh_keys),
+    )
+    response, returned = [], set()
+    for event in events:
+        key = event["key"]
+        if key in results and key not in returned:
+            response.append({"key": key, **results[key]})
+        elif key in results:
+            # повтор ключа внутри пакета
+            response.append({"key": key, **results[key], "duplicate": True})
+        else:
+            response.append({"key": key, **duplicates[key]})
+        returned.add(key)
+    return response
@@ -0,0 +1,72 @@
+import logging
+
+from django.db import connection
+
+from warehouse.models import Place, Zone
+
+from .putaway import TECHNICAL_PLACES
+
+logger = logging.getLogger(__name__)
+
+PLACE_TABLE = Place._meta.db_table
+
+# Маршрут обхода склада (S-образный):
+#   зоны - по порядку обхода зоны, затем по коду
+#   места зоны - по порядку обхода места; места без порядка - по координатам:
+#   ряды (одинаковый X) по возрастанию X, нечетный ряд проходится по
+#   возрастанию Y, четный - обратно; места без координат - по коду в конце зоны
+_WALK_SQL = f"""
+    WITH aisles AS (
+        SELECT p.id, z.stock_id, z.pick_sequence AS zone_seq, z.title AS zone_title,
+               p.pick_sequence AS place_seq, p.y, p.title,
+               DENSE_RANK() OVER (PARTITION BY z.id ORDER BY p.x) AS aisle
+        FROM {PLACE_TABLE} p
+        JOIN {Zone._meta.db_table} z ON z.id = p.zone_id
+        WHERE p.title <> ALL(%(technical)s) {{stock_filter}}
+    ),
+    walk AS (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY stock_id
+            ORDER BY zone_seq NULLS LAST, zone_title, place_seq NULLS LAST, aisle,
+                     CASE WHEN aisle %% 2 = 0 THEN -y ELSE y END NULLS LAST, title
+        ) AS seq
+        FROM aisles
+    )
+    UPDATE {PLACE_TABLE} p
+    SET walk_sequence = walk.seq
+    FROM walk
+    WHERE p.id = walk.id AND p.walk_sequence IS DISTINCT FROM walk.seq
+"""
+
+
+def compute_walk_sequence(stock_id: int | None = None) -> int:
+    """
+    Пересчет маршрута обхода мест склада (всех складов) одним UPDATE ... FROM
+    Place.walk_sequence - номер места в маршруте, по нему сортируются
+    источники подбора и строки листа подбора
+    Возвращает кол-во мест, у которых изменился номер
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _WALK_SQL.format(stock_filter="AND z.stock_id = %(stock)s" if stock_id else ""),
+            {"technical": list(TECHNICAL_PLACES), "stock": stock_id},
+        )
+        updated = cursor.rowcount
+    logger.debug("compute_walk_sequence(): stock = %s, updated = %s", stock_id, updated)
+    return updated
+
+
+def route_distance(points) -> float | None:
+    """
+    Длина пути по точкам маршрута [(x, y)] в порядке обхода, м
+    Переходы считаются по осям (вдоль рядов и между ними)
+    None - если хотя бы у одной точки нет координат
+    """
+    distance, previous = 0.0, None
+    for x, y in points:
+        if x is None or y is None:
+            return None
+        if previous is not None:
+            distance += abs(x - previous[0]) + abs(y - previous[1])
+        previous = (x, y)
+    return distance
@@ -0,0 +1,191 @@
+import hashlib
+import hmac
+import http.client
+import json
+import logging
+import random
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from warehouse.models import OutboxDelivery, OutboxEvent, WebhookEndpoint
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookConnectionPool:
+    """
+    Keep-alive соединения с вебхуками: одно на (схема, хост, порт)
+    Пакеты на один и тот же сервер идут по уже открытому соединению,
+    оборванное соединение закрывается и открывается заново при следующей отправке
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._connections = {}
+
+    def _connection(self, scheme: str, netloc: str):
+        key = (scheme, netloc)
+        conn = self._connections.get(key)
+        if conn is None:
+            conn_class = (
+                http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            )
+            conn = conn_class(netloc, timeout=self.timeout)
+            self._connections[key] = conn
+        return key, conn
+
+    def post(self, url: str, body: bytes, headers: dict) -> int:
+        """POST на url, возвращает HTTP-статус. Сетевые ошибки пробрасываются"""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        key, conn = self._connection(parts.scheme, parts.netloc)
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._connections.pop(key, None)
+            raise
+        if response.will_close:
+            conn.close()
+            self._connections.pop(key, None)
+        return response.status
+
+    def close(self):
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+
+
+def backoff_delay(attempts: int) -> float:
+    """Экспоненциальная задержка перед повтором (сек) со случайным разбросом"""
+    delay = min(
+        settings.WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1), settings.WEBHOOK_BACKOFF_MAX
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+def webhook_body(deliveries) -> bytes:
+    return json.dumps(
+        {
+            "events": [
+                {
+                    "id": delivery.event_id,
+                    "type": delivery.event.event_type,
+                    "created_at": delivery.event.created_at.isoformat(),
+                    "payload": delivery.event.payload,
+                }
+                for delivery in deliveries
+            ]
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def webhook_headers(endpoint: WebhookEndpoint, body: bytes) -> dict:
+    headers = {"Content-Type": "application/json"}
+    if endpoint.secret:
+        headers["X-Signature"] = hmac.new(
+            endpoint.secret.encode(), body, hashlib.sha256
+        ).hexdigest()
+    return headers
+
+
+def deliver_endpoint_batch(pool: WebhookConnectionPool, endpoint: WebhookEndpoint) -> int:
+    """
+    Отправка одного пакета ожидающих событий вебхука
+
+    Доставки блокируются FOR UPDATE SKIP LOCKED: параллельные процессы
+    доставки берут разные пакеты. Пакет отправляется одним POST в порядке событий,
+    при ошибке весь пакет откладывается с экспоненциальной задержкой по числу
+    попыток каждой доставки, доставки, исчерпавшие WEBHOOK_MAX_ATTEMPTS попыток,
+    помечаются failed
+    Возвращает кол-во доставленных событий
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        deliveries = list(
+            OutboxDelivery.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("event")
+            .filter(endpoint=endpoint, status="pending", next_attempt_at__lte=now)
+            .order_by("id")[: settings.WEBHOOK_BATCH_SIZE]
+        )
+        if not deliveries:
+            return 0
+
+        body = webhook_body(deliveries)
+        error = ""
+        try:
+            status = pool.post(endpoint.url, body, webhook_headers(endpoint, body))
+            if not 200 <= status < 300:
+                error = f"HTTP {status}"
+        except (OSError, http.client.HTTPException) as e:
+            error = f"{type(e).__name__}: {e}"
+
+        pks = [delivery.pk for delivery in deliveries]
+        if not error:
+            OutboxDelivery.objects.filter(pk__in=pks).update(
+                status="delivered", delivered_at=timezone.now(), last_error=""
+            )
+            logger.debug(
+                "deliver_endpoint_batch(%s): delivered = %s", endpoint.pk, len(pks)
+            )
+            return len(pks)
+
+        # попытки считаются по каждой доставке: в пакете могут быть
+        # и новые события, и события, которые уже не раз откладывались
+        by_attempts = {}
+        for delivery in deliveries:
+            by_attempts.setdefault(delivery.attempts + 1, []).append(delivery.pk)
+        now = timezone.now()
+        failed = 0
+        for attempts, attempt_pks in by_attempts.items():
+            is_failed = attempts >= settings.WEBHOOK_MAX_ATTEMPTS
+            OutboxDelivery.objects.filter(pk__in=attempt_pks).update(
+                status="failed" if is_failed else "pending",
+                attempts=F("attempts") + 1,
+                next_attempt_at=now + timedelta(seconds=backoff_delay(attempts)),
+                last_error=error[:1000],
+            )
+            failed += len(attempt_pks) if is_failed else 0
+        logger.error(
+            "Webhook %s (%s): %s, events = %s, attempt = %s, failed = %s",
+            endpoint.pk,
+            endpoint.url,
+            error,
+            len(pks),
+            max(by_attempts),
+            failed,
+        )
+        return 0
+
+
+def deliver_webhooks(pool: WebhookConnectionPool) -> int:
+    """
+    Один проход доставки: по пакету на каждый активный вебхук
+    Возвращает кол-во доставленных событий
+    """
+    delivered = 0
+    for endpoint in WebhookEndpoint.objects.filter(is_active=True):
+        delivered += deliver_endpoint_batch(pool, endpoint)
+    return delivered
+
+
+def purge_outbox(days: int) -> int:
+    """Удаление доставленных событий старше days дней. Возвращает кол-во событий"""
+    cutoff = timezone.now() - timedelta(days=days)
+    OutboxDelivery.objects.filter(status="delivered", delivered_at__lt=cutoff).delete()
+    removed, _ = (
+        OutboxEvent.objects.filter(created_at__lt=cutoff, deliveries__isnull=True).delete()
+    )
+    logger.debug("purge_outbox(): days = %s, events = %s", days, removed)
+    return removed
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Place, Stock, Zone
+from .services import invalidate_address_cache
+
+
+@receiver(post_save, sender=Place)
+@receiver(post_delete, sender=Place)
+@receiver(post_save, sender=Zone)
+@receiver(post_delete, sender=Zone)
+@receiver(post_save, sender=Stock)
+@receiver(post_delete, sender=Stock)
+def structure_changed(sender, **kwargs):
+    """Изменение структуры склада сбрасывает кеш адресов процесса"""
+    invalidate_address_cache()
@@ -0,0 +1,40 @@
+from django.test import TestCase, override_settings
+
+from warehouse.models import Place, Stock, Zone
+from warehouse.services.address_cache import (invalidate_address_cache,
+                                              place_id_by_address,
+                                              place_ids_by_addresses)
+
+
+@override_settings(ADDRESS_CACHE_TTL=3600)
+class PlaceIdsByAddressesTests(TestCase):
+    def setUp(self):
+        invalidate_address_cache()
+        self.addCleanup(invalidate_address_cache)
+        stock = Stock.objects.create(title="1")
+        self.zone = Zone.objects.create(title="A", stock=stock)
+        self.place = Place.objects.create(title="01", zone=self.zone)
+
+    def test_fresh_cache(self):
+        self.assertEqual(place_ids_by_addresses(["1/a/01", "1/A/99"]), {
+            "1/a/01": self.place.pk,
+            "1/A/99": None,
+        })
+
+    def test_stale_cache(self):
+        self.assertEqual(place_id_by_address("1/A/01"), self.place.pk)
+        # переименование в другом процессе: сигналы этого процесса не срабатывают
+        Place.objects.filter(pk=self.place.pk).update(title="02")
+        other = Place.objects.create(title="01", zone=self.zone)
+        invalidate_address_cache()
+        self.assertEqual(place_id_by_address("1/A/01"), other.pk)
+        Place.objects.filter(pk=other.pk).update(title="03")
+        Place.objects.filter(pk=self.place.pk).update(title="01")
+
+        self.assertEqual(place_id_by_address("1/A/01"), other.pk)
+        self.assertEqual(place_ids_by_addresses(["1/A/01", "1/A/03"]), {
+            "1/A/01": self.place.pk,
+            "1/A/03": other.pk,
+        })
+        # кеш процесса сброшен
+        self.assertEqual(place_id_by_address("1/A/01"), self.place.pk)
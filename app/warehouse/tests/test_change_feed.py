@@ -0,0 +1,48 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from warehouse.management.commands.publish_place_item_changes import Command
+from warehouse.models import (InventoryCheckpoint, Item, Place, PlaceItem,
+                              Stock, Zone)
+
+
+class PlaceItemChangeFeedTests(TransactionTestCase):
+    """Изменения публикуются только после фиксации транзакции, поэтому без общей транзакции"""
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("reader"))
+        stock = Stock.objects.create(title="1")
+        place = Place.objects.create(title="01", zone=Zone.objects.create(title="A", stock=stock))
+        PlaceItem.objects.create(place=place, item=Item.objects.create(item_code="I1"), quantity=3)
+
+    def feed(self, **params):
+        return self.client.get(reverse("api:place-item-changes"), params)
+
+    def test_published_by_command(self):
+        response = self.feed()
+        self.assertEqual(response["X-Revision-Head"], "0")
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+        call_command("publish_place_item_changes", "--once", stdout=StringIO())
+
+        response = self.feed(since=0, limit=10)
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(response["X-Revision-Head"], "1")
+        self.assertEqual([(row["revision"], row["quantity"]) for row in rows], [(1, 3)])
+
+    def test_invalid_params(self):
+        for params in ({"since": -1}, {"limit": -5}, {"limit": "x"}):
+            response = self.feed(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(next(iter(params)), response.json())
+
+    def test_daily_maintenance_takes_checkpoint(self):
+        Command(stdout=StringIO()).daily_maintenance()
+
+        checkpoint = InventoryCheckpoint.objects.get()
+        self.assertEqual((checkpoint.revision, checkpoint.lines), (1, 1))
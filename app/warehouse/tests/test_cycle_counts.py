@@ -0,0 +1,174 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from warehouse.models import History, Item, Place, PlaceItem, Stock, Zone
+from warehouse.services.cycle_counts import (cancel_cycle_count,
+                                             cycle_count_variances,
+                                             reconcile_cycle_count,
+                                             record_cycle_counts,
+                                             start_cycle_count)
+
+NOT_RESERVED = {"reserved": 0, "reserved_lines": []}
+
+
+class CycleCountTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="counter")
+        stock = Stock.objects.create(title="1")
+        self.zone = Zone.objects.create(title="A", stock=stock)
+        self.other_zone = Zone.objects.create(title="C", stock=stock)
+        self.p1 = Place.objects.create(title="01", zone=self.zone)
+        self.p2 = Place.objects.create(title="02", zone=self.zone)
+        self.other = Place.objects.create(title="01", zone=self.other_zone)
+        self.item_a = Item.objects.create(item_code="A")
+        self.item_b = Item.objects.create(item_code="B")
+        self.item_c = Item.objects.create(item_code="C")
+
+    def _put(self, place, item, quantity) -> PlaceItem:
+        return PlaceItem.objects.create(place=place, item=item, quantity=quantity)
+
+    def _quantity(self, place, item) -> int | None:
+        return (
+            PlaceItem.objects.filter(place=place, item=item)
+            .values_list("quantity", flat=True)
+            .first()
+        )
+
+    def test_unscanned_pair_at_counted_place(self):
+        """Непосчитанная пара посчитанного места = 0, непосчитанные места не трогаются"""
+        self._put(self.p1, self.item_a, 5)
+        self._put(self.p1, self.item_b, 3)
+        self._put(self.p2, self.item_a, 4)
+        count = start_cycle_count(zone=self.zone, user=self.user)
+
+        record_cycle_counts(
+            count_id=count.pk,
+            counts=[{"address": "1/A/01", "item_code": "a", "quantity": 5}],
+        )
+        variances = cycle_count_variances(count)
+        result = reconcile_cycle_count(count_id=count.pk, user=self.user)
+
+        self.assertEqual(
+            [(row["item_code"], row["expected"], row["counted"]) for row in variances],
+            [("B", 3, 0)],
+        )
+        self.assertEqual(result, {"lines": 1, "surplus": 0, "shortage": 3, **NOT_RESERVED})
+        self.assertEqual(self._quantity(self.p1, self.item_a), 5)
+        self.assertIsNone(self._quantity(self.p1, self.item_b))
+        self.assertEqual(self._quantity(self.p2, self.item_a), 4)
+        history = History.objects.get()
+        self.assertEqual(
+            (history.old_address, history.new_address, history.count),
+            ("1/A/01", str(count), 3),
+        )
+
+    def test_unexpected_surplus(self):
+        """Неожиданный товар на месте заселяется излишком"""
+        self._put(self.p1, self.item_a, 5)
+        count = start_cycle_count(zone=self.zone, user=self.user)
+
+        record_cycle_counts(
+            count_id=count.pk,
+            counts=[
+                {"address": "1/A/01", "item_code": "A", "quantity": 5},
+                {"address": "1/A/01", "item_code": "C", "quantity": 2},
+            ],
+        )
+        result = reconcile_cycle_count(count_id=count.pk, user=self.user)
+
+        self.assertEqual(result, {"lines": 1, "surplus": 2, "shortage": 0, **NOT_RESERVED})
+        place_item = PlaceItem.objects.get(place=self.p1, item=self.item_c)
+        self.assertEqual((place_item.quantity, place_item.status), (2, "ok"))
+        line = count.lines.get(item=self.item_c)
+        self.assertEqual((line.expected, line.counted, line.adjustment), (0, 2, 2))
+
+    def test_shortage_clamped_to_current_quantity(self):
+        """Недостача списывает не больше, чем лежит на месте при сверке"""
+        place_item = self._put(self.p1, self.item_a, 10)
+        count = start_cycle_count(zone=self.zone, user=self.user)
+        record_cycle_counts(
+            count_id=count.pk,
+            counts=[{"address": "1/A/01", "item_code": "A", "quantity": 2}],
+        )
+        # за время подсчета часть товара ушла с места
+        place_item.quantity = 5
+        place_item.save()
+
+        result = reconcile_cycle_count(count_id=count.pk, user=self.user)
+
+        self.assertEqual(result, {"lines": 1, "surplus": 0, "shortage": 5, **NOT_RESERVED})
+        self.assertIsNone(self._quantity(self.p1, self.item_a))
+        self.assertEqual(count.lines.get().adjustment, -5)
+
+    def test_shortage_keeps_reserved(self):
+        """Зарезервированное под подбор не списывается, недостача по резерву - в отчете"""
+        place_item = self._put(self.p1, self.item_a, 10)
+        place_item.reserved = 6
+        place_item.save()
+        count = start_cycle_count(zone=self.zone, user=self.user)
+        record_cycle_counts(
+            count_id=count.pk,
+            counts=[{"address": "1/A/01", "item_code": "A", "quantity": 1}],
+        )
+
+        result = reconcile_cycle_count(count_id=count.pk, user=self.user)
+
+        self.assertEqual(
+            result,
+            {
+                "lines": 1,
+                "surplus": 0,
+                "shortage": 4,
+                "reserved": 5,
+                "reserved_lines": [{"full_address": "1/A/01", "item_code": "A", "quantity": 5}],
+            },
+        )
+        place_item.refresh_from_db()
+        self.assertEqual((place_item.quantity, place_item.reserved), (6, 6))
+        self.assertEqual(count.lines.get().adjustment, -4)
+        self.assertEqual(History.objects.get().count, 4)
+
+    def test_repeated_batch_is_idempotent(self):
+        """Повторная отправка пакета заменяет подсчеты, а не суммирует их"""
+        self._put(self.p1, self.item_a, 5)
+        count = start_cycle_count(zone=self.zone, user=self.user)
+        batch = [
+            {"address": "1/A/01", "item_code": "A", "quantity": 1},
+            {"address": "1/A/01", "item_code": "A", "quantity": 7},
+            {"address": "1/C/01", "item_code": "A", "quantity": 1},
+            {"address": "1/A/99", "item_code": "A", "quantity": 1},
+            {"address": "1/A/02", "item_code": "NOPE", "quantity": 1},
+        ]
+
+        first = record_cycle_counts(count_id=count.pk, counts=batch)
+        second = record_cycle_counts(count_id=count.pk, counts=batch)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["recorded"], 1)
+        self.assertEqual(
+            [entry["error"] for entry in first["rejected"]],
+            [
+                "Место не относится к зоне инвентаризации",
+                "Не удалось определить место",
+                "Товар с таким кодом не найден",
+            ],
+        )
+        self.assertEqual(count.lines.count(), 1)
+        self.assertEqual(count.lines.get().counted, 7)
+
+        self.assertEqual(
+            reconcile_cycle_count(count_id=count.pk, user=self.user),
+            {"lines": 1, "surplus": 2, "shortage": 0, **NOT_RESERVED},
+        )
+        self.assertEqual(self._quantity(self.p1, self.item_a), 7)
+        with self.assertRaisesMessage(Exception, "в статусе"):
+            record_cycle_counts(count_id=count.pk, counts=batch)
+
+    def test_one_open_count_per_zone(self):
+        count = start_cycle_count(zone=self.zone, user=self.user)
+        with self.assertRaisesMessage(Exception, "уже идет инвентаризация"):
+            start_cycle_count(zone=self.zone, user=self.user)
+
+        start_cycle_count(zone=self.other_zone, user=self.user)
+        cancel_cycle_count(count_id=count.pk)
+        start_cycle_count(zone=self.zone, user=self.user)
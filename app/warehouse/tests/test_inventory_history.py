@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from warehouse.models import Item, Place, PlaceItem, Stock, Zone
+from warehouse.services.inventory_history import (inventory_as_of,
+                                                  take_inventory_checkpoint)
+
+
+class InventoryAsOfTests(TransactionTestCase):
+    """
+    Изменения стока пишут триггеры БД, а публикуются только изменения
+    завершенных транзакций, поэтому тесты идут без общей транзакции
+    """
+
+    def setUp(self):
+        stock = Stock.objects.create(title="1")
+        self.place_b = Place.objects.create(
+            title="01", zone=Zone.objects.create(title="B", stock=stock)
+        )
+        self.place_bx = Place.objects.create(
+            title="01", zone=Zone.objects.create(title="BX", stock=stock)
+        )
+        self.item_a = Item.objects.create(item_code="A")
+        self.item_b = Item.objects.create(item_code="B")
+
+    def _put(self, place, item, quantity) -> PlaceItem:
+        return PlaceItem.objects.create(place=place, item=item, quantity=quantity)
+
+    @staticmethod
+    def _quantities(rows) -> dict:
+        return {(row["full_address"], row["item_code"]): row["quantity"] for row in rows}
+
+    def test_replay_between_checkpoints(self):
+        a = self._put(self.place_b, self.item_a, 5)
+        b = self._put(self.place_bx, self.item_b, 3)
+        before_first = timezone.now()
+
+        first = take_inventory_checkpoint()
+        after_first = timezone.now()
+        a.quantity = 7
+        a.save()
+        after_change = timezone.now()
+        a.quantity = 9
+        a.save()
+        b.delete()
+        before_second = timezone.now()
+
+        second = take_inventory_checkpoint()
+        a.quantity = 4
+        a.save()
+
+        # до первого снимка (в окне журнала) - повтор журнала с начала
+        checkpoint, rows = inventory_as_of(before_first)
+        self.assertIsNone(checkpoint)
+        self.assertEqual(self._quantities(rows), {("1/B/01", "A"): 5, ("1/BX/01", "B"): 3})
+
+        checkpoint, rows = inventory_as_of(after_first)
+        self.assertEqual(checkpoint, first)
+        self.assertEqual(self._quantities(rows), {("1/B/01", "A"): 5, ("1/BX/01", "B"): 3})
+
+        checkpoint, rows = inventory_as_of(after_change)
+        self.assertEqual(checkpoint, first)
+        self.assertEqual(self._quantities(rows), {("1/B/01", "A"): 7, ("1/BX/01", "B"): 3})
+
+        # удаленная пара в ответ не попадает
+        checkpoint, rows = inventory_as_of(before_second)
+        self.assertEqual(checkpoint, first)
+        self.assertEqual(self._quantities(rows), {("1/B/01", "A"): 9})
+
+        checkpoint, rows = inventory_as_of(timezone.now())
+        self.assertEqual(checkpoint, second)
+        self.assertEqual(self._quantities(rows), {("1/B/01", "A"): 4})
+
+    def test_deleted_pairs_not_in_checkpoint(self):
+        a = self._put(self.place_b, self.item_a, 5)
+        self._put(self.place_b, self.item_b, 2)
+        take_inventory_checkpoint()
+        a.delete()
+        PlaceItem.objects.filter(item=self.item_b).update(quantity=0)
+
+        checkpoint = take_inventory_checkpoint()
+
+        self.assertEqual(checkpoint.lines, 0)
+        self.assertEqual(inventory_as_of(timezone.now()), (checkpoint, []))
+
+    def test_unchanged_checkpoint_reused(self):
+        self._put(self.place_b, self.item_a, 5)
+        first = take_inventory_checkpoint()
+        self.assertEqual(take_inventory_checkpoint(), first)
+        self.assertEqual(first.lines, 1)
+
+    def test_address_subtree(self):
+        """Адрес - поддерево по границе '/': "1/B" не совпадает с "1/BX" """
+        self._put(self.place_b, self.item_a, 5)
+        self._put(self.place_bx, self.item_b, 3)
+        take_inventory_checkpoint()
+        now = timezone.now()
+
+        self.assertEqual(
+            self._quantities(inventory_as_of(now, address="1/B")[1]), {("1/B/01", "A"): 5}
+        )
+        self.assertEqual(
+            self._quantities(inventory_as_of(now, address="1/BX/01")[1]),
+            {("1/BX/01", "B"): 3},
+        )
+        self.assertEqual(len(inventory_as_of(now, address="1")[1]), 2)
+        self.assertEqual(inventory_as_of(now, address="1/B/0")[1], [])
+        self.assertEqual(
+            self._quantities(inventory_as_of(now, address="1", item_code="B")[1]),
+            {("1/BX/01", "B"): 3},
+        )
+
+    def test_before_first_checkpoint(self):
+        """Момент до первого снимка и вне окна журнала - ошибка"""
+        self._put(self.place_b, self.item_a, 5)
+        take_inventory_checkpoint()
+        at = timezone.now() - timedelta(days=settings.CHANGE_FEED_RETENTION_DAYS + 1)
+
+        with self.assertRaisesMessage(Exception, "История стока до"):
+            inventory_as_of(at)
@@ -0,0 +1,102 @@
+from django.test import TestCase
+
+from warehouse.models import Item, Place, PlaceItem, Stock, Zone
+from warehouse.services.place_items import (add_items_to_place,
+                                            allocate_sources,
+                                            take_items_from_place)
+
+
+class PlaceItemsTests(TestCase):
+    def setUp(self):
+        stock = Stock.objects.create(title="1")
+        self.zone = Zone.objects.create(title="A", stock=stock)
+        self.places = [
+            Place.objects.create(title=f"0{n}", zone=self.zone, walk_sequence=10 - n)
+            for n in range(1, 4)
+        ]
+        self.item = Item.objects.create(item_code="A")
+        self.other = Item.objects.create(item_code="B")
+
+    def _put(self, place, item, quantity, reserved=0) -> PlaceItem:
+        place_item = PlaceItem.objects.create(
+            place=place, item=item, quantity=quantity, status="ok"
+        )
+        if reserved:
+            PlaceItem.objects.filter(pk=place_item.pk).update(reserved=reserved)
+        return place_item
+
+    def _stock(self, item) -> list:
+        return list(
+            PlaceItem.objects.filter(item=item)
+            .order_by("pk")
+            .values_list("place__title", "quantity", "reserved")
+        )
+
+    def test_add_sums_existing(self):
+        place = self.places[0]
+        add_items_to_place(place=place, quantities={self.item.pk: 2}, status="new")
+        add_items_to_place(
+            place=place, quantities={self.item.pk: 3, self.other.pk: 0}, status="ok"
+        )
+
+        place_item = PlaceItem.objects.get(place=place)
+        self.assertEqual(
+            (place_item.quantity, place_item.status, place_item.full_address),
+            (5, "ok", "1/A/01"),
+        )
+
+    def test_partial_take(self):
+        """Снимается не больше свободного остатка, опустевшее заселение удаляется"""
+        place = self.places[0]
+        self._put(place, self.item, 5, reserved=2)
+        self._put(place, self.other, 2)
+
+        taken = take_items_from_place(
+            place=place, quantities={self.item.pk: 10, self.other.pk: 2}
+        )
+
+        self.assertEqual(taken, {self.item.pk: 3, self.other.pk: 2})
+        self.assertEqual(self._stock(self.item), [("01", 2, 2)])
+        self.assertEqual(self._stock(self.other), [])
+
+    def test_fifo_split(self):
+        """FIFO: потребность закрывается заселениями по порядку, опустевшие удаляются"""
+        for place, quantity in zip(self.places, (3, 4, 5)):
+            self._put(place, self.item, quantity)
+
+        sources = allocate_sources(quantities={self.item.pk: 6})
+
+        self.assertEqual(
+            [(address, taken) for _, _, taken, address, _ in sources],
+            [("1/A/02", 3), ("1/A/01", 3)],
+        )
+        self.assertEqual(self._stock(self.item), [("02", 1, 0), ("03", 5, 0)])
+
+    def test_fifo_skips_reserved(self):
+        self._put(self.places[0], self.item, 3, reserved=3)
+        self._put(self.places[1], self.item, 4, reserved=1)
+        self._put(self.places[2], self.item, 5)
+
+        sources = allocate_sources(quantities={self.item.pk: 5})
+
+        self.assertEqual(
+            sorted((address, taken) for _, _, taken, address, _ in sources),
+            [("1/A/02", 3), ("1/A/03", 2)],
+        )
+        self.assertEqual(
+            self._stock(self.item), [("01", 3, 3), ("02", 1, 1), ("03", 3, 0)]
+        )
+
+    def test_reserve_walk(self):
+        """Резерв не меняет количество, walk берет одно место, закрывающее потребность"""
+        for place, quantity in zip(self.places, (3, 4, 5)):
+            self._put(place, self.item, quantity)
+
+        sources = allocate_sources(quantities={self.item.pk: 4}, order="walk", reserve=True)
+
+        self.assertEqual(
+            [(address, taken) for _, _, taken, address, _ in sources], [("1/A/03", 4)]
+        )
+        self.assertEqual(
+            self._stock(self.item), [("01", 3, 0), ("02", 4, 0), ("03", 5, 4)]
+        )
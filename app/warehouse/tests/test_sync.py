@@ -0,0 +1,110 @@
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase
+from django.urls import reverse
+
+from warehouse.models import History, Item, Place, PlaceItem, Stock, SyncEvent, Zone
+from warehouse.services.address_cache import invalidate_address_cache
+from warehouse.services.sync import sync_events
+
+
+def move(key, item_code, from_address, to_address, quantity):
+    return {
+        "key": key,
+        "type": "move",
+        "item_code": item_code,
+        "from_address": from_address,
+        "to_address": to_address,
+        "quantity": quantity,
+    }
+
+
+class SyncEventsTests(TestCase):
+    def setUp(self):
+        invalidate_address_cache()
+        self.addCleanup(invalidate_address_cache)
+        self.user = User.objects.create_user("tsd")
+        stock = Stock.objects.create(title="1")
+        zone = Zone.objects.create(title="A", stock=stock)
+        self.places = [Place.objects.create(title=f"0{n}", zone=zone) for n in range(1, 4)]
+        self.item = Item.objects.create(item_code="I1", weight=1, description="")
+        PlaceItem.objects.create(
+            place=self.places[0], item=self.item, quantity=5, status="ok"
+        )
+
+    def quantity(self, place):
+        row = PlaceItem.objects.filter(place=place, item=self.item).first()
+        return row.quantity if row else 0
+
+    def test_duplicate_key_not_applied_twice(self):
+        events = [move("k1", "i1", "1/a/01", "1/a/02", 2)]
+        first = sync_events(user=self.user, events=[dict(event) for event in events])
+        second = sync_events(user=self.user, events=[dict(event) for event in events])
+
+        self.assertEqual(first, [{"key": "k1", "status": "applied", "quantity": 2}])
+        self.assertEqual(
+            second, [{"key": "k1", "status": "applied", "quantity": 2, "duplicate": True}]
+        )
+        self.assertEqual((self.quantity(self.places[0]), self.quantity(self.places[1])), (3, 2))
+        self.assertEqual(History.objects.count(), 1)
+
+    def test_same_key_other_user(self):
+        other = User.objects.create_user("tsd2")
+        sync_events(user=self.user, events=[move("k1", "I1", "1/A/01", "1/A/02", 1)])
+        result = sync_events(user=other, events=[move("k1", "I1", "1/A/01", "1/A/02", 1)])
+
+        self.assertEqual(result, [{"key": "k1", "status": "applied", "quantity": 1}])
+        self.assertEqual(self.quantity(self.places[1]), 2)
+        self.assertEqual(SyncEvent.objects.filter(key="k1").count(), 2)
+
+    def test_events_applied_in_order(self):
+        result = sync_events(
+            user=self.user,
+            events=[
+                move("k1", "I1", "1/A/01", "1/A/02", 4),
+                move("k2", "I1", "1/A/02", "1/A/03", 3),
+                move("k3", "I1", "1/A/03", "1/A/01", 1),
+                move("k1", "I1", "1/A/01", "1/A/02", 4),
+            ],
+        )
+
+        self.assertEqual(
+            [(row["status"], row.get("quantity"), row.get("duplicate")) for row in result],
+            [("applied", 4, None), ("applied", 3, None), ("applied", 1, None), ("applied", 4, True)],
+        )
+        self.assertEqual([self.quantity(place) for place in self.places], [2, 1, 2])
+
+    def test_partial_move(self):
+        PlaceItem.objects.filter(place=self.places[0]).update(reserved=2)
+        result = sync_events(
+            user=self.user,
+            events=[
+                move("k1", "I1", "1/A/01", "1/A/02", 10),
+                move("k2", "I1", "1/A/01", "1/A/03", 1),
+            ],
+        )
+
+        self.assertEqual(result[0], {"key": "k1", "status": "partial", "quantity": 3})
+        self.assertEqual(result[1]["status"], "rejected")
+        self.assertEqual([self.quantity(place) for place in self.places], [2, 3, 0])
+        self.assertEqual(SyncEvent.objects.get(key="k1").status, "partial")
+
+
+class SyncBatchAPITests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("tsd", password="pass")
+        self.client.force_login(self.user)
+        self.payload = {"events": [move("k1", "I1", "1/A/01", "1/A/02", 1)]}
+
+    def test_requires_permission(self):
+        response = self.client.post(
+            reverse("api:sync"), self.payload, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(SyncEvent.objects.exists())
+
+        self.user.user_permissions.add(Permission.objects.get(codename="change_placeitem"))
+        response = self.client.post(
+            reverse("api:sync"), self.payload, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["status"], "rejected")
@@ -0,0 +1,155 @@
+import hashlib
+import hmac
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from warehouse.models import OutboxDelivery, OutboxEvent, WebhookEndpoint
+from warehouse.services.webhooks import WebhookConnectionPool, deliver_endpoint_batch
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Вебхук-заглушка: запоминает запросы и отвечает server.reply_status"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            {
+                "path": self.path,
+                "headers": dict(self.headers),
+                "body": body,
+                "client_port": self.client_address[1],
+            }
+        )
+        self.send_response(self.server.reply_status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(WEBHOOK_BATCH_SIZE=100, WEBHOOK_MAX_ATTEMPTS=3)
+class DeliverEndpointBatchTests(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = []
+        self.server.reply_status = 200
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.pool = WebhookConnectionPool(timeout=5)
+        self.addCleanup(self.pool.close)
+        self.endpoint = WebhookEndpoint.objects.create(
+            title="test",
+            url=f"http://127.0.0.1:{self.server.server_address[1]}/hook",
+            secret="s3cret",
+        )
+
+    def _deliveries(self, count: int, attempts: int = 0) -> list[OutboxDelivery]:
+        deliveries = []
+        for i in range(count):
+            event = OutboxEvent.objects.create(event_type="stock.moved", payload={"n": i})
+            deliveries.append(
+                OutboxDelivery.objects.create(
+                    event=event,
+                    endpoint=self.endpoint,
+                    attempts=attempts,
+                    next_attempt_at=timezone.now() - timedelta(seconds=1),
+                )
+            )
+        return deliveries
+
+    def _make_due(self):
+        OutboxDelivery.objects.filter(status="pending").update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_one_post_per_batch(self):
+        """Все ожидающие события вебхука уходят одним POST в порядке событий"""
+        deliveries = self._deliveries(5)
+
+        self.assertEqual(deliver_endpoint_batch(self.pool, self.endpoint), 5)
+
+        self.assertEqual(len(self.server.requests), 1)
+        request = self.server.requests[0]
+        self.assertEqual(request["path"], "/hook")
+        events = json.loads(request["body"])["events"]
+        self.assertEqual([e["id"] for e in events], [d.event_id for d in deliveries])
+        self.assertEqual([e["payload"]["n"] for e in events], list(range(5)))
+        self.assertFalse(
+            OutboxDelivery.objects.exclude(status="delivered").exists()
+        )
+        self.assertEqual(deliver_endpoint_batch(self.pool, self.endpoint), 0)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_signature(self):
+        """X-Signature - HMAC-SHA256 тела запроса с секретом вебхука"""
+        self._deliveries(2)
+
+        deliver_endpoint_batch(self.pool, self.endpoint)
+
+        request = self.server.requests[0]
+        expected = hmac.new(b"s3cret", request["body"], hashlib.sha256).hexdigest()
+        self.assertEqual(request["headers"]["X-Signature"], expected)
+
+    def test_retry_until_failed(self):
+        """Ошибка откладывает пакет с задержкой, после WEBHOOK_MAX_ATTEMPTS - failed"""
+        self.server.reply_status = 500
+        self._deliveries(2)
+
+        for attempt in (1, 2):
+            before = timezone.now()
+            self.assertEqual(deliver_endpoint_batch(self.pool, self.endpoint), 0)
+            for delivery in OutboxDelivery.objects.all():
+                self.assertEqual(delivery.status, "pending")
+                self.assertEqual(delivery.attempts, attempt)
+                self.assertGreater(delivery.next_attempt_at, before)
+                self.assertEqual(delivery.last_error, "HTTP 500")
+            # задержка еще не прошла - пакет не отправляется
+            deliver_endpoint_batch(self.pool, self.endpoint)
+            self.assertEqual(len(self.server.requests), attempt)
+            self._make_due()
+
+        deliver_endpoint_batch(self.pool, self.endpoint)
+        self.assertEqual(
+            list(OutboxDelivery.objects.values_list("status", "attempts")),
+            [("failed", 3), ("failed", 3)],
+        )
+        self._make_due()
+        deliver_endpoint_batch(self.pool, self.endpoint)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_attempts_per_delivery(self):
+        """Попытки и failed считаются по каждой доставке пакета"""
+        self.server.reply_status = 503
+        old = self._deliveries(1, attempts=2)[0]
+        new = self._deliveries(1)[0]
+
+        deliver_endpoint_batch(self.pool, self.endpoint)
+
+        old.refresh_from_db()
+        new.refresh_from_db()
+        self.assertEqual((old.status, old.attempts), ("failed", 3))
+        self.assertEqual((new.status, new.attempts), ("pending", 1))
+
+    def test_keep_alive(self):
+        """Пакеты на один сервер идут по одному keep-alive соединению"""
+        self._deliveries(1)
+        deliver_endpoint_batch(self.pool, self.endpoint)
+        self._deliveries(1)
+        deliver_endpoint_batch(self.pool, self.endpoint)
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(
+            self.server.requests[0]["client_port"], self.server.requests[1]["client_port"]
+        )
+        self.assertEqual(len(self.pool._connections), 1)
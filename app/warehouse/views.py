@@ -1,7 +1,6 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
-from django.db.models import Q
 from django.shortcuts import redirect, render
 from django.views import View
 from django.views.generic import ListView, TemplateView
@@ -9,6 +8,8 @@ from django.views.generic import ListView, TemplateView
 from .forms import (HistorySearchForm, ItemSearchForm, MoveItemForm,
                     PlaceItemSearchForm)
 from .models import History, PlaceItem
+from .services import (emit_stock_moved, filter_history, filter_place_items,
+                       subscribed)
 
 
 class MainView(TemplateView):
@@ -69,21 +70,7 @@ class InventoryLotSearchView(LoginRequiredMixin, ListView):
             return qs.none()
 
         if form.is_valid():
-            data = form.cleaned_data
-            if data.get("stock"):
-                qs = qs.filter(place__zone__stock=data["stock"])
-            if data.get("zone"):
-                qs = qs.filter(place__zone__title__icontains=data["zone"])
-            if data.get("place"):
-                qs = qs.filter(place__title__icontains=data["place"])
-            if data.get("item_code"):
-                qs = qs.filter(item__item_code__icontains=data["item_code"])
-            if data.get("status"):
-                qs = qs.filter(status=data["status"])
-            if data.get("qty_min") is not None:
-                qs = qs.filter(quantity__gte=data["qty_min"])
-            if data.get("qty_max") is not None:
-                qs = qs.filter(quantity__lte=data["qty_max"])
+            qs = filter_place_items(qs, form.cleaned_data)
         return qs
 
     def get_context_data(self, **kwargs):
@@ -128,27 +115,13 @@ class InventoryItemSearchView(LoginRequiredMixin, ListView):
             .get_queryset()
             .select_related("item", "place", "place__zone", "place__zone__stock")
         )
-        form = PlaceItemSearchForm(self.request.GET)
+        form = ItemSearchForm(self.request.GET)
 
         if not self.request.GET:
             return qs.none()
 
         if form.is_valid():
-            data = form.cleaned_data
-            if data.get("stock"):
-                qs = qs.filter(place__zone__stock=data["stock"])
-            if data.get("zone"):
-                qs = qs.filter(place__zone__title__icontains=data["zone"])
-            if data.get("place"):
-                qs = qs.filter(place__title__icontains=data["place"])
-            if data.get("item_code"):
-                qs = qs.filter(item__item_code__icontains=data["item_code"])
-            if data.get("status"):
-                qs = qs.filter(status=data["status"])
-            if data.get("weight_min") is not None:
-                qs = qs.filter(item__weight__gte=data["weight_min"])
-            if data.get("weight_max") is not None:
-                qs = qs.filter(item__weight__lte=data["weight_max"])
+            qs = filter_place_items(qs, form.cleaned_data)
         return qs
 
     def get_context_data(self, **kwargs):
@@ -197,40 +170,7 @@ class InventoryHistoryView(LoginRequiredMixin, ListView):
         if not form.is_valid():
             return qs.none()
 
-        data = form.cleaned_data
-
-        if data["item_code"]:
-            qs = qs.filter(item_code__icontains=data["item_code"].strip().upper())
-
-            search_text = ""
-            if data["stock"]:
-                search_text = data["stock"].title.strip().upper()
-            elif data["zone"]:
-                search_text = data["zone"].strip().upper()
-            elif data["place"]:
-                search_text = data["place"].strip().upper()
-
-            if search_text:
-                qs = qs.filter(
-                    Q(old_address__icontains=search_text)
-                    | Q(new_address__icontains=search_text)
-                )
-
-            if data["user"]:
-                user_query = data["user"].strip()
-                qs = qs.filter(
-                    Q(user__username__icontains=user_query)
-                    | Q(user__first_name__icontains=user_query)
-                    | Q(user__last_name__icontains=user_query)
-                    | Q(user__email__icontains=user_query)
-                )
-
-            if data["date_from"]:
-                qs = qs.filter(date__date__gte=data["date_from"])
-            if data["date_to"]:
-                qs = qs.filter(date__date__lte=data["date_to"])
-
-        return qs
+        return filter_history(qs, form.cleaned_data)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -299,6 +239,12 @@ class InventoryMoveView(LoginRequiredMixin, View):
                     new_address=to_place.full_address,
                     count=quantity,
                 )
+                if subscribed("stock.moved"):
+                    emit_stock_moved(
+                        from_place=place_item.place,
+                        to_place=to_place,
+                        moved={item.pk: quantity},
+                    )
 
                 messages.success(request, f"Товар #{item.item_code} перемещён")
                 return redirect("warehouse:inventory-move")
@@ -1,7 +1,9 @@
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
 
-from .models import Inbound, InboundItem, Outbound, OutboundItem
+from .models import (ArchivedWave, Inbound, InboundItem, InboundStatusService,
+                     Outbound, OutboundItem, OutboundPick,
+                     OutboundStatusService, PickBatch, WaveDocument)
 
 """
 Опции административной панели
@@ -24,6 +26,55 @@ class ...Inline - для связи <One to Many> и <Many to Many>
 """
 
 
+def bulk_status_action(service, new_status: str, description: str):
+    """Действие админки: массовая смена статуса выбранных волн через сервис статусов"""
+
+    @admin.action(description=description)
+    def action(modeladmin, request, queryset):
+        pks = list(queryset.values_list("pk", flat=True))
+        results = service.change_status_bulk(pks=pks, new_status=new_status)
+
+        changed = [result for result in results if result["ok"]]
+        if changed:
+            modeladmin.message_user(
+                request, f"Статус изменен: {len(changed)}", messages.SUCCESS
+            )
+        for result in results:
+            if not result["ok"]:
+                modeladmin.message_user(
+                    request,
+                    f"{result.get('number', result['pk'])}: {result['error']}",
+                    messages.ERROR,
+                )
+
+    action.__name__ = f"set_status_{new_status}"
+    return action
+
+
+class WaveDocumentInline(admin.TabularInline):
+    model = WaveDocument
+    fields = ("name", "size", "mime", "hash", "uploaded_at")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+class OutboundPickInline(admin.TabularInline):
+    model = OutboundPick
+    fields = (
+        "batch",
+        "walk_sequence",
+        "full_address",
+        "item_code",
+        "quantity",
+        "status",
+        "confirmed_by",
+    )
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
 @admin.register(Inbound)
 class InboundAdmin(admin.ModelAdmin):
     list_display = (
@@ -48,6 +99,12 @@ class InboundAdmin(admin.ModelAdmin):
     )
     search_help_text = "Номер , поставщик, дата, описание"
     list_per_page = 50
+    inlines = [WaveDocumentInline]
+    actions = [
+        bulk_status_action(InboundStatusService, "in_progress", "Статус: В процессе"),
+        bulk_status_action(InboundStatusService, "completed", "Статус: Завершен"),
+        bulk_status_action(InboundStatusService, "cancelled", "Статус: Отменен"),
+    ]
 
 
 @admin.register(InboundItem)
@@ -56,6 +113,7 @@ class InboundItemAdmin(admin.ModelAdmin):
         "inbound",
         "item",
         "total_quantity",
+        "putaway_quantity",
         "created_at",
     )
     ordering = ("-created_at",)
@@ -71,13 +129,22 @@ class OutboundAdmin(admin.ModelAdmin):
         "recipient",
         "planned_date",
         "actual_date",
+        "packing_list_status",
         "description_short",
         "updated_at",
         "created_at",
         "created_by",
     )
     ordering = ("-created_at",)
-    readonly_fields = ["outbound_number", "created_by", "updated_at", "created_at"]
+    readonly_fields = [
+        "outbound_number",
+        "packing_list_status",
+        "packing_list_error",
+        "packing_list_requested_at",
+        "created_by",
+        "updated_at",
+        "created_at",
+    ]
     search_fields = (
         "outbound_number",
         "recipient",
@@ -86,6 +153,12 @@ class OutboundAdmin(admin.ModelAdmin):
     )
     search_help_text = "Номер , заказчик, дата, описание"
     list_per_page = 50
+    inlines = [OutboundPickInline, WaveDocumentInline]
+    actions = [
+        bulk_status_action(OutboundStatusService, "in_progress", "Статус: В процессе"),
+        bulk_status_action(OutboundStatusService, "completed", "Статус: Завершен"),
+        bulk_status_action(OutboundStatusService, "cancelled", "Статус: Отменен"),
+    ]
 
 
 @admin.register(OutboundItem)
@@ -98,3 +171,42 @@ class OutboundItemAdmin(admin.ModelAdmin):
     )
     ordering = ("-created_at",)
     list_per_page = 50
+
+
+@admin.register(PickBatch)
+class PickBatchAdmin(admin.ModelAdmin):
+    list_display = ("outbound", "number", "status", "claimed_by", "claimed_at")
+    ordering = ("-outbound", "number")
+    list_filter = ("status",)
+    search_fields = ("outbound__outbound_number",)
+    search_help_text = "Номер отгрузки"
+    readonly_fields = ["outbound", "number", "claimed_at"]
+    list_per_page = 50
+
+
+@admin.register(ArchivedWave)
+class ArchivedWaveAdmin(admin.ModelAdmin):
+    list_display = (
+        "number",
+        "wave_type",
+        "status",
+        "stock",
+        "counterparty",
+        "planned_date",
+        "actual_date",
+        "total_items",
+        "total_quantity",
+        "documents_archive",
+        "archived_at",
+    )
+    ordering = ("-created_at",)
+    list_filter = ("wave_type", "status")
+    search_fields = ("number", "counterparty")
+    search_help_text = "Номер, поставщик / заказчик"
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
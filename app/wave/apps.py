@@ -7,3 +7,7 @@ class WaveConfig(AppConfig):
 
     def ready(self):
         from . import signals
+        from .pdf_generator import register_fonts
+
+        # шрифты регистрируются один раз на процесс при старте
+        register_fonts()
@@ -27,6 +27,7 @@ class WaveSearchForm(forms.Form):
         label="Фактическая дата",
         widget=forms.DateInput(attrs={"type": "date"}),
     )
+    include_archived = forms.BooleanField(required=False, label="С архивом")
 
 
 class InboundSearchForm(WaveSearchForm):
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from wave.services import archive_waves
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит завершенные и отмененные волны старше N дней в архивные таблицы, "
+        "документы упаковываются в архивы по месяцам в ARCHIVE_COLD_DIR"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=365, help="Возраст волны в днях")
+        parser.add_argument(
+            "--type",
+            choices=["inbound", "outbound"],
+            default=None,
+            help="Тип волн (по умолчанию - оба)",
+        )
+        parser.add_argument("--batch-size", type=int, default=100, help="Волн в транзакции")
+
+    def handle(self, *args, **options):
+        wave_types = [options["type"]] if options["type"] else ["inbound", "outbound"]
+        for wave_type in wave_types:
+            archived = archive_waves(
+                wave_type, days=options["days"], batch_size=options["batch_size"]
+            )
+            self.stdout.write(self.style.SUCCESS(f"{wave_type}: заархивировано {archived}"))
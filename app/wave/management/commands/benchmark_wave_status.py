@@ -0,0 +1,102 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from warehouse.models import Item, Place, PlaceItem
+from wave.models import (Inbound, InboundItem, InboundStatusService, Outbound,
+                         OutboundItem, OutboundStatusService)
+
+TECHNICAL_PLACES = ("BS01", "BS02", "INBOUND", "OUTBOUND", "NEW")
+
+
+class Rollback(Exception):
+    """Откат тестовых данных после замера"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер смены статусов поставки и отгрузки на волнах из N позиций. "
+        "Все тестовые данные откатываются после замера"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=10000, help="Позиций в волне")
+
+    def handle(self, *args, **options):
+        lines = options["lines"]
+        storage_place = (
+            Place.objects.exclude(title__in=TECHNICAL_PLACES)
+            .select_related("zone__stock")
+            .first()
+        )
+        if storage_place is None or not storage_place.zone or not storage_place.zone.stock:
+            raise CommandError("Нет места хранения, привязанного к складу")
+        stock = storage_place.zone.stock
+
+        try:
+            with transaction.atomic():
+                self._run(lines=lines, stock=stock, storage_place=storage_place)
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Тестовые данные откачены")
+
+    def _measure(self, title, func, **kwargs):
+        started = time.perf_counter()
+        func(**kwargs)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{title:<40} {elapsed * 1000:>10.1f} мс")
+        return elapsed
+
+    def _run(self, *, lines, stock, storage_place):
+        self.stdout.write(f"Позиций в волне: {lines}")
+
+        items = Item.objects.bulk_create(
+            Item(item_code=f"BENCH-{i:06d}", weight=1) for i in range(lines)
+        )
+        # сток на месте хранения под отгрузку
+        PlaceItem.objects.bulk_create(
+            PlaceItem(
+                place=storage_place,
+                item=item,
+                quantity=10,
+                full_address=storage_place.full_address,
+                status="ok",
+            )
+            for item in items
+        )
+
+        inbound = Inbound.objects.create(stock=stock, planned_date="2000-01-01")
+        # InboundItem/OutboundItem - multi-table наследники, bulk_create недоступен
+        for item in items:
+            InboundItem.objects.create(inbound=inbound, item=item, total_quantity=5)
+        outbound = Outbound.objects.create(stock=stock, planned_date="2000-01-01")
+        for item in items:
+            OutboundItem.objects.create(outbound=outbound, item=item, total_quantity=8)
+
+        total = 0
+        total += self._measure(
+            "inbound planned -> in_progress",
+            InboundStatusService.change_status,
+            inbound=inbound,
+            new_status="in_progress",
+        )
+        total += self._measure(
+            "inbound in_progress -> completed",
+            InboundStatusService.change_status,
+            inbound=inbound,
+            new_status="completed",
+        )
+        total += self._measure(
+            "outbound planned -> in_progress",
+            OutboundStatusService.change_status,
+            outbound=outbound,
+            new_status="in_progress",
+        )
+        total += self._measure(
+            "outbound in_progress -> cancelled",
+            OutboundStatusService.change_status,
+            outbound=outbound,
+            new_status="cancelled",
+        )
+        self.stdout.write(self.style.SUCCESS(f"Итого: {total * 1000:.1f} мс"))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from warehouse.models import Stock
+from wave.services import consolidate_outbounds, consolidation_groups
+
+
+class Command(BaseCommand):
+    help = (
+        "Консолидированный запуск подбора запланированных отгрузок: отгрузки одного склада "
+        "и одной планируемой даты резервируются одним проходом по остатку"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stock", help="Склад (pk или название), по умолчанию все")
+        parser.add_argument("--date", help="Планируемая дата YYYY-MM-DD, по умолчанию все")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Только показать группы отгрузок"
+        )
+
+    def handle(self, *args, **options):
+        stock_id = None
+        if options["stock"]:
+            value = options["stock"].strip()
+            stock = (
+                Stock.objects.filter(pk=value).first()
+                if value.isdigit()
+                else Stock.objects.filter(title__iexact=value).first()
+            )
+            if stock is None:
+                raise CommandError(f"Склад {value} не найден")
+            stock_id = stock.pk
+
+        planned_date = None
+        if options["date"]:
+            planned_date = parse_date(options["date"])
+            if planned_date is None:
+                raise CommandError(f"Некорректная дата {options['date']}")
+
+        if options["dry_run"]:
+            for group in consolidation_groups(stock_id=stock_id, planned_date=planned_date):
+                self.stdout.write(
+                    f"{group['stock']} {group['planned_date']}: "
+                    f"отгрузок {len(group['outbounds'])}, позиций {group['lines']}"
+                )
+            return
+
+        for group in consolidate_outbounds(stock_id=stock_id, planned_date=planned_date):
+            started = [result for result in group["results"] if result["ok"]]
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{group['stock']} {group['planned_date']}: "
+                    f"в подбор {len(started)} из {len(group['results'])}"
+                )
+            )
+            for result in group["results"]:
+                if not result["ok"]:
+                    self.stdout.write(self.style.ERROR(f"{result['number']}: {result['error']}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from wave.services import collect_document_garbage
+
+
+class Command(BaseCommand):
+    help = "Удаляет из хранилища документов содержимое, на которое нет ссылок"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=None,
+            help="Минимальный возраст файла в секундах (по умолчанию DOCUMENT_GC_MIN_AGE)",
+        )
+
+    def handle(self, *args, **options):
+        stats = collect_document_garbage(min_age=options["min_age"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено файлов: {stats['files']}, освобождено: {stats['bytes']} байт"
+            )
+        )
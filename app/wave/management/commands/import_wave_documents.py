@@ -0,0 +1,52 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from wave.models import Inbound, Outbound
+from wave.pdf_generator.packing_list import packing_list_path
+from wave.services import (add_wave_document, invalidate_archive,
+                           store_blob, wave_folder_files)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _read_chunks(path: str):
+    with open(path, "rb") as src:
+        while chunk := src.read(CHUNK_SIZE):
+            yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит документы, загруженные в папки волн, в хранилище документов. "
+        "Сформированные упаковочные листы остаются в папках"
+    )
+
+    def handle(self, *args, **options):
+        imported = 0
+        for wave in [*Inbound.objects.all(), *Outbound.objects.all()]:
+            folder_path = wave.get_uploads_dir()
+            generated = set()
+            if isinstance(wave, Outbound):
+                generated.add(
+                    os.path.basename(packing_list_path(folder_path, wave.outbound_number))
+                )
+            files = [f for f in wave_folder_files(folder_path) if f not in generated]
+            if not files:
+                continue
+
+            with transaction.atomic():
+                for filename in files:
+                    add_wave_document(
+                        wave=wave,
+                        name=filename,
+                        blob=store_blob(_read_chunks(os.path.join(folder_path, filename))),
+                    )
+            for filename in files:
+                os.remove(os.path.join(folder_path, filename))
+            invalidate_archive(folder_path)
+            imported += len(files)
+            self.stdout.write(f"{wave}: {len(files)}")
+
+        self.stdout.write(self.style.SUCCESS(f"Перенесено документов: {imported}"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from wave.models import Outbound
+from wave.services import regenerate_packing_lists
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересоздает упаковочные листы отгрузок в пуле процессов. "
+        "По умолчанию - все завершенные отгрузки, у которых изменилось содержимое"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("ids", nargs="*", type=int, help="id отгрузок")
+        parser.add_argument(
+            "--workers", type=int, default=None, help="Кол-во процессов (по умолчанию - кол-во CPU)"
+        )
+        parser.add_argument(
+            "--force", action="store_true", help="Пересоздать и неизменившиеся листы"
+        )
+
+    def handle(self, *args, **options):
+        outbounds = Outbound.objects.filter(status="completed").order_by("pk")
+        if options["ids"]:
+            outbounds = outbounds.filter(pk__in=options["ids"])
+
+        stats = regenerate_packing_lists(
+            outbounds, workers=options["workers"], force=options["force"]
+        )
+
+        seconds = stats["seconds"] or 1e-9
+        self.stdout.write(
+            f"Документов: {stats['documents']}, строк: {stats['lines']}, "
+            f"пропущено без изменений: {stats['skipped']}, "
+            f"ошибок: {stats['failed']}, время: {stats['seconds']:.2f} с"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Производительность: {stats['documents'] / seconds:.1f} док/с, "
+                f"{stats['lines'] / seconds:.0f} строк/с"
+            )
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from wave.services import stale_pending_packing_lists
+from wave.tasks import generate_packing_list_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Формирует упаковочные листы, зависшие в статусе \"pending\": фоновая очередь "
+        "живет в памяти процесса и теряется при его перезапуске. Запускать по расписанию"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutes",
+            type=int,
+            default=None,
+            help="Сколько минут лист должен быть в очереди (по умолчанию PACKING_LIST_PENDING_TIMEOUT)",
+        )
+
+    def handle(self, *args, **options):
+        pks = list(
+            stale_pending_packing_lists(options["minutes"])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        for pk in pks:
+            # статус ready / failed записывает сама задача
+            generate_packing_list_task(pk)
+        self.stdout.write(self.style.SUCCESS(f"Переформировано листов: {len(pks)}"))
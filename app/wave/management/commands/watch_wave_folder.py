@@ -0,0 +1,120 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from warehouse.models import Stock
+from wave.forms import WAVE_STATUS_CHOICES
+from wave.services import (claim_hot_folder_file, hot_folder_files,
+                           hot_folder_watcher, ingest_hot_folder_file,
+                           prepare_hot_folder)
+
+
+class Command(BaseCommand):
+    help = (
+        "Горячая папка: создает поставки/отгрузки по файлам INB-FORM_<поставщик>"
+        "[_<ГГГГ-ММ-ДД>].xlsx / OUT-FORM_<заказчик>[_...].csv, "
+        "обработанные файлы переносятся в done, ошибочные - в failed с отчетом"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=settings.HOT_FOLDER_DIR, help="Папка")
+        parser.add_argument(
+            "--stock", default=settings.HOT_FOLDER_STOCK, help="Склад волн (pk или название)"
+        )
+        parser.add_argument(
+            "--user", default=settings.HOT_FOLDER_USER, help="Пользователь - автор волн"
+        )
+        parser.add_argument(
+            "--status",
+            default="planned",
+            choices=[status for status, _ in WAVE_STATUS_CHOICES],
+            help="Статус создаваемых волн",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.HOT_FOLDER_WORKERS,
+            help="Кол-во одновременно обрабатываемых файлов",
+        )
+        parser.add_argument(
+            "--poll", action="store_true", help="Опрос папки вместо inotify"
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Обработать файлы в папке и выйти"
+        )
+
+    def _stock(self, value):
+        stocks = Stock.objects.all()
+        if value:
+            stocks = stocks.filter(pk=value) if value.isdigit() else stocks.filter(title=value)
+        stocks = list(stocks[:2])
+        if len(stocks) != 1:
+            raise CommandError("Склад не найден или не однозначен, укажите --stock")
+        return stocks[0]
+
+    def _user(self, username):
+        if not username:
+            return None
+        try:
+            return get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Пользователь {username} не найден")
+
+    def handle(self, *args, **options):
+        root = options["dir"]
+        stock = self._stock(options["stock"])
+        user = self._user(options["user"])
+        workers = max(options["workers"], 1)
+        prepare_hot_folder(root)
+
+        def submit(pool, name):
+            path = claim_hot_folder_file(root, name)
+            if path is None:
+                return None
+            return pool.submit(
+                ingest_hot_folder_file,
+                root=root,
+                path=path,
+                user=user,
+                stock=stock,
+                status=options["status"],
+            )
+
+        queue, running = deque(), set()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hot-folder") as pool:
+            if options["once"]:
+                # файлы, уже лежащие в папке: обрабатываются все, по workers одновременно
+                for name in hot_folder_files(root):
+                    future = submit(pool, name)
+                    if future:
+                        running.add(future)
+                for future in running:
+                    self.stdout.write(future.result())
+                return
+
+            watcher = hot_folder_watcher(
+                root, settings.HOT_FOLDER_POLL_INTERVAL, polling=options["poll"]
+            )
+            self.stdout.write(f"{type(watcher).__name__}: {root}, workers = {workers}")
+            try:
+                while True:
+                    # пока есть работа, очередь проверяется чаще
+                    timeout = 1 if queue or running else settings.HOT_FOLDER_POLL_INTERVAL
+                    for name in watcher.wait(timeout):
+                        if name not in queue:
+                            queue.append(name)
+
+                    for future in [future for future in running if future.done()]:
+                        running.discard(future)
+                        self.stdout.write(future.result())
+
+                    # в работе не больше workers файлов, остальные ждут в очереди
+                    while queue and len(running) < workers:
+                        future = submit(pool, queue.popleft())
+                        if future:
+                            running.add(future)
+            finally:
+                watcher.close()
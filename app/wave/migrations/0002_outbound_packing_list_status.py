@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outbound",
+            name="packing_list_error",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=500,
+                verbose_name="Ошибка упаковочного листа",
+            ),
+        ),
+        migrations.AddField(
+            model_name="outbound",
+            name="packing_list_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "Нет"),
+                    ("pending", "Формируется"),
+                    ("ready", "Готов"),
+                    ("failed", "Ошибка"),
+                ],
+                default="none",
+                max_length=20,
+                verbose_name="Упаковочный лист",
+            ),
+        ),
+    ]
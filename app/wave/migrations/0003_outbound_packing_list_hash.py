@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0002_outbound_packing_list_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outbound",
+            name="packing_list_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=64,
+                verbose_name="Ключ упаковочного листа",
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0003_outbound_packing_list_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WaveDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, verbose_name="Имя файла")),
+                ("size", models.PositiveBigIntegerField(verbose_name="Размер")),
+                (
+                    "hash",
+                    models.CharField(
+                        db_index=True, max_length=64, verbose_name="SHA-256"
+                    ),
+                ),
+                (
+                    "mime",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="MIME"
+                    ),
+                ),
+                (
+                    "uploaded_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Загружен"),
+                ),
+                (
+                    "wave",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="documents",
+                        to="wave.wave",
+                        verbose_name="Волна",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Документ волны",
+                "verbose_name_plural": "Документы волн",
+                "ordering": ["name"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("wave", "name"), name="unique_wave_document_name"
+                    )
+                ],
+            },
+        ),
+    ]
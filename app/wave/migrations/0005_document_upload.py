@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:49
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0004_wave_document"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentUpload",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("name", models.CharField(max_length=255, verbose_name="Имя файла")),
+                ("size", models.PositiveBigIntegerField(verbose_name="Размер")),
+                (
+                    "offset",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Принято байт"
+                    ),
+                ),
+                (
+                    "expected_hash",
+                    models.CharField(blank=True, default="", max_length=64),
+                ),
+                (
+                    "hash",
+                    models.CharField(
+                        blank=True, default="", max_length=64, verbose_name="SHA-256"
+                    ),
+                ),
+                (
+                    "mime",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="MIME"
+                    ),
+                ),
+                (
+                    "is_complete",
+                    models.BooleanField(default=False, verbose_name="Загружен"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Создан"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Обновлен"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="document_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Загрузка документа",
+                "verbose_name_plural": "Загрузки документов",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
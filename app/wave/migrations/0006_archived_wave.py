@@ -0,0 +1,183 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0001_initial"),
+        ("wave", "0005_document_upload"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedWave",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "original_id",
+                    models.PositiveBigIntegerField(
+                        unique=True, verbose_name="ID волны"
+                    ),
+                ),
+                (
+                    "wave_type",
+                    models.CharField(
+                        choices=[("inbound", "Поставка"), ("outbound", "Отгрузка")],
+                        max_length=10,
+                        verbose_name="Тип волны",
+                    ),
+                ),
+                (
+                    "number",
+                    models.CharField(max_length=50, unique=True, verbose_name="Номер"),
+                ),
+                (
+                    "counterparty",
+                    models.CharField(
+                        blank=True, max_length=200, verbose_name="Поставщик / заказчик"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("planned", "Запланирован"),
+                            ("in_progress", "В процессе"),
+                            ("completed", "Завершен"),
+                            ("cancelled", "Отменен"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("planned_date", models.DateField(verbose_name="Планируемая дата")),
+                (
+                    "actual_date",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Фактическая дата"
+                    ),
+                ),
+                (
+                    "description",
+                    models.TextField(
+                        blank=True, max_length=500, null=True, verbose_name="Описание"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Создан")),
+                ("updated_at", models.DateTimeField(verbose_name="Обновлен")),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Архивирован"),
+                ),
+                (
+                    "total_items",
+                    models.PositiveIntegerField(default=0, verbose_name="Позиций"),
+                ),
+                (
+                    "total_quantity",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Кол-во"),
+                ),
+                (
+                    "documents_archive",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        max_length=255,
+                        verbose_name="Архив документов",
+                    ),
+                ),
+                (
+                    "documents",
+                    models.JSONField(
+                        blank=True, default=list, verbose_name="Документы"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Создал",
+                    ),
+                ),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_waves",
+                        to="warehouse.stock",
+                        verbose_name="Склад",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Архивная волна",
+                "verbose_name_plural": "Архивные волны",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedWaveItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "total_quantity",
+                    models.PositiveIntegerField(verbose_name="Количество"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Создан")),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="archived_wave_items",
+                        to="warehouse.item",
+                        verbose_name="Товар",
+                    ),
+                ),
+                (
+                    "wave",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="wave.archivedwave",
+                        verbose_name="Архивная волна",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Позиция архивной волны",
+                "verbose_name_plural": "Позиции архивных волн",
+                "ordering": ["pk"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="archivedwave",
+            index=models.Index(
+                fields=["wave_type", "-created_at"],
+                name="wave_archiv_wave_ty_c13aef_idx",
+            ),
+        ),
+    ]
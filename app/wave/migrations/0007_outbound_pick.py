@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("warehouse", "0008_walk_sequence"),
+        ("wave", "0006_archived_wave"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboundPick",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "item_code",
+                    models.CharField(max_length=100, verbose_name="Код товара"),
+                ),
+                (
+                    "full_address",
+                    models.CharField(max_length=500, verbose_name="Адрес"),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="Количество")),
+                (
+                    "walk_sequence",
+                    models.PositiveIntegerField(
+                        blank=True, null=True, verbose_name="Маршрут обхода"
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="warehouse.item",
+                        verbose_name="Товар",
+                    ),
+                ),
+                (
+                    "outbound",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="picks",
+                        to="wave.outbound",
+                        verbose_name="Отгрузка",
+                    ),
+                ),
+                (
+                    "place",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="warehouse.place",
+                        verbose_name="Место",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Строка подбора",
+                "verbose_name_plural": "Строки подбора",
+                "ordering": ["outbound", "walk_sequence", "full_address", "pk"],
+            },
+        ),
+    ]
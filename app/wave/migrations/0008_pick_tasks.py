@@ -0,0 +1,129 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# задачи, созданные до резервирования, уже перенесены на OUTBOUND
+PICKS_DONE_SQL = "UPDATE wave_outboundpick SET status = 'done'"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0007_outbound_pick"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="outboundpick",
+            options={
+                "ordering": ["outbound", "walk_sequence", "full_address", "pk"],
+                "verbose_name": "Задача подбора",
+                "verbose_name_plural": "Задачи подбора",
+            },
+        ),
+        migrations.AddField(
+            model_name="outboundpick",
+            name="confirmed_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Подобрано"),
+        ),
+        migrations.AddField(
+            model_name="outboundpick",
+            name="confirmed_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Подобрал",
+            ),
+        ),
+        migrations.AddField(
+            model_name="outboundpick",
+            name="status",
+            field=models.CharField(
+                choices=[("open", "Ожидает"), ("done", "Подобрано")],
+                default="open",
+                max_length=20,
+                verbose_name="Статус",
+            ),
+        ),
+        migrations.RunSQL(PICKS_DONE_SQL, migrations.RunSQL.noop),
+        migrations.CreateModel(
+            name="PickBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField(verbose_name="Номер")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("open", "Ожидает"),
+                            ("claimed", "В работе"),
+                            ("done", "Собран"),
+                        ],
+                        default="open",
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "claimed_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Взят"),
+                ),
+                (
+                    "claimed_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Сборщик",
+                    ),
+                ),
+                (
+                    "outbound",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pick_batches",
+                        to="wave.outbound",
+                        verbose_name="Отгрузка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Пакет подбора",
+                "verbose_name_plural": "Пакеты подбора",
+                "ordering": ["outbound", "number"],
+            },
+        ),
+        migrations.AddField(
+            model_name="outboundpick",
+            name="batch",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="picks",
+                to="wave.pickbatch",
+                verbose_name="Пакет",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pickbatch",
+            index=models.Index(
+                fields=["status", "outbound"], name="wave_pickba_status_eccd99_idx"
+            ),
+        ),
+    ]
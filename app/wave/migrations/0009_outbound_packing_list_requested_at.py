@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0008_pick_tasks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outbound",
+            name="packing_list_requested_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Лист поставлен в очередь"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wave", "0009_outbound_packing_list_requested_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inbounditem",
+            name="putaway_quantity",
+            field=models.PositiveIntegerField(
+                db_default=0, default=0, verbose_name="Размещено"
+            ),
+        ),
+    ]
@@ -1,18 +1,39 @@
 import logging
 import os
+import uuid
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
+from django.db import connection, models, transaction
+from django.db.models import Sum
 from django.utils import timezone
 
-from warehouse.models import Item, Place, PlaceItem, Stock
-from wave.pdf_generator import generate_packing_list_pdf
+from warehouse.models import History, Item, Place, PlaceItem, Stock
+from warehouse.services import (add_items_to_place, allocate_sources,
+                                available_quantities, emit_events,
+                                move_items_between_places, pick_reserved_items,
+                                place_full_address, release_reserved_items,
+                                take_items_from_place)
+from wave.tasks import schedule_packing_list
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# ключи pg_advisory_xact_lock нумерации поставок / отгрузок
+INBOUND_NUMBER_LOCK_KEY = 4301
+OUTBOUND_NUMBER_LOCK_KEY = 4302
+
+
+def _lock_wave_numbering(key: int):
+    """
+    Нумерация волн по счетчику за год сериализуется до конца транзакции:
+    параллельно создаваемые волны (горячая папка, несколько запросов)
+    иначе получают одинаковый номер
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", [key])
+
 
 class Wave(models.Model):
     """
@@ -162,15 +183,15 @@ class Inbound(Wave):
         super().save(*args, **kwargs)
 
         if is_new and not self.inbound_number:
+            _lock_wave_numbering(INBOUND_NUMBER_LOCK_KEY)
             year = timezone.now().year
             count = Inbound.objects.filter(created_at__year=year).count()
             self.inbound_number = f"INB-{year}-{count:04d}"
             super().save(update_fields=["inbound_number"])
 
     def get_uploads_dir(self) -> str:
-        path = os.path.join(settings.MEDIA_ROOT, f"inbounds", str(self.inbound_number))
-        os.makedirs(path, exist_ok=True)
-        return path
+        """Папка формируемых файлов волны (не создается при обращении)"""
+        return os.path.join(settings.MEDIA_ROOT, f"inbounds", str(self.inbound_number))
 
     def __str__(self):
         return f"{self.inbound_number}"
@@ -183,12 +204,38 @@ class Outbound(Wave):
 
     outbound_number: str
     recipient: str
+    packing_list_status: str
+    packing_list_error: str
+    packing_list_hash: str: ключ содержимого последнего сформированного упаковочного листа
+    packing_list_requested_at: datetime | None: когда лист поставлен в очередь формирования
     """
 
+    PACKING_LIST_STATUS_CHOICES = [
+        ("none", "Нет"),
+        ("pending", "Формируется"),
+        ("ready", "Готов"),
+        ("failed", "Ошибка"),
+    ]
+
     outbound_number = models.CharField(
         max_length=50, unique=True, verbose_name="Номер отгрузки", null=True, blank=True
     )
     recipient = models.CharField(max_length=200, blank=True, verbose_name="Заказчик")
+    packing_list_status = models.CharField(
+        max_length=20,
+        choices=PACKING_LIST_STATUS_CHOICES,
+        default="none",
+        verbose_name="Упаковочный лист",
+    )
+    packing_list_error = models.CharField(
+        max_length=500, blank=True, default="", verbose_name="Ошибка упаковочного листа"
+    )
+    packing_list_hash = models.CharField(
+        max_length=64, blank=True, default="", verbose_name="Ключ упаковочного листа"
+    )
+    packing_list_requested_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Лист поставлен в очередь"
+    )
 
     class Meta:
         verbose_name = "Отгрузка"
@@ -202,17 +249,15 @@ class Outbound(Wave):
         super().save(*args, **kwargs)
 
         if is_new and not self.outbound_number:
+            _lock_wave_numbering(OUTBOUND_NUMBER_LOCK_KEY)
             year = timezone.now().year
             count = Outbound.objects.filter(created_at__year=year).count()
             self.outbound_number = f"OUT-{year}-{count:04d}"
             super().save(update_fields=["outbound_number"])
 
     def get_uploads_dir(self) -> str:
-        path = os.path.join(
-            settings.MEDIA_ROOT, f"outbounds", str(self.outbound_number)
-        )
-        os.makedirs(path, exist_ok=True)
-        return path
+        """Папка формируемых файлов волны (не создается при обращении)"""
+        return os.path.join(settings.MEDIA_ROOT, f"outbounds", str(self.outbound_number))
 
     def __str__(self):
         return f"{self.outbound_number}"
@@ -226,6 +271,7 @@ class InboundItem(WaveItem):
     pk: int
     inbound: Inbound
     total_quantity: int
+    putaway_quantity: int: размещено с NEW (см. putaway_inbound)
     created_at: datetime
     item: Item
     """
@@ -236,6 +282,9 @@ class InboundItem(WaveItem):
         related_name="inbound_items",
         verbose_name="Поставка",
     )
+    putaway_quantity = models.PositiveIntegerField(
+        default=0, db_default=0, verbose_name="Размещено"
+    )
 
     class Meta:
         verbose_name = "Позиция поставки"
@@ -268,12 +317,374 @@ class OutboundItem(WaveItem):
         ordering = ["pk"]
 
 
+class PickBatch(models.Model):
+    """
+    Пакет задач подбора отгрузки: участок маршрута обхода для одного сборщика
+    Пакеты одной отгрузки берутся разными сборщиками параллельно
+
+    pk: int
+    outbound: Outbound
+    number: int: номер пакета в отгрузке (по маршруту обхода)
+    status: str: open / claimed / done
+    claimed_by: User | None
+    claimed_at: datetime | None
+    """
+
+    STATUS_CHOICES = [
+        ("open", "Ожидает"),
+        ("claimed", "В работе"),
+        ("done", "Собран"),
+    ]
+
+    outbound = models.ForeignKey(
+        Outbound, on_delete=models.CASCADE, related_name="pick_batches", verbose_name="Отгрузка"
+    )
+    number = models.PositiveIntegerField(verbose_name="Номер")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="open", verbose_name="Статус"
+    )
+    claimed_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Сборщик"
+    )
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="Взят")
+
+    class Meta:
+        verbose_name = "Пакет подбора"
+        verbose_name_plural = "Пакеты подбора"
+        ordering = ["outbound", "number"]
+        indexes = [models.Index(fields=["status", "outbound"])]
+
+    def __str__(self):
+        return f"{self.outbound_id}-{self.number}"
+
+
+class OutboundPick(models.Model):
+    """
+    Задача подбора отгрузки: взять quantity товара с места
+    Создается при переходе отгрузки в in_progress, товар резервируется на месте
+    и переносится на OUTBOUND только при подтверждении задачи.
+    Задачи идут в порядке маршрута обхода склада
+
+    pk: int
+    outbound: Outbound
+    batch: PickBatch | None
+    item: Item
+    place: Place | None: место-источник (None - место удалено)
+    item_code: str
+    full_address: str
+    quantity: int
+    walk_sequence: int | None: номер места в маршруте обхода на момент резервирования
+    status: str: open / done
+    confirmed_by: User | None
+    confirmed_at: datetime | None
+    """
+
+    STATUS_CHOICES = [
+        ("open", "Ожидает"),
+        ("done", "Подобрано"),
+    ]
+
+    outbound = models.ForeignKey(
+        Outbound, on_delete=models.CASCADE, related_name="picks", verbose_name="Отгрузка"
+    )
+    batch = models.ForeignKey(
+        PickBatch,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="picks",
+        verbose_name="Пакет",
+    )
+    item = models.ForeignKey(Item, on_delete=models.PROTECT, verbose_name="Товар")
+    place = models.ForeignKey(
+        Place, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Место"
+    )
+    item_code = models.CharField(max_length=100, verbose_name="Код товара")
+    full_address = models.CharField(max_length=500, verbose_name="Адрес")
+    quantity = models.PositiveIntegerField(verbose_name="Количество")
+    walk_sequence = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Маршрут обхода"
+    )
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="open", verbose_name="Статус"
+    )
+    confirmed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Подобрал",
+    )
+    confirmed_at = models.DateTimeField(null=True, blank=True, verbose_name="Подобрано")
+
+    class Meta:
+        verbose_name = "Задача подбора"
+        verbose_name_plural = "Задачи подбора"
+        ordering = ["outbound", "walk_sequence", "full_address", "pk"]
+
+    def __str__(self):
+        return f"{self.item_code} x{self.quantity} @ {self.full_address}"
+
+
+class WaveDocument(models.Model):
+    """
+    Документ волны - запись индекса хранилища документов
+    Содержимое лежит в хранилище по sha256 (см. services.wave.documents),
+    одинаковые файлы разных волн хранятся один раз
+
+    pk: int
+    wave: Wave
+    name: str: имя файла в архиве волны
+    size: int
+    hash: str: sha256 содержимого
+    mime: str
+    uploaded_at: datetime
+    """
+
+    wave = models.ForeignKey(
+        Wave, on_delete=models.CASCADE, related_name="documents", verbose_name="Волна"
+    )
+    name = models.CharField(max_length=255, verbose_name="Имя файла")
+    size = models.PositiveBigIntegerField(verbose_name="Размер")
+    hash = models.CharField(max_length=64, db_index=True, verbose_name="SHA-256")
+    mime = models.CharField(max_length=100, blank=True, default="", verbose_name="MIME")
+    uploaded_at = models.DateTimeField(auto_now_add=True, verbose_name="Загружен")
+
+    class Meta:
+        verbose_name = "Документ волны"
+        verbose_name_plural = "Документы волн"
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["wave", "name"], name="unique_wave_document_name"
+            )
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class DocumentUpload(models.Model):
+    """
+    Сессия докачиваемой загрузки документа
+    Части файла дописываются в staging-файл хранилища документов,
+    после завершения загрузка прикрепляется к волне при ее создании
+
+    id: uuid
+    user: User
+    name: str
+    size: int: полный размер файла
+    offset: int: сколько байт уже принято
+    expected_hash: str: sha256 файла, заявленный клиентом (необязательно)
+    hash: str: sha256 принятого файла
+    mime: str
+    is_complete: bool
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="document_uploads",
+        verbose_name="Пользователь",
+    )
+    name = models.CharField(max_length=255, verbose_name="Имя файла")
+    size = models.PositiveBigIntegerField(verbose_name="Размер")
+    offset = models.PositiveBigIntegerField(default=0, verbose_name="Принято байт")
+    expected_hash = models.CharField(max_length=64, blank=True, default="")
+    hash = models.CharField(max_length=64, blank=True, default="", verbose_name="SHA-256")
+    mime = models.CharField(max_length=100, blank=True, default="", verbose_name="MIME")
+    is_complete = models.BooleanField(default=False, verbose_name="Загружен")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создан")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
+
+    class Meta:
+        verbose_name = "Загрузка документа"
+        verbose_name_plural = "Загрузки документов"
+        ordering = ["-created_at"]
+
+    @property
+    def staging_name(self) -> str:
+        return f"upload-{self.pk}.part"
+
+    def __str__(self):
+        return f"{self.name} ({self.offset}/{self.size})"
+
+
+class ArchivedWave(models.Model):
+    """
+    Архивная волна - завершенная или отмененная поставка/отгрузка,
+    перенесенная из рабочих таблиц командой archive_waves
+    Документы упакованы в архив пакета архивации в ARCHIVE_COLD_DIR
+
+    pk: int
+    original_id: int: id волны до архивации
+    wave_type: str: inbound / outbound
+    number: str
+    counterparty: str: поставщик или заказчик
+    stock: Stock
+    status: str
+    planned_date: datetime
+    actual_date: datetime
+    description: str
+    created_by: User
+    created_at: datetime
+    updated_at: datetime
+    archived_at: datetime
+    total_items: int
+    total_quantity: int
+    documents_archive: str: путь архива документов относительно ARCHIVE_COLD_DIR
+    documents: list: [{name, size}] - документы волны в архиве (папка number/)
+    """
+
+    WAVE_TYPE_CHOICES = [
+        ("inbound", "Поставка"),
+        ("outbound", "Отгрузка"),
+    ]
+
+    original_id = models.PositiveBigIntegerField(unique=True, verbose_name="ID волны")
+    wave_type = models.CharField(
+        max_length=10, choices=WAVE_TYPE_CHOICES, verbose_name="Тип волны"
+    )
+    number = models.CharField(max_length=50, unique=True, verbose_name="Номер")
+    counterparty = models.CharField(
+        max_length=200, blank=True, verbose_name="Поставщик / заказчик"
+    )
+    stock = models.ForeignKey(
+        Stock,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="archived_waves",
+        verbose_name="Склад",
+    )
+    status = models.CharField(
+        max_length=20, choices=Wave.STATUS_CHOICES, verbose_name="Статус"
+    )
+    planned_date = models.DateField(verbose_name="Планируемая дата")
+    actual_date = models.DateField(null=True, blank=True, verbose_name="Фактическая дата")
+    description = models.TextField(
+        max_length=500, null=True, blank=True, verbose_name="Описание"
+    )
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, verbose_name="Создал"
+    )
+    created_at = models.DateTimeField(verbose_name="Создан")
+    updated_at = models.DateTimeField(verbose_name="Обновлен")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Архивирован")
+    total_items = models.PositiveIntegerField(default=0, verbose_name="Позиций")
+    total_quantity = models.PositiveBigIntegerField(default=0, verbose_name="Кол-во")
+    documents_archive = models.CharField(
+        max_length=255, blank=True, default="", verbose_name="Архив документов"
+    )
+    documents = models.JSONField(default=list, blank=True, verbose_name="Документы")
+
+    class Meta:
+        verbose_name = "Архивная волна"
+        verbose_name_plural = "Архивные волны"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["wave_type", "-created_at"])]
+
+    def __str__(self):
+        return self.number
+
+
+class ArchivedWaveItem(models.Model):
+    """
+    Позиция архивной волны
+
+    pk: int
+    wave: ArchivedWave
+    item: Item
+    total_quantity: int
+    created_at: datetime
+    """
+
+    wave = models.ForeignKey(
+        ArchivedWave,
+        on_delete=models.CASCADE,
+        related_name="items",
+        verbose_name="Архивная волна",
+    )
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.PROTECT,
+        related_name="archived_wave_items",
+        verbose_name="Товар",
+    )
+    total_quantity = models.PositiveIntegerField(verbose_name="Количество")
+    created_at = models.DateTimeField(verbose_name="Создан")
+
+    class Meta:
+        verbose_name = "Позиция архивной волны"
+        verbose_name_plural = "Позиции архивных волн"
+        ordering = ["pk"]
+
+    def __str__(self):
+        return f"{self.item_id} x{self.total_quantity}"
+
+
 ALLOWED_TRANSITIONS = {
     "planned": {"in_progress", "cancelled"},
     "in_progress": {"completed", "cancelled"},
 }
 
 
+def merge_quantities(quantities_list) -> dict[int, int]:
+    """Суммирует несколько {item_id: quantity} в один"""
+    merged = {}
+    for quantities in quantities_list:
+        for item_id, quantity in quantities.items():
+            merged[item_id] = merged.get(item_id, 0) + quantity
+    return merged
+
+
+def _bulk_set_status(waves: list[Wave], new_status: str):
+    """Смена статуса группы волн одним UPDATE"""
+    if not waves:
+        return
+    now = timezone.now()
+    pks = [wave.pk for wave in waves]
+    Wave.objects.filter(pk__in=pks).update(status=new_status, updated_at=now)
+    if new_status == "completed":
+        Wave.objects.filter(pk__in=pks, actual_date__isnull=True).update(
+            actual_date=now.date()
+        )
+    for wave in waves:
+        wave.status = new_status
+
+
+def _emit_status_changed(wave_type: str, waves: list[Wave], old_status: str):
+    """Событие wave.status_changed в outbox по каждой волне (в транзакции смены статуса)"""
+    emit_events(
+        [
+            (
+                "wave.status_changed",
+                {
+                    "wave_type": wave_type,
+                    "pk": wave.pk,
+                    "number": str(wave),
+                    "old_status": old_status,
+                    "status": wave.status,
+                },
+            )
+            for wave in waves
+        ]
+    )
+
+
+def _status_result(wave, old_status: str, error: str | None = None) -> dict:
+    """Результат смены статуса одной волны"""
+    return {
+        "pk": wave.pk,
+        "number": str(wave),
+        "old_status": old_status,
+        "status": wave.status,
+        "ok": error is None,
+        "error": error,
+    }
+
+
 class InboundStatusService:
 
     @staticmethod
@@ -284,53 +695,91 @@ class InboundStatusService:
             raise ValidationError(f"Недопустимый переход: {old_status} → {new_status}")
 
     @staticmethod
-    def _planned_to_in_progress(inbound: Inbound):
+    def _waves_quantities(inbound_pks) -> dict[int, dict[int, int]]:
+        """Количество товаров поставок {inbound_pk: {item_id: quantity}} одним запросом"""
+        result = {}
+        rows = (
+            InboundItem.objects.filter(inbound_id__in=inbound_pks)
+            .values("inbound_id", "item_id")
+            .annotate(total=Sum("total_quantity"))
+            .values_list("inbound_id", "item_id", "total")
+        )
+        for inbound_id, item_id, total in rows:
+            result.setdefault(inbound_id, {})[item_id] = total
+        return result
+
+    @classmethod
+    def _wave_quantities(cls, inbound: Inbound) -> dict[int, int]:
+        """Количество товаров поставки {item_id: quantity} одним запросом"""
+        return cls._waves_quantities([inbound.pk]).get(inbound.pk, {})
+
+    @staticmethod
+    def _planned_to_in_progress(quantities: dict[int, int]):
         logger.debug(
-            "InboundStatusService._planned_to_in_progress(inb_pk:%s)", inbound.pk
+            "InboundStatusService._planned_to_in_progress(lines:%s)", len(quantities)
         )
         # получаем адрес inbound
         inbound_place = Place.objects.get(title="INBOUND")
 
-        # создание заселения деталей из поставки на адрес INBOUND
-        for inbound_item in inbound.inbound_items.all():
-            PlaceItem.objects.create(
-                item=inbound_item.item,
-                place=inbound_place,
-                quantity=inbound_item.total_quantity,
-                status="inbound",
-            )
+        # заселение деталей из поставки на адрес INBOUND одним INSERT ... ON CONFLICT
+        add_items_to_place(
+            place=inbound_place, quantities=quantities, status="inbound"
+        )
 
     @staticmethod
-    def _in_progress_to_completed(inbound: Inbound):
+    def _in_progress_to_completed(quantities: dict[int, int]):
         logger.debug(
-            "InboundStatusService._in_progress_to_completed(inb_pk:%s)", inbound.pk
+            "InboundStatusService._in_progress_to_completed(lines:%s)", len(quantities)
         )
-        # получаем места с товарами из поставки на адресе inbound
-        place_items = PlaceItem.objects.filter(
-            item__in=[inbound_item.item for inbound_item in inbound.inbound_items.all()],
-            place__title="INBOUND",
-        )
-
-        # получаем место new
+        # получаем адреса inbound и new
+        inbound_place = Place.objects.get(title="INBOUND")
         new_place = Place.objects.get(title="NEW")
 
-        # меняем адрес у заселесений (переселение) c inbound на new
-        for place_item in place_items:
-            place_item.place = new_place
-            place_item.save()
+        # переселяем количество поставки c inbound на new
+        move_items_between_places(
+            from_place=inbound_place,
+            to_place=new_place,
+            quantities=quantities,
+            status="new",
+        )
 
     @staticmethod
-    def _in_progress_to_cancelled(inbound: Inbound):
+    def _in_progress_to_cancelled(quantities: dict[int, int]):
         logger.debug(
-            "InboundStatusService._in_progress_to_cancelled(inb_pk:%s)",
-            inbound.pk,
+            "InboundStatusService._in_progress_to_cancelled(lines:%s)", len(quantities)
         )
-        # получение id item из поставки
-        item_ids = inbound.inbound_items.values_list("item_id", flat=True)
         # получаем адрес inbound
         inbound_place = Place.objects.get(title="INBOUND")
-        # удаление PlaceItem с местом inbound и товарами поставки
-        PlaceItem.objects.filter(place=inbound_place, item_id__in=item_ids).delete()
+        # снимаем количество поставки с адреса inbound
+        take_items_from_place(place=inbound_place, quantities=quantities)
+
+    @classmethod
+    def _apply_transition(cls, old_status, new_status, quantities: dict[int, int]):
+        """Изменение стока при переходе для суммарного количества одной или группы поставок"""
+
+        # planned -> in_progress
+        # создать заселение деталей поставки на inbound
+        if old_status == "planned" and new_status == "in_progress":
+            cls._planned_to_in_progress(quantities)
+
+        # planned -> cancelled
+        elif old_status == "planned" and new_status == "cancelled":
+            pass
+
+        # in_progress -> completed
+        # получаем адреса inbound и new
+        # переселяем количество поставки с inbound на new
+        elif old_status == "in_progress" and new_status == "completed":
+            cls._in_progress_to_completed(quantities)
+
+        # in_progress -> cancelled
+        # получаем адрес inbound
+        # снимаем количество поставки с адреса inbound
+        elif old_status == "in_progress" and new_status == "cancelled":
+            cls._in_progress_to_cancelled(quantities)
+
+        else:
+            raise ValidationError("Неподдерживаемый переход")
 
     @classmethod
     def change_status(cls, *, inbound, new_status: str):
@@ -344,51 +793,74 @@ class InboundStatusService:
         cls._validate_transition(old_status, new_status)
 
         with transaction.atomic():
-
-            # planned -> in_progress
-            # создать заселение деталей поставки на inbound
-            if old_status == "planned" and new_status == "in_progress":
-                cls._planned_to_in_progress(inbound)
-
-
-            # planned -> cancelled
-            elif old_status == "planned" and new_status == "cancelled":
-                pass
-
-            # in_progress -> completed
-            # получаем все PlaceItem с товарами из поставки (InboundItems) и адресом inbound
-            # получаем место new
-            # переселяем заселения поставки с inbound на new
-            elif old_status == "in_progress" and new_status == "completed":
-                cls._in_progress_to_completed(inbound)
-
-
-            # in_progress -> cancelled
-            # получаем id товаров поставки
-            # получаем адрес inbound
-            # удаляем места с ними и адресом inbound
-            elif old_status == "in_progress" and new_status == "cancelled":
-                cls._in_progress_to_cancelled(inbound)
-
-
-            else:
-                raise ValidationError("Неподдерживаемый переход")
+            cls._apply_transition(old_status, new_status, cls._wave_quantities(inbound))
 
             inbound.status = new_status
             inbound.save(update_fields=["status"])
+            _emit_status_changed("inbound", [inbound], old_status)
+
+    @classmethod
+    def change_status_bulk(cls, *, pks, new_status: str) -> list[dict]:
+        """
+        Смена статуса группы поставок в одной транзакции
+        Все переходы проверяются заранее, недопустимые попадают в результат с ошибкой
+        Допустимые группируются по старому статусу, изменения стока выполняются
+        один раз на группу по суммарному количеству
+        Возвращает результат по каждой поставке в порядке pks
+        """
+        logger.debug(
+            "InboundStatusService.change_status_bulk(count:%s, new_status:%s)",
+            len(pks),
+            new_status,
+        )
+        results = {}
+
+        with transaction.atomic():
+            inbounds = list(
+                Inbound.objects.select_for_update().filter(pk__in=pks).order_by("pk")
+            )
+            waves_quantities = cls._waves_quantities([inb.pk for inb in inbounds])
+
+            groups = {}
+            for inbound in inbounds:
+                try:
+                    cls._validate_transition(inbound.status, new_status)
+                except ValidationError as e:
+                    results[inbound.pk] = _status_result(
+                        inbound, inbound.status, e.messages[0]
+                    )
+                    continue
+                groups.setdefault(inbound.status, []).append(inbound)
+
+            for old_status, group in groups.items():
+                cls._apply_transition(
+                    old_status,
+                    new_status,
+                    merge_quantities(waves_quantities.get(inb.pk, {}) for inb in group),
+                )
+                _bulk_set_status(group, new_status)
+                _emit_status_changed("inbound", group, old_status)
+                for inbound in group:
+                    results[inbound.pk] = _status_result(inbound, old_status)
+
+        return [
+            results.get(pk)
+            or {"pk": pk, "ok": False, "error": "Поставка не найдена"}
+            for pk in pks
+        ]
 
 
 class OutboundStatusService:
 
     @staticmethod
     def _generate_packing_list(outbound: Outbound):
+        """
+        Упаковочный лист формируется в фоне после фиксации транзакции
+        Ошибка формирования не откатывает движение стока,
+        а записывается в outbound.packing_list_status
+        """
         logger.debug("OutboundStatusService._generate_packing_list(out_pk:%s)", outbound.pk)
-        try:
-            pdf_path = generate_packing_list_pdf(outbound)
-            logger.debug(f"Packing list created: {pdf_path}")
-        except Exception as e:
-            logger.error(f"Error generating packing dock: {e}")
-            raise
+        schedule_packing_list(outbound)
 
     @staticmethod
     def _validate_transition(old_status, new_status):
@@ -398,85 +870,290 @@ class OutboundStatusService:
             raise ValidationError(f"Недопустимый переход: {old_status} → {new_status}")
 
     @staticmethod
-    def _planned_to_in_progress(outbound: Outbound):
-        logger.debug("OutboundStatusService._planned_to_in_progress(out_pk:%s)", outbound.pk)
+    def _waves_quantities(outbound_pks) -> dict[int, dict[int, int]]:
+        """Количество товаров отгрузок {outbound_pk: {item_id: quantity}} одним запросом"""
+        result = {}
+        rows = (
+            OutboundItem.objects.filter(outbound_id__in=outbound_pks)
+            .values("outbound_id", "item_id")
+            .annotate(total=Sum("total_quantity"))
+            .values_list("outbound_id", "item_id", "total")
+        )
+        for outbound_id, item_id, total in rows:
+            result.setdefault(outbound_id, {})[item_id] = total
+        return result
 
-        outbound_place = Place.objects.get(title="OUTBOUND")
+    @classmethod
+    def _wave_quantities(cls, outbound: Outbound) -> dict[int, int]:
+        """Количество товаров отгрузки {item_id: quantity} одним запросом"""
+        return cls._waves_quantities([outbound.pk]).get(outbound.pk, {})
 
-        for outbound_item in outbound.outbound_items.all():
-            item = outbound_item.item
-            quantity_needed = outbound_item.total_quantity
-            storage_items = PlaceItem.objects.filter(item=item, status="ok").order_by("id")
+    @staticmethod
+    def _shortage(quantities: dict[int, int], available: dict[int, int]) -> str | None:
+        """Текст ошибки о первом товаре, которого не хватает, или None"""
+        for item_id, quantity_needed in quantities.items():
+            total_available = available.get(item_id, 0)
+            if total_available < quantity_needed:
+                item = Item.objects.get(pk=item_id)
+                return f"Недостаточно {item} на складе: требуется {quantity_needed}, доступно {total_available}"
+        return None
 
-            # всего можем снять с адресов
-            total_available = sum(place_item.quantity for place_item in storage_items)
+    @staticmethod
+    def _record_picks(demands: list[tuple[Outbound, dict[int, int]]], sources: list):
+        """
+        Задачи подбора: источники общего резервирования группы отгрузок
+        делятся между отгрузками по порядку, источники идут по маршруту обхода.
+        Задачи отгрузки нарезаются на пакеты по PICK_BATCH_SIZE подряд идущих
+        по маршруту - каждый пакет собирает отдельный сборщик
+        """
+        by_item = {}
+        for place_id, item_id, taken, full_address, walk_sequence in sources:
+            by_item.setdefault(item_id, []).append(
+                [place_id, taken, full_address, walk_sequence]
+            )
+        codes = dict(Item.objects.filter(pk__in=by_item).values_list("id", "item_code"))
+
+        picks = {}
+        for outbound, quantities in demands:
+            for item_id, quantity in quantities.items():
+                item_sources = by_item.get(item_id, [])
+                while quantity and item_sources:
+                    source = item_sources[0]
+                    taken = min(quantity, source[1])
+                    picks.setdefault(outbound.pk, []).append(
+                        OutboundPick(
+                            outbound=outbound,
+                            item_id=item_id,
+                            place_id=source[0],
+                            item_code=codes[item_id],
+                            full_address=source[2],
+                            quantity=taken,
+                            walk_sequence=source[3],
+                        )
+                    )
+                    quantity -= taken
+                    source[1] -= taken
+                    if not source[1]:
+                        item_sources.pop(0)
+
+        size = settings.PICK_BATCH_SIZE
+        batches, chunks = [], []
+        for outbound, _ in demands:
+            outbound_picks = sorted(
+                picks.get(outbound.pk, []),
+                key=lambda pick: (
+                    pick.walk_sequence is None,
+                    pick.walk_sequence or 0,
+                    pick.full_address,
+                ),
+            )
+            for n in range(0, len(outbound_picks), size):
+                batches.append(PickBatch(outbound=outbound, number=n // size + 1))
+                chunks.append(outbound_picks[n:n + size])
+        PickBatch.objects.bulk_create(batches)
+        for batch, chunk in zip(batches, chunks):
+            for pick in chunk:
+                pick.batch = batch
+        OutboundPick.objects.bulk_create(
+            [pick for chunk in chunks for pick in chunk], batch_size=5000
+        )
 
-            if total_available < quantity_needed:
-                raise ValidationError(
-                    f"Недостаточно {item} на складе: требуется {quantity_needed}, доступно {total_available}")
+    @classmethod
+    def _planned_to_in_progress(cls, demands: list[tuple[Outbound, dict[int, int]]]):
+        quantities = merge_quantities(q for _, q in demands)
+        logger.debug(
+            "OutboundStatusService._planned_to_in_progress(lines:%s)", len(quantities)
+        )
 
-            remaining_needed = quantity_needed  # осталось необходимо
-            for place_item in storage_items:
+        # проверка остатка одним агрегирующим запросом
+        shortage = cls._shortage(quantities, available_quantities(quantities.keys()))
+        if shortage:
+            raise ValidationError(shortage)
 
-                if remaining_needed <= 0:
-                    break
+        # резервирование на местах хранения (по маршруту обхода или в порядке pk)
+        # и задачи подбора по отгрузкам, на OUTBOUND товар попадает при подтверждении
+        sources = allocate_sources(
+            quantities=quantities, order=settings.PICK_ALLOCATION_ORDER, reserve=True
+        )
+        cls._record_picks(demands, sources)
 
-                if place_item.quantity <= remaining_needed:  # если товара на адресе <= кол-ва для снятия
-                    remaining_needed -= place_item.quantity  # осталось - на адресе
-                    place_item.delete()  # удаляем адрес
+    @staticmethod
+    def _pick_errors(picks: list[OutboundPick]) -> dict[int, str]:
+        """
+        Задачи подбора, которые нельзя подтвердить: место удалено или на месте
+        меньше товара/резерва, чем требуют задачи (один запрос на все задачи)
+        Возвращает {outbound_id: ошибка}
+        """
+        errors, needed = {}, {}
+        for pick in picks:
+            if pick.place_id is None:
+                errors.setdefault(
+                    pick.outbound_id, f"Место задачи подбора {pick.full_address} удалено"
+                )
+            else:
+                key = (pick.place_id, pick.item_id)
+                needed[key] = needed.get(key, 0) + pick.quantity
+        if not needed:
+            return errors
+
+        rows = PlaceItem.objects.filter(
+            place_id__in={place_id for place_id, _ in needed},
+            item_id__in={item_id for _, item_id in needed},
+        ).values_list("place_id", "item_id", "quantity", "reserved")
+        pickable = {
+            (place_id, item_id): min(quantity, reserved)
+            for place_id, item_id, quantity, reserved in rows
+        }
+        short = {key for key, quantity in needed.items() if pickable.get(key, 0) < quantity}
+        for pick in picks:
+            if (pick.place_id, pick.item_id) in short:
+                errors.setdefault(
+                    pick.outbound_id,
+                    f"На месте {pick.full_address} нет зарезервированного количества "
+                    f"товара {pick.item_code}",
+                )
+        return errors
+
+    @classmethod
+    def confirm_picks(cls, picks: list[OutboundPick], user=None) -> int:
+        """
+        Подтверждение задач подбора: зарезервированное количество задач
+        переносится с мест на OUTBOUND (по одному запросу на все задачи),
+        задачи помечаются подобранными. С user пишется история перемещений
+        Вызывается в транзакции, задачи должны быть заблокированы
+        Если место задачи удалено или резерва не хватает - ValidationError
+        Возвращает кол-во подобранных единиц товара
+        """
+        picks = [pick for pick in picks if pick.status == "open"]
+        if not picks:
+            return 0
+        errors = cls._pick_errors(picks)
+        if errors:
+            raise ValidationError(next(iter(errors.values())))
 
-                else:
-                    place_item.quantity -= remaining_needed
-                    remaining_needed = 0
-                    place_item.save()
+        outbound_place = Place.objects.get(title="OUTBOUND")
+        pick_reserved_items(
+            (pick.place_id, pick.item_id, pick.quantity) for pick in picks
+        )
+        add_items_to_place(
+            place=outbound_place,
+            quantities=merge_quantities({pick.item_id: pick.quantity} for pick in picks),
+            status="outbound",
+        )
 
-            PlaceItem.objects.create(
-                item=item,
-                place=outbound_place,
-                quantity=quantity_needed,
-                status="outbound",
+        now = timezone.now()
+        OutboundPick.objects.filter(pk__in=[pick.pk for pick in picks]).update(
+            status="done", confirmed_by=user, confirmed_at=now
+        )
+        if user is not None:
+            outbound_address = place_full_address(outbound_place)
+            History.objects.bulk_create(
+                History(
+                    user=user,
+                    item_code=pick.item_code,
+                    old_address=pick.full_address,
+                    new_address=outbound_address,
+                    count=pick.quantity,
+                )
+                for pick in picks
             )
+        for pick in picks:
+            pick.status, pick.confirmed_by, pick.confirmed_at = "done", user, now
+        return sum(pick.quantity for pick in picks)
 
     @staticmethod
-    def _in_progress_to_completed(outbound: Outbound):
+    def _open_picks(outbounds) -> list[OutboundPick]:
+        """Неподтвержденные задачи подбора отгрузок, заблокированные до конца транзакции"""
+        return list(
+            OutboundPick.objects.select_for_update()
+            .filter(outbound__in=outbounds, status="open")
+            .order_by("pk")
+        )
+
+    @classmethod
+    def _in_progress_to_completed(cls, demands: list[tuple[Outbound, dict[int, int]]]):
+        quantities = merge_quantities(q for _, q in demands)
         logger.debug(
-            "OutboundStatusService._in_progress_to_completed(out_pk:%s)", outbound.pk
+            "OutboundStatusService._in_progress_to_completed(lines:%s)", len(quantities)
         )
+        # неподобранные задачи подтверждаются, весь товар отгрузки оказывается на outbound
+        outbounds = [outbound for outbound, _ in demands]
+        cls.confirm_picks(cls._open_picks(outbounds))
+        PickBatch.objects.filter(outbound__in=outbounds).exclude(status="done").update(
+            status="done"
+        )
+
         # получаем адрес outbound
         outbound_place = Place.objects.get(title="OUTBOUND")
 
-        # получаем id товаров из отгрузки
-        item_ids = outbound.outbound_items.values_list("item_id", flat=True)
+        # снимаем количество отгрузки с адреса outbound
+        take_items_from_place(place=outbound_place, quantities=quantities)
 
-        # удаляем места с адресом outbound и деталями из отгрузки
-        PlaceItem.objects.filter(place=outbound_place, item_id__in=item_ids).delete()
-
-    @staticmethod
-    def _in_progress_to_cancelled(outbound: Outbound):
+    @classmethod
+    def _in_progress_to_cancelled(cls, demands: list[tuple[Outbound, dict[int, int]]]):
+        quantities = merge_quantities(q for _, q in demands)
         logger.debug(
-            "OutboundStatusService._in_progress_to_cancelled(out_pk:%s)", outbound.pk
+            "OutboundStatusService._in_progress_to_cancelled(lines:%s)", len(quantities)
+        )
+        outbounds = [outbound for outbound, _ in demands]
+
+        # резерв неподобранных задач снимается, на outbound лежит только подобранное
+        open_picks = cls._open_picks(outbounds)
+        release_reserved_items(
+            (pick.place_id, pick.item_id, pick.quantity)
+            for pick in open_picks
+            if pick.place_id
         )
+        for pick in open_picks:
+            quantities[pick.item_id] -= pick.quantity
+
         # получаем адрес new и OUTBOUND
         new_place = Place.objects.get(title="NEW")
         outbound_place = Place.objects.get(title="OUTBOUND")
 
-        # получаем места с товарами из отгрузки и адресом outbound
-        place_items = PlaceItem.objects.filter(
-            item__in=[outbound_item.item for outbound_item in outbound.outbound_items.all()],
-            place=outbound_place,
+        # возвращаем подобранное количество отгрузки с outbound на new
+        move_items_between_places(
+            from_place=outbound_place,
+            to_place=new_place,
+            quantities={item_id: qty for item_id, qty in quantities.items() if qty > 0},
+            status="new",
         )
+        # задачи подбора отмененных отгрузок больше не нужны
+        PickBatch.objects.filter(outbound__in=outbounds).delete()
+        OutboundPick.objects.filter(outbound__in=outbounds).delete()
 
-        for place_item in place_items:
-            existing, created = PlaceItem.objects.get_or_create(
-                place=new_place,
-                item=place_item.item,
-                defaults={'quantity': 0, 'status': 'ok'}
-            )
-            existing.quantity += place_item.quantity
-            existing.status = 'ok'
-            existing.save()
-
-            place_item.delete()
+    @classmethod
+    def _apply_transition(
+        cls, old_status, new_status, demands: list[tuple[Outbound, dict[int, int]]]
+    ):
+        """
+        Изменение стока при переходе для суммарного количества одной или группы отгрузок
+        demands - [(отгрузка, {item_id: quantity})] в порядке резервирования
+        """
+
+        # planned -> in_progress
+        # резервирование на местах хранения и задачи подбора
+        if old_status == "planned" and new_status == "in_progress":
+            cls._planned_to_in_progress(demands)
+
+        # planned -> cancelled
+        elif old_status == "planned" and new_status == "cancelled":
+            pass
+
+        # in_progress -> completed
+        # подтверждаем неподобранные задачи
+        # снимаем количество отгрузки с адреса outbound
+        elif old_status == "in_progress" and new_status == "completed":
+            cls._in_progress_to_completed(demands)
+
+        # in_progress -> cancelled
+        # снимаем резерв неподобранных задач
+        # возвращаем подобранное количество с outbound на new
+        elif old_status == "in_progress" and new_status == "cancelled":
+            cls._in_progress_to_cancelled(demands)
+
+        else:
+            raise ValidationError("Неподдерживаемый переход")
 
     @classmethod
     def change_status(cls, *, outbound, new_status: str):
@@ -490,34 +1167,108 @@ class OutboundStatusService:
         cls._validate_transition(old_status, new_status)
 
         with transaction.atomic():
+            cls._apply_transition(
+                old_status, new_status, [(outbound, cls._wave_quantities(outbound))]
+            )
 
-            # planned -> in_progress
-            if old_status == "planned" and new_status == "in_progress":
-                cls._planned_to_in_progress(outbound)
-
-            # planned -> cancelled
-            elif old_status == "planned" and new_status == "cancelled":
-                pass
-
-            # in_progress -> completed
-            # получаем адрес outbound
-            # получаем id товаров из отгрузки
-            # удаляем места с адресом outbound и деталями из отгрузки
-            elif old_status == "in_progress" and new_status == "completed":
-                cls._in_progress_to_completed(outbound)
+            if old_status == "in_progress" and new_status == "completed":
                 cls._generate_packing_list(outbound)
 
-
-            # in_progress -> cancelled
-            # получаем адрес new
-            # получаем места с товарами из отгрузки и адресом outbound
-            # меняем адрес у заселений на new
-            elif old_status == "in_progress" and new_status == "cancelled":
-                cls._in_progress_to_cancelled(outbound)
-
-
-            else:
-                raise ValidationError("Неподдерживаемый переход")
-
             outbound.status = new_status
             outbound.save(update_fields=["status"])
+            _emit_status_changed("outbound", [outbound], old_status)
+
+    @classmethod
+    def change_status_bulk(cls, *, pks, new_status: str) -> list[dict]:
+        """
+        Смена статуса группы отгрузок в одной транзакции
+        Все переходы проверяются заранее, недопустимые попадают в результат с ошибкой
+        При planned -> in_progress остаток проверяется по нарастающей потребности
+        отгрузок в порядке pks, отгрузки сверх остатка попадают в результат с ошибкой
+        Упаковочные листы завершенных отгрузок ставятся в фоновую очередь
+        одним этапом и формируются после фиксации транзакции
+        Возвращает результат по каждой отгрузке в порядке pks
+        """
+        logger.debug(
+            "OutboundStatusService.change_status_bulk(count:%s, new_status:%s)",
+            len(pks),
+            new_status,
+        )
+        results = {}
+
+        with transaction.atomic():
+            outbounds = {
+                outb.pk: outb
+                for outb in Outbound.objects.select_for_update()
+                .filter(pk__in=pks)
+                .order_by("pk")
+            }
+            waves_quantities = cls._waves_quantities(list(outbounds))
+
+            groups = {}
+            for pk in pks:
+                outbound = outbounds.get(pk)
+                if outbound is None or pk in results:
+                    continue
+                try:
+                    cls._validate_transition(outbound.status, new_status)
+                except ValidationError as e:
+                    results[pk] = _status_result(outbound, outbound.status, e.messages[0])
+                    continue
+                groups.setdefault(outbound.status, []).append(outbound)
+
+            # задачи подбора завершаемых отгрузок проверяются заранее:
+            # отгрузка с неподтверждаемой задачей попадает в результат с ошибкой
+            in_progress = groups.get("in_progress", [])
+            if in_progress and new_status == "completed":
+                pick_errors = cls._pick_errors(cls._open_picks(in_progress))
+                for outbound in in_progress:
+                    if outbound.pk in pick_errors:
+                        results[outbound.pk] = _status_result(
+                            outbound, outbound.status, pick_errors[outbound.pk]
+                        )
+                groups["in_progress"] = [
+                    outbound for outbound in in_progress if outbound.pk not in pick_errors
+                ]
+
+            # остаток под всю группу проверяется заранее
+            planned = groups.get("planned", [])
+            if planned and new_status == "in_progress":
+                group_quantities = [waves_quantities.get(outb.pk, {}) for outb in planned]
+                available = available_quantities(merge_quantities(group_quantities).keys())
+                accepted = []
+                for outbound, quantities in zip(planned, group_quantities):
+                    shortage = cls._shortage(quantities, available)
+                    if shortage:
+                        results[outbound.pk] = _status_result(
+                            outbound, outbound.status, shortage
+                        )
+                        continue
+                    for item_id, quantity in quantities.items():
+                        available[item_id] = available.get(item_id, 0) - quantity
+                    accepted.append(outbound)
+                groups["planned"] = accepted
+
+            for old_status, group in groups.items():
+                if not group:
+                    continue
+                cls._apply_transition(
+                    old_status,
+                    new_status,
+                    [(outb, waves_quantities.get(outb.pk, {})) for outb in group],
+                )
+                _bulk_set_status(group, new_status)
+                _emit_status_changed("outbound", group, old_status)
+                for outbound in group:
+                    results[outbound.pk] = _status_result(outbound, old_status)
+
+            # упаковочные листы формируются в фоне после фиксации смены статусов
+            if new_status == "completed":
+                for outbound in groups.get("in_progress", []):
+                    cls._generate_packing_list(outbound)
+
+        return [
+            results.get(pk)
+            or {"pk": pk, "ok": False, "error": "Отгрузка не найдена"}
+            for pk in pks
+        ]
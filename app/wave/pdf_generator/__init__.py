@@ -1 +1,3 @@
+from .fonts import register_fonts
 from .packing_list import generate_packing_list_pdf
+from .pick_list import generate_pick_list_pdf
@@ -0,0 +1,52 @@
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable
+
+
+class DeferredValue(Flowable):
+    """
+    Строка "подпись: значение", где значение известно только в конце верстки
+    (например, итог по потоку строк). Значение выводится PDF-формой,
+    которая определяется позже через DeferredValueDefinition
+    """
+
+    def __init__(self, label: str, form_name: str, font="OpenSans", bold_font="OpenSans-Bold",
+                 font_size=10, leading=12):
+        super().__init__()
+        self.label = label
+        self.form_name = form_name
+        self.font = font
+        self.bold_font = bold_font
+        self.font_size = font_size
+        self.leading = leading
+
+    def wrap(self, avail_width, avail_height):
+        return avail_width, self.leading
+
+    def draw(self):
+        baseline = self.leading - self.font_size
+        self.canv.setFont(self.bold_font, self.font_size)
+        self.canv.drawString(0, baseline, self.label)
+        self.canv.saveState()
+        self.canv.translate(stringWidth(self.label, self.bold_font, self.font_size), baseline)
+        self.canv.doForm(self.form_name)
+        self.canv.restoreState()
+
+
+class DeferredValueDefinition(Flowable):
+    """Определяет PDF-форму для DeferredValue текстом, вычисленным в момент отрисовки"""
+
+    def __init__(self, form_name: str, get_text, font="OpenSans", font_size=10):
+        super().__init__()
+        self.form_name = form_name
+        self.get_text = get_text
+        self.font = font
+        self.font_size = font_size
+
+    def wrap(self, avail_width, avail_height):
+        return 0, 0
+
+    def draw(self):
+        self.canv.beginForm(self.form_name)
+        self.canv.setFont(self.font, self.font_size)
+        self.canv.drawString(0, 0, self.get_text())
+        self.canv.endForm()
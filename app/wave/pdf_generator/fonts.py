@@ -6,8 +6,18 @@ from reportlab.pdfbase.ttfonts import TTFont
 
 FONTS_DIR = os.path.dirname(os.path.abspath(__file__))
 
+_fonts_registered = False
+
 
 def register_fonts():
+    """
+    Регистрирует шрифты OpenSans в reportlab
+    TTF разбираются один раз на процесс, повторные вызовы ничего не делают
+    """
+    global _fonts_registered
+    if _fonts_registered:
+        return
+
     regular_path = os.path.join(FONTS_DIR, "OpenSans-Regular.ttf")
     bold_path = os.path.join(FONTS_DIR, "OpenSans-Bold.ttf")
 
@@ -18,3 +28,4 @@ def register_fonts():
 
     pdfmetrics.registerFont(TTFont("OpenSans", regular_path))
     pdfmetrics.registerFont(TTFont("OpenSans-Bold", bold_path))
+    _fonts_registered = True
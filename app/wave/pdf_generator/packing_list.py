@@ -6,9 +6,14 @@ from reportlab.lib.pagesizes import A4
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 from django.conf import settings
 
+from .flowables import DeferredValue, DeferredValueDefinition
 from .fonts import register_fonts
 from .styles import BASE, TITLE_BOLD
-from .tables import products_table
+from .tables import StreamingProductsTable
+
+# Версия шаблона упаковочного листа, входит в ключ кеша сформированных файлов
+# Увеличивается при любом изменении верстки
+TEMPLATE_VERSION = 1
 
 
 def validate_recipient(recipient: str) -> str:
@@ -42,33 +47,65 @@ def validate_recipient(recipient: str) -> str:
     return result
 
 
-def generate_packing_list_pdf(outbound):
-    register_fonts()
+def description_short(description: str | None) -> str:
+    """Короткое описание товара, как Item.description_short"""
+    if not description:
+        return ""
+    return description if len(description) < 48 else description[:48] + "..."
+
+
+def packing_list_path(dir_path: str, outbound_number: str) -> str:
+    """Путь к файлу упаковочного листа"""
+    return os.path.join(dir_path, f"PACK_{outbound_number}.pdf")
 
-    # Путь к файлу
-    dir_path = outbound.get_uploads_dir()
-    filename = os.path.join(dir_path, f"PACK_{outbound.outbound_number}.pdf")
 
-    # Данные таблицы
-    data = [["Партномер", "Ед.изм", "Кол-во", "Масса г", "Примечание"]]
-    total_weight = 0
-    recipient = validate_recipient(outbound.recipient)
+def packing_list_lines(outbound):
+    """
+    Строки упаковочного листа (партномер, кол-во, вес г, описание)
+    Читаются потоком через .iterator(), без загрузки всей отгрузки в память
+    """
+    rows = outbound.outbound_items.values_list(
+        "item__item_code", "total_quantity", "item__weight", "item__description"
+    ).order_by("pk")
+    for item_code, quantity, weight, description in rows.iterator(chunk_size=2000):
+        yield item_code, quantity, weight, description_short(description)
 
-    for outbound_item in outbound.outbound_items.select_related("item").all():
-        item = outbound_item.item
-        weight_gram = getattr(item, "weight", 0) or 0
-        row_weight = outbound_item.total_quantity * weight_gram / 1000
-        total_weight += row_weight
 
-        data.append([
-            item.item_code or "",
+HEADER = ["Партномер", "Ед.изм", "Кол-во", "Масса г", "Примечание"]
+
+
+def _table_rows(lines, totals: dict):
+    """Строки таблицы из строк отгрузки, итоговая масса считается по ходу чтения"""
+    for item_code, quantity, weight_gram, description in lines:
+        weight_gram = weight_gram or 0
+        totals["weight"] += quantity * weight_gram / 1000
+
+        yield [
+            item_code or "",
             "шт",
-            str(outbound_item.total_quantity),
+            str(quantity),
             str(weight_gram),
-            item.description_short or "",
-        ])
+            description or "",
+        ]
+
+
+def render_packing_list_pdf(*, filename: str, recipient: str, company_name: str, lines) -> str:
+    """
+    Отрисовка упаковочного листа по готовым данным, без обращений к БД
+    lines: итерируемый [(item_code, quantity, weight_gram, description_short), ...]
+
+    Строки читаются потоком и выводятся таблицами размером в страницу
+    с повторяющимся заголовком, поэтому память не зависит от кол-ва строк.
+    Масса нетто в шапке выводится PDF-формой, которая заполняется
+    после прохода по всем строкам
+    """
+    register_fonts()
+
+    totals = {"weight": 0}
+    recipient = validate_recipient(recipient)
 
     # Создание документа
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
     doc = SimpleDocTemplate(filename, pagesize=A4, leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30)
     elements = []
 
@@ -76,7 +113,7 @@ def generate_packing_list_pdf(outbound):
     elements.append(Spacer(1, 20))
 
     elements.append(Paragraph(
-        f'<font name="OpenSans-Bold">Отправитель: </font><font name="OpenSans">{getattr(settings, "COMPANY_NAME", "ООО «Компания»")}</font>',
+        f'<font name="OpenSans-Bold">Отправитель: </font><font name="OpenSans">{company_name}</font>',
         BASE))
     elements.append(Spacer(1, 6))
 
@@ -84,7 +121,7 @@ def generate_packing_list_pdf(outbound):
         Paragraph(f'<font name="OpenSans-Bold">Заказчик: </font><font name="OpenSans">{recipient}</font>',
                   BASE))
     elements.append(Spacer(1, 6))
-    elements.append(Paragraph(f'<font name="OpenSans-Bold">Масса нетто: </font>{total_weight:.1f} кг', BASE))
+    elements.append(DeferredValue("Масса нетто: ", "total_weight"))
     elements.append(Spacer(1, 6))
     elements.append(
         Paragraph(f'<font name="OpenSans-Bold">Дата: </font>{datetime.date.today().strftime("%d.%m.%Y")}', BASE))
@@ -94,9 +131,25 @@ def generate_packing_list_pdf(outbound):
     elements.append(Paragraph('<font name="OpenSans-Bold">Род упаковки: </font>', BASE))
     elements.append(Spacer(1, 20))
 
-    elements.append(products_table(data))
+    elements.append(StreamingProductsTable(HEADER, _table_rows(lines, totals)))
     elements.append(Spacer(1, 20))
+    elements.append(
+        DeferredValueDefinition("total_weight", lambda: f"{totals['weight']:.1f} кг")
+    )
 
     doc.build(elements)
 
     return filename
+
+
+def company_name() -> str:
+    return getattr(settings, "COMPANY_NAME", "ООО «Компания»")
+
+
+def generate_packing_list_pdf(outbound):
+    return render_packing_list_pdf(
+        filename=packing_list_path(outbound.get_uploads_dir(), outbound.outbound_number),
+        recipient=outbound.recipient,
+        company_name=company_name(),
+        lines=packing_list_lines(outbound),
+    )
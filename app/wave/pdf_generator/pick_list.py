@@ -0,0 +1,105 @@
+import datetime
+import io
+import os
+from typing import BinaryIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from warehouse.services import route_distance
+
+from .fonts import register_fonts
+from .packing_list import validate_recipient
+from .styles import BASE, TITLE_BOLD
+from .tables import StreamingProductsTable
+
+
+def pick_list_filename(outbound_number: str) -> str:
+    """Имя файла листа подбора при скачивании"""
+    return f"PICK_{outbound_number}.pdf"
+
+
+def pick_list_data(outbound) -> dict:
+    """
+    Строки листа подбора в порядке маршрута обхода склада и метрика пути:
+    {"lines": [(full_address, item_code, quantity)], "stops": кол-во мест,
+     "distance": длина пути по координатам мест, м, None - координаты заданы не у всех}
+    """
+    rows = outbound.picks.values_list(
+        "full_address", "item_code", "quantity", "place_id", "place__x", "place__y"
+    ).order_by("walk_sequence", "full_address", "pk")
+
+    lines, points, previous = [], [], None
+    for full_address, item_code, quantity, place_id, x, y in rows:
+        lines.append((full_address, item_code, quantity))
+        if (place_id, full_address) != previous:
+            points.append((x, y))
+            previous = (place_id, full_address)
+    return {"lines": lines, "stops": len(points), "distance": route_distance(points)}
+
+
+HEADER = ["Адрес", "Шаг", "Кол-во", "Взято", "Партномер"]
+
+
+def _table_rows(lines):
+    """Строки таблицы, шаг - номер остановки на маршруте"""
+    step, previous = 0, None
+    for full_address, item_code, quantity in lines:
+        if full_address != previous:
+            step += 1
+            previous = full_address
+        yield [full_address, str(step), str(quantity), "", item_code]
+
+
+def render_pick_list_pdf(
+    *, filename: str | BinaryIO, outbound_number: str, recipient: str, data: dict
+):
+    """
+    Отрисовка листа подбора по готовым данным (см. pick_list_data), без обращений к БД
+    в файл или поток (filename)
+    Строки идут в порядке обхода склада, в шапке - кол-во остановок и длина пути
+    """
+    register_fonts()
+
+    if isinstance(filename, str):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+    doc = SimpleDocTemplate(filename, pagesize=A4, leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=30)
+    distance = "нет координат мест" if data["distance"] is None else f"{data['distance']:.0f} м"
+
+    elements = [
+        Paragraph(f"Лист подбора {outbound_number}", TITLE_BOLD),
+        Spacer(1, 20),
+        Paragraph(
+            f'<font name="OpenSans-Bold">Заказчик: </font>{validate_recipient(recipient)}', BASE
+        ),
+        Spacer(1, 6),
+        Paragraph(
+            f'<font name="OpenSans-Bold">Маршрут: </font>мест {data["stops"]}, путь {distance}',
+            BASE,
+        ),
+        Spacer(1, 6),
+        Paragraph(
+            f'<font name="OpenSans-Bold">Дата: </font>{datetime.date.today().strftime("%d.%m.%Y")}',
+            BASE,
+        ),
+        Spacer(1, 20),
+        Paragraph('<font name="OpenSans-Bold">Подобрал: </font>', BASE),
+        Spacer(1, 20),
+        StreamingProductsTable(HEADER, _table_rows(data["lines"])),
+    ]
+    doc.build(elements)
+
+    return filename
+
+
+
+def generate_pick_list_pdf(outbound) -> bytes:
+    """Лист подбора отгрузки в памяти (в папку волны не пишется)"""
+    buffer = io.BytesIO()
+    render_pick_list_pdf(
+        filename=buffer,
+        outbound_number=outbound.outbound_number,
+        recipient=outbound.recipient,
+        data=pick_list_data(outbound),
+    )
+    return buffer.getvalue()
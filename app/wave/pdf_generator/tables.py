@@ -1,32 +1,141 @@
 from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle
+from reportlab.platypus import Flowable, Table, TableStyle
+
+COL_WIDTHS = [160, 60, 60, 60, 160]
+
+TABLE_STYLE = TableStyle([
+    # Общий шрифт
+    ("FONT", (0, 0), (-1, -1), "OpenSans"),
+
+    # Жирный шрифт для заголовка
+    ("FONT", (0, 0), (-1, 0), "OpenSans-Bold"),
+
+    # Сетка
+    ("GRID", (0, 0), (-1, -1), 0.6, colors.black),
+
+    # Выравнивание по центру колонок 2 - 4
+    ("ALIGN", (1, 0), (3, -1), "CENTER"),
+
+    # Вертикальное выравнивание
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+
+    # Отступы
+    ("PADDING", (0, 0), (-1, -1), 6),
+])
 
 
 def products_table(data):
     table = Table(
         data,
-        colWidths=[160, 60, 60, 60, 160],
+        colWidths=COL_WIDTHS,
         repeatRows=1,  # заголовок повторяется на каждой странице
     )
 
-    table.setStyle(TableStyle([
-        # Общий шрифт
-        ("FONT", (0, 0), (-1, -1), "OpenSans"),
+    table.setStyle(TABLE_STYLE)
 
-        # Жирный шрифт для заголовка
-        ("FONT", (0, 0), (-1, 0), "OpenSans-Bold"),
+    return table
 
-        # Сетка
-        ("GRID", (0, 0), (-1, -1), 0.6, colors.black),
 
-        # Выравнивание по центру колонок 2 - 4
-        ("ALIGN", (1, 0), (3, -1), "CENTER"),
+class StreamingProductsTable(Flowable):
+    """
+    Таблица товаров, читающая строки из итератора по мере верстки
 
-        # Вертикальное выравнивание
-        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    При каждой верстке из итератора берется ровно столько строк, сколько
+    помещается в оставшееся место страницы, и выводится отдельной таблицей
+    с заголовком. В памяти держится не больше одной страницы строк,
+    независимо от общего кол-ва строк.
+    Высота строки зависит только от кол-ва строк текста в самой многострочной
+    ячейке ("\n" в описании), поэтому меряется один раз на каждое такое кол-во.
+    """
 
-        # Отступы
-        ("PADDING", (0, 0), (-1, -1), 6),
-    ]))
+    def __init__(self, header: list, rows):
+        super().__init__()
+        self.header = header
+        self.rows = iter(rows)
+        self.buffer = []
+        self.exhausted = False
+        self.table = None
+        self.avail_width = None
+        self.header_height = None
+        self.row_heights = {}
 
-    return table
+    def _measure(self, avail_width):
+        """Высота заголовка таблицы"""
+        if self.header_height is not None and self.avail_width == avail_width:
+            return
+        self.avail_width = avail_width
+        self.row_heights = {}
+        _, self.header_height = products_table([self.header]).wrap(avail_width, 0)
+
+    def _row_height(self, row) -> float:
+        """Высота строки таблицы по кол-ву строк текста в ячейках"""
+        lines = max(str(cell).count("\n") for cell in row) + 1
+        if lines not in self.row_heights:
+            sample = ["\n".join([""] * lines)] + [""] * (len(self.header) - 1)
+            _, height = products_table([self.header, sample]).wrap(self.avail_width, 0)
+            self.row_heights[lines] = height - self.header_height
+        return self.row_heights[lines]
+
+    def _fill(self, count: int):
+        """Дочитывает строки из итератора до count в буфере"""
+        while not self.exhausted and len(self.buffer) < count:
+            try:
+                self.buffer.append(next(self.rows))
+            except StopIteration:
+                self.exhausted = True
+
+    def _fits(self, avail_height) -> int:
+        """Кол-во строк, помещающихся под заголовком в avail_height (строки дочитываются)"""
+        room = avail_height - self.header_height
+        count = 0
+        while True:
+            self._fill(count + 1)
+            if count == len(self.buffer):
+                return count
+            room -= self._row_height(self.buffer[count])
+            if room < 0:
+                return count
+            count += 1
+
+    def wrap(self, avail_width, avail_height):
+        self._measure(avail_width)
+        fits = self._fits(avail_height)
+
+        if fits == len(self.buffer):
+            self.table = products_table([self.header] + self.buffer)
+            self.width, self.height = self.table.wrap(avail_width, avail_height)
+        else:
+            self.table = None
+            self.width, self.height = avail_width, avail_height + 1
+        return self.width, self.height
+
+    def split(self, avail_width, avail_height):
+        self._measure(avail_width)
+        fits = self._fits(avail_height)
+        if fits < 1:
+            return []
+
+        return [
+            products_table([self.header] + self.buffer[:fits]),
+            self._continuation(self.buffer[fits:]),
+        ]
+
+    def _continuation(self, buffer: list):
+        """
+        Продолжение таблицы на следующей странице
+        Новый объект, т.к. reportlab помечает перенесенный flowable как _postponed
+        """
+        rest = StreamingProductsTable(self.header, self.rows)
+        rest.buffer = buffer
+        rest.exhausted = self.exhausted
+        rest.avail_width = self.avail_width
+        rest.header_height = self.header_height
+        rest.row_heights = self.row_heights
+        self.buffer = []
+        return rest
+
+    def draw(self):
+        self.table.drawOn(self.canv, 0, 0)
+        # отрисованные строки больше не нужны
+        self.buffer = []
+        self.table = None
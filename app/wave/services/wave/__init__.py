@@ -1,3 +1,14 @@
 from .wave_factory import *
+from .documents import *
 from .wave_files import *
+from .uploads import *
+from .file_delivery import *
 from .wave_items import *
+from .packing_lists import *
+from .archive import *
+from .search import *
+from .hot_folder import *
+from .putaway import *
+from .pick_lists import *
+from .pick_tasks import *
+from .consolidation import *
@@ -0,0 +1,210 @@
+import logging
+import os
+import tempfile
+import zipfile
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from wave.models import (ArchivedWave, ArchivedWaveItem, Inbound, InboundItem,
+                         Outbound, OutboundItem, WaveItem)
+
+from .wave_files import wave_archive_entries, zip_compress_type
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_STATUSES = ("completed", "cancelled")
+
+WAVE_ARCHIVE_CONFIG = {
+    "inbound": {
+        "model": Inbound,
+        "item_model": InboundItem,
+        "item_fk": "inbound",
+        "number": "inbound_number",
+        "counterparty": "supplier",
+    },
+    "outbound": {
+        "model": Outbound,
+        "item_model": OutboundItem,
+        "item_fk": "outbound",
+        "number": "outbound_number",
+        "counterparty": "recipient",
+    },
+}
+
+
+def monthly_archive_name(wave_type: str, created_at, first_pk: int) -> str:
+    """
+    Архив документов пакета архивации в папке месяца: inbounds-2025-01/000123.zip
+    first_pk - наименьший pk волны пакета в этом месяце: повторный запуск
+    после сбоя до фиксации пакета перезаписывает тот же файл
+    """
+    return f"{wave_type}s-{created_at:%Y-%m}/{first_pk:06d}.zip"
+
+
+def archived_documents_path(archived_wave: ArchivedWave) -> str | None:
+    if not archived_wave.documents_archive:
+        return None
+    return os.path.join(settings.ARCHIVE_COLD_DIR, archived_wave.documents_archive)
+
+
+def archivable_waves(wave_type: str, days: int):
+    """Завершенные и отмененные волны, не менявшиеся больше days дней"""
+    model = WAVE_ARCHIVE_CONFIG[wave_type]["model"]
+    return model.objects.filter(
+        status__in=ARCHIVE_STATUSES,
+        updated_at__lt=timezone.now() - timedelta(days=days),
+    ).order_by("pk")
+
+
+def pack_wave_documents(waves, wave_type: str) -> dict[int, tuple[str, list[dict]]]:
+    """
+    Упаковывает документы волн в архивы ARCHIVE_COLD_DIR (папка number/):
+    по одному архиву на месяц пакета (см. monthly_archive_name)
+    Архив пишется один раз во временный файл и подменяется атомарно,
+    уже упакованные архивы месяца не копируются и не перечитываются
+    Возвращает {wave_pk: (имя архива, [{name, size}])}
+    """
+    number_field = WAVE_ARCHIVE_CONFIG[wave_type]["number"]
+    by_month = defaultdict(list)
+    for wave in sorted(waves, key=lambda wave: wave.pk):
+        by_month[f"{wave.created_at:%Y-%m}"].append(wave)
+
+    packed = {}
+    for month_waves in by_month.values():
+        archive_name = monthly_archive_name(
+            wave_type, month_waves[0].created_at, month_waves[0].pk
+        )
+        month_entries = [(wave, wave_archive_entries(wave)) for wave in month_waves]
+        for wave, entries in month_entries:
+            packed[wave.pk] = (
+                archive_name if entries else "",
+                [{"name": arcname, "size": os.path.getsize(path)} for arcname, path in entries],
+            )
+        if not any(entries for _, entries in month_entries):
+            continue
+
+        archive_path = os.path.join(settings.ARCHIVE_COLD_DIR, archive_name)
+        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(archive_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as dest:
+                with zipfile.ZipFile(dest, "w") as archive:
+                    for wave, entries in month_entries:
+                        prefix = f"{getattr(wave, number_field)}/"
+                        for arcname, path in entries:
+                            archive.write(
+                                path, prefix + arcname, compress_type=zip_compress_type(arcname)
+                            )
+                dest.flush()
+                os.fsync(dest.fileno())
+            os.replace(tmp_path, archive_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        logger.debug("pack_wave_documents(): %s, waves = %s", archive_name, len(month_waves))
+
+    return packed
+
+
+def _archive_items(wave_type: str, pks: list[int]):
+    """Перенос позиций волн в архивную таблицу одним INSERT ... SELECT"""
+    config = WAVE_ARCHIVE_CONFIG[wave_type]
+    item_table = config["item_model"]._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {ArchivedWaveItem._meta.db_table}
+                (wave_id, item_id, total_quantity, created_at)
+            SELECT aw.id, wi.item_id, wi.total_quantity, wi.created_at
+            FROM {item_table} ci
+            JOIN {WaveItem._meta.db_table} wi ON wi.id = ci.waveitem_ptr_id
+            JOIN {ArchivedWave._meta.db_table} aw ON aw.original_id = ci.{config["item_fk"]}_id
+            WHERE ci.{config["item_fk"]}_id = ANY(%s)
+            ORDER BY wi.id
+            """,
+            [pks],
+        )
+
+
+def archive_wave_batch(wave_type: str, pks: list[int]) -> int:
+    """
+    Архивация группы волн:
+    документы упаковываются в архивы месяцев до транзакции,
+    в транзакции волны и позиции переносятся в архивные таблицы и удаляются из рабочих.
+    Файлы волн и освободившееся содержимое хранилища удаляются в фоне после фиксации
+    Возвращает кол-во заархивированных волн
+    """
+    config = WAVE_ARCHIVE_CONFIG[wave_type]
+    model = config["model"]
+    waves = list(model.objects.filter(pk__in=pks, status__in=ARCHIVE_STATUSES))
+    if not waves:
+        return 0
+    packed = pack_wave_documents(waves, wave_type)
+
+    with transaction.atomic():
+        # волны, измененные после упаковки, не архивируются
+        locked = {
+            wave.pk: wave
+            for wave in model.objects.select_for_update().filter(
+                pk__in=[wave.pk for wave in waves],
+                status__in=ARCHIVE_STATUSES,
+            )
+        }
+        pks = [wave.pk for wave in waves if wave.pk in locked]
+        if not pks:
+            return 0
+
+        totals = {
+            row["fk"]: row
+            for row in config["item_model"]
+            .objects.filter(**{f"{config['item_fk']}_id__in": pks})
+            .values(fk=F(f"{config['item_fk']}_id"))
+            .annotate(items=Count("pk"), quantity=Sum("total_quantity"))
+        }
+        ArchivedWave.objects.bulk_create(
+            ArchivedWave(
+                original_id=wave.pk,
+                wave_type=wave_type,
+                number=getattr(wave, config["number"]),
+                counterparty=getattr(wave, config["counterparty"]),
+                stock_id=wave.stock_id,
+                status=wave.status,
+                planned_date=wave.planned_date,
+                actual_date=wave.actual_date,
+                description=wave.description,
+                created_by_id=wave.created_by_id,
+                created_at=wave.created_at,
+                updated_at=wave.updated_at,
+                total_items=totals.get(wave.pk, {}).get("items", 0),
+                total_quantity=totals.get(wave.pk, {}).get("quantity") or 0,
+                documents_archive=packed[wave.pk][0],
+                documents=packed[wave.pk][1],
+            )
+            for wave in (locked[pk] for pk in pks)
+        )
+        _archive_items(wave_type, pks)
+        model.objects.filter(pk__in=pks).delete()
+
+    logger.debug("archive_wave_batch(%s): %s", wave_type, len(pks))
+    return len(pks)
+
+
+def archive_waves(wave_type: str, days: int, batch_size: int = 100) -> int:
+    """Архивация всех волн типа wave_type старше days дней пакетами по batch_size"""
+    total = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            archivable_waves(wave_type, days)
+            .filter(pk__gt=last_pk)
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return total
+        last_pk = pks[-1]
+        total += archive_wave_batch(wave_type, pks)
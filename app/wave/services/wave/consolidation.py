@@ -0,0 +1,79 @@
+import logging
+import time
+
+from django.db.models import Count
+
+from wave.models import Outbound, OutboundStatusService
+
+logger = logging.getLogger(__name__)
+
+
+def consolidation_groups(*, stock_id: int | None = None, planned_date=None) -> list[dict]:
+    """
+    Запланированные отгрузки, сгруппированные по складу и планируемой дате, одним запросом
+    Отгрузки группы идут по порядку создания - в этом порядке им достается остаток
+
+    Возвращает [{"stock_id", "stock", "planned_date", "outbounds": [pk], "lines": позиций}]
+    """
+    outbounds = Outbound.objects.filter(status="planned")
+    if stock_id is not None:
+        outbounds = outbounds.filter(stock_id=stock_id)
+    if planned_date is not None:
+        outbounds = outbounds.filter(planned_date=planned_date)
+    rows = (
+        outbounds.annotate(lines=Count("outbound_items"))
+        .order_by("stock_id", "planned_date", "pk")
+        .values_list("pk", "stock_id", "stock__title", "planned_date", "lines")
+    )
+
+    groups = {}
+    for pk, group_stock_id, stock_title, group_date, lines in rows:
+        group = groups.setdefault(
+            (group_stock_id, group_date),
+            {
+                "stock_id": group_stock_id,
+                "stock": stock_title,
+                "planned_date": group_date,
+                "outbounds": [],
+                "lines": 0,
+            },
+        )
+        group["outbounds"].append(pk)
+        group["lines"] += lines
+    return list(groups.values())
+
+
+def consolidate_outbounds(*, stock_id: int | None = None, planned_date=None) -> list[dict]:
+    """
+    Консолидированный запуск подбора: каждая группа запланированных отгрузок
+    (склад + дата, см. consolidation_groups) переводится в in_progress одной транзакцией.
+    Суммарная потребность группы проверяется одним агрегирующим запросом и резервируется
+    одним проходом по заселениям (строки PlaceItem блокируются один раз на группу),
+    источники затем делятся между отгрузками по порядку (см. change_status_bulk)
+    Отгрузки сверх остатка остаются planned и попадают в результат с ошибкой
+
+    Возвращает [{"stock", "planned_date", "results": [результат по отгрузке]}]
+    """
+    consolidated = []
+    for group in consolidation_groups(stock_id=stock_id, planned_date=planned_date):
+        started = time.perf_counter()
+        results = OutboundStatusService.change_status_bulk(
+            pks=group["outbounds"], new_status="in_progress"
+        )
+        logger.info(
+            "Consolidated outbounds %s %s: outbounds = %s, lines = %s, started = %s, %.1f ms",
+            group["stock"],
+            group["planned_date"],
+            len(group["outbounds"]),
+            group["lines"],
+            sum(1 for result in results if result["ok"]),
+            (time.perf_counter() - started) * 1000,
+        )
+        consolidated.append(
+            {
+                "stock": group["stock"],
+                "planned_date": group["planned_date"],
+                "results": results,
+            }
+        )
+    return consolidated
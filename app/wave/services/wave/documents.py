@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+import magic
+from django.conf import settings
+from django.utils import timezone
+
+from wave.models import DocumentUpload, WaveDocument
+
+logger = logging.getLogger(__name__)
+
+
+def blob_path(sha256: str) -> str:
+    """Путь к содержимому документа: documents/ab/cd/abcd..."""
+    return os.path.join(settings.DOCUMENT_STORE_DIR, sha256[:2], sha256[2:4], sha256)
+
+
+def staging_dir() -> str:
+    """Каталог временных файлов хранилища (на той же ФС, что и blobs)"""
+    path = os.path.join(settings.DOCUMENT_STORE_DIR, "staging")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@dataclass
+class StagedBlob:
+    """
+    Содержимое, записанное во временный файл хранилища, но еще не перенесенное
+    в blobs/<hash>: перенос выполняется после фиксации транзакции (commit_blob)
+    """
+
+    tmp_path: str
+    hash: str
+    size: int
+    mime: str
+
+
+def stage_blob(chunks) -> StagedBlob:
+    """
+    Пишет содержимое во временный файл хранилища,
+    попутно считая sha256 и определяя MIME-тип по первому блоку (libmagic)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    mime = None
+    fd, tmp_path = tempfile.mkstemp(dir=staging_dir(), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as dest:
+            for chunk in chunks:
+                if mime is None:
+                    mime = magic.from_buffer(chunk, mime=True)
+                digest.update(chunk)
+                size += len(chunk)
+                dest.write(chunk)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+    return StagedBlob(
+        tmp_path=tmp_path,
+        hash=digest.hexdigest(),
+        size=size,
+        mime=mime or "application/x-empty",
+    )
+
+
+def commit_blob(blob: StagedBlob):
+    """
+    Переносит временный файл в blobs/<hash>
+    Одинаковое содержимое просто подменяется: rename атомарен,
+    а свежее время изменения защищает файл от сборщика мусора
+    """
+    path = blob_path(blob.hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(blob.tmp_path, path)
+
+
+def discard_blob(blob: StagedBlob):
+    """Удаляет непримененный временный файл"""
+    try:
+        os.remove(blob.tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def store_blob(chunks) -> StagedBlob:
+    """Сохраняет содержимое в хранилище документов сразу, без ожидания транзакции"""
+    blob = stage_blob(chunks)
+    commit_blob(blob)
+    return blob
+
+
+def unique_document_name(wave, name: str) -> str:
+    """Имя документа, не занятое в волне: "scan.pdf" -> "scan (2).pdf" """
+    taken = set(wave.documents.values_list("name", flat=True))
+    if name not in taken:
+        return name
+
+    stem, ext = os.path.splitext(name)
+    number = 2
+    while f"{stem} ({number}){ext}" in taken:
+        number += 1
+    return f"{stem} ({number}){ext}"
+
+
+def add_wave_document(*, wave, name: str, blob: StagedBlob) -> WaveDocument:
+    """
+    Добавляет документ в индекс волны
+    Повторная загрузка того же файла под тем же именем не создает копию,
+    другой файл с занятым именем получает суффикс
+    """
+    name = os.path.basename(name)
+    existing = wave.documents.filter(name=name, hash=blob.hash).first()
+    if existing:
+        logger.debug("add_wave_document(): %s уже в волне %s", name, wave.pk)
+        return existing
+
+    document = WaveDocument.objects.create(
+        wave=wave,
+        name=unique_document_name(wave, name),
+        size=blob.size,
+        hash=blob.hash,
+        mime=blob.mime,
+    )
+    logger.debug("add_wave_document(): %s -> %s", document.name, blob.hash)
+    return document
+
+
+def collect_document_garbage(min_age: int | None = None) -> dict:
+    """
+    Удаляет из хранилища содержимое, на которое не ссылается ни один документ
+    Файлы моложе min_age секунд не трогаются: их запись в индекс
+    может быть еще в незафиксированной транзакции.
+    Просроченные сессии докачиваемых загрузок удаляются вместе с их файлами
+    Возвращает статистику: files, bytes
+    """
+    if min_age is None:
+        min_age = settings.DOCUMENT_GC_MIN_AGE
+    store = settings.DOCUMENT_STORE_DIR
+    if not os.path.isdir(store):
+        return {"files": 0, "bytes": 0}
+
+    referenced = set(WaveDocument.objects.values_list("hash", flat=True).distinct())
+    # staging-файлы незавершенных докачиваемых загрузок живут до UPLOAD_SESSION_TTL
+    expired = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    DocumentUpload.objects.filter(updated_at__lt=expired).delete()
+    referenced.update(
+        upload.staging_name
+        for upload in DocumentUpload.objects.only("pk")
+    )
+    deadline = time.time() - min_age
+    removed, removed_bytes = 0, 0
+    for dir_path, _, filenames in os.walk(store):
+        for filename in filenames:
+            if filename in referenced:
+                continue
+            path = os.path.join(dir_path, filename)
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > deadline:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+            removed_bytes += stat.st_size
+
+    logger.debug("collect_document_garbage(): files = %s, bytes = %s", removed, removed_bytes)
+    return {"files": removed, "bytes": removed_bytes}
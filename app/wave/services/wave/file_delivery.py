@@ -0,0 +1,47 @@
+import logging
+import mimetypes
+import os
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+logger = logging.getLogger(__name__)
+
+
+def x_accel_url(path: str) -> str | None:
+    """
+    Внутренний адрес nginx для файла по таблице X_ACCEL_LOCATIONS
+    Возвращает None, если файл лежит вне опубликованных каталогов
+    """
+    path = os.path.realpath(path)
+    for folder, location in settings.X_ACCEL_LOCATIONS.items():
+        folder = os.path.realpath(folder)
+        if os.path.commonpath([path, folder]) == folder:
+            relative = os.path.relpath(path, folder).replace(os.sep, "/")
+            return f"{location.rstrip('/')}/{relative}"
+    return None
+
+
+def send_file(path: str, *, filename: str, content_type: str | None = None) -> HttpResponse:
+    """
+    Отдача файла на скачивание после проверки прав во view
+    FILE_DELIVERY = "nginx": пустой ответ с заголовком X-Accel-Redirect,
+    файл отдает nginx из internal location, воркер gunicorn сразу освобождается.
+    Иначе (dev) - FileResponse
+    """
+    content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    if settings.FILE_DELIVERY == "nginx":
+        internal_url = x_accel_url(path)
+        if internal_url is not None:
+            logger.debug("send_file(): X-Accel-Redirect %s", internal_url)
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = internal_url
+            response["Content-Disposition"] = content_disposition_header(True, filename)
+            return response
+        logger.warning("send_file(): %s вне X_ACCEL_LOCATIONS, отдается через Django", path)
+
+    return FileResponse(
+        open(path, "rb"), as_attachment=True, filename=filename, content_type=content_type
+    )
@@ -0,0 +1,263 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from datetime import date, datetime
+
+from django.core.files import File
+from django.db import close_old_connections, connection
+
+from .wave_factory import create_wave_from_form
+from .wave_files import discard_staged, stage_wave_files
+
+logger = logging.getLogger(__name__)
+
+# префикс имени файла формы -> тип волны
+HOT_FOLDER_PREFIXES = {"INB-FORM": "inbound", "OUT-FORM": "outbound"}
+HOT_FOLDER_SUBDIRS = ("processing", "done", "failed")
+
+# inotify(7): файл дописан и закрыт / перемещен в папку
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def hot_folder_skip(filename: str) -> bool:
+    """Скрытые и временные файлы (в т.ч. блокировки Excel ~$...) не обрабатываются"""
+    return filename.startswith((".", "~$")) or filename.lower().endswith((".tmp", ".part"))
+
+
+def hot_folder_files(root: str) -> list[str]:
+    """Файлы, ожидающие обработки в папке"""
+    with os.scandir(root) as entries:
+        return sorted(
+            entry.name
+            for entry in entries
+            if entry.is_file() and not hot_folder_skip(entry.name)
+        )
+
+
+def parse_hot_folder_name(filename: str) -> tuple[str, str, date | None]:
+    """
+    Тип волны, поставщик/заказчик и планируемая дата по имени файла формы:
+        INB-FORM_<поставщик>[_<ГГГГ-ММ-ДД>].xlsx
+        OUT-FORM_<заказчик>[_<ГГГГ-ММ-ДД>].csv
+    """
+    stem = os.path.splitext(filename)[0]
+    prefix, *parts = stem.split("_")
+    wave_type = HOT_FOLDER_PREFIXES.get(prefix.upper())
+    if wave_type is None:
+        raise Exception(
+            f"Имя файла должно начинаться с {' или '.join(HOT_FOLDER_PREFIXES)}"
+        )
+
+    planned_date = None
+    if parts:
+        try:
+            planned_date = datetime.strptime(parts[-1], "%Y-%m-%d").date()
+            parts = parts[:-1]
+        except ValueError:
+            pass
+
+    partner = " ".join(parts).strip()
+    if not partner:
+        field = "поставщик" if wave_type == "inbound" else "заказчик"
+        raise Exception(f"В имени файла не указан {field}")
+    return wave_type, partner, planned_date
+
+
+def _unique_path(folder: str, filename: str) -> str:
+    """Путь в папке без перезаписи: совпадающее имя получает суффикс -1, -2..."""
+    path = os.path.join(folder, filename)
+    stem, ext = os.path.splitext(filename)
+    n = 0
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(folder, f"{stem}-{n}{ext}")
+    return path
+
+
+def prepare_hot_folder(root: str):
+    """
+    Создание служебных папок. Файлы, оставшиеся в processing после
+    аварийной остановки, переносятся в failed: волна могла быть создана,
+    повторная обработка создала бы ее второй раз
+    """
+    for subdir in HOT_FOLDER_SUBDIRS:
+        os.makedirs(os.path.join(root, subdir), exist_ok=True)
+
+    processing = os.path.join(root, "processing")
+    for filename in os.listdir(processing):
+        if filename.endswith(".error.txt"):
+            continue
+        _finish(
+            root,
+            os.path.join(processing, filename),
+            "Обработка прервана остановкой, проверьте, создана ли волна",
+        )
+
+
+def claim_hot_folder_file(root: str, filename: str) -> str | None:
+    """
+    Перенос файла из папки в processing (rename в пределах одной ФС атомарен)
+    Возвращает новый путь, None - если файл уже забран или удален
+    """
+    src = os.path.join(root, filename)
+    if not os.path.isfile(src):
+        return None
+    path = _unique_path(os.path.join(root, "processing"), filename)
+    try:
+        os.rename(src, path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def _finish(root: str, path: str, error: str | None = None) -> str:
+    """Перенос обработанного файла в done / failed, рядом с failed - отчет об ошибке"""
+    folder = os.path.join(root, "failed" if error else "done")
+    target = _unique_path(folder, os.path.basename(path))
+    os.rename(path, target)
+    if error:
+        with open(f"{target}.error.txt", "w", encoding="utf-8") as report:
+            report.write(f"{datetime.now():%Y-%m-%d %H:%M:%S}\n{error}\n")
+    return target
+
+
+def ingest_hot_folder_file(*, root: str, path: str, user, stock, status: str) -> str:
+    """
+    Создание волны по файлу формы из горячей папки (выполняется в фоновом потоке)
+    Данные волны проверяются формой создания волны, сама волна создается
+    тем же create_wave_from_form, что и при загрузке через браузер
+    Возвращает путь файла в done / failed
+    """
+    from wave.forms import InboundCreateForm, OutboundCreateForm
+
+    filename = os.path.basename(path)
+    logger.debug("ingest_hot_folder_file(): %s", filename)
+    close_old_connections()
+    uploads = []
+    try:
+        wave_type, partner, planned_date = parse_hot_folder_name(filename)
+        form_class = InboundCreateForm if wave_type == "inbound" else OutboundCreateForm
+        form = form_class(
+            data={
+                "stock": stock.pk,
+                "status": status,
+                "supplier" if wave_type == "inbound" else "recipient": partner,
+                "planned_date": planned_date or date.today(),
+                "actual_date": date.today() if status == "completed" else None,
+                "description": f"Горячая папка: {filename}",
+            }
+        )
+        if not form.is_valid():
+            raise Exception(
+                "; ".join(message for errors in form.errors.values() for message in errors)
+            )
+
+        with open(path, "rb") as src:
+            uploads = stage_wave_files([File(src, name=filename)])
+        wave = create_wave_from_form(
+            wave_type=wave_type, user=user, data=form.cleaned_data, uploads=uploads
+        )
+        logger.debug("Hot folder: %s -> %s", filename, wave)
+        return _finish(root, path)
+
+    except Exception as e:
+        logger.exception("Hot folder: %s: %s", filename, e)
+        return _finish(root, path, str(e))
+
+    finally:
+        discard_staged(uploads)
+        connection.close()
+
+
+class PollingWatcher:
+    """
+    Опрос папки раз в interval сек
+    Файл считается готовым, когда его размер и время изменения
+    не поменялись между двумя опросами (копирование завершено)
+    """
+
+    def __init__(self, root: str, interval: float):
+        self.root = root
+        self.interval = interval
+        self._seen = {}
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        files = {}
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file() and not hot_folder_skip(entry.name):
+                    stat = entry.stat()
+                    files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def wait(self, timeout: float) -> list[str]:
+        time.sleep(min(timeout, self.interval))
+        files = self._scan()
+        ready = [name for name, sign in files.items() if self._seen.get(name) == sign]
+        self._seen = {name: sign for name, sign in files.items() if name not in ready}
+        return sorted(ready)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Ожидание файлов через inotify (Linux, через libc, без зависимостей)
+    Готовым считается файл, закрытый после записи или перемещенный в папку.
+    Файлы, лежавшие в папке до запуска, отдаются первым вызовом wait()
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        if libc.inotify_add_watch(self._fd, os.fsencode(root), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, "inotify_add_watch")
+        self._initial = hot_folder_files(root)
+
+    def wait(self, timeout: float) -> list[str]:
+        ready, self._initial = self._initial, []
+        if ready:
+            return ready
+
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        data = os.read(self._fd, 64 * 1024)
+        names, offset = [], 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                # очередь событий переполнена: часть имен потеряна, папка читается заново
+                return hot_folder_files(self.root)
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if name and name not in names and not hot_folder_skip(name):
+                names.append(name)
+        return names
+
+    def close(self):
+        os.close(self._fd)
+
+
+def hot_folder_watcher(root: str, poll_interval: float, polling: bool = False):
+    """inotify, если доступен, иначе опрос папки"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError, TypeError) as e:
+            logger.warning("inotify unavailable (%s), polling %s", e, root)
+    return PollingWatcher(root, poll_interval)
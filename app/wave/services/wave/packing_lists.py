@@ -0,0 +1,265 @@
+import datetime
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from warehouse.models import Item
+from wave.models import Outbound, OutboundItem, WaveItem
+from wave.pdf_generator import register_fonts
+from wave.pdf_generator.packing_list import (TEMPLATE_VERSION, company_name,
+                                             description_short,
+                                             packing_list_lines,
+                                             packing_list_path,
+                                             render_packing_list_pdf)
+
+logger = logging.getLogger(__name__)
+
+
+def packing_list_keys(outbounds) -> dict[int, str]:
+    """
+    Ключи содержимого упаковочных листов {outbound_pk: sha256}
+    Ключ зависит от строк отгрузки (товар, кол-во, вес, описание), заказчика,
+    названия компании, версии шаблона и даты формирования (печатается в листе).
+    Хеш строк всех отгрузок считается в БД одним GROUP BY запросом
+    """
+    outbounds = list(outbounds)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT oi.outbound_id,
+                   encode(sha256(convert_to(string_agg(
+                       concat_ws(E'\\x1f', i.item_code, wi.total_quantity,
+                                 i.weight, i.description),
+                       E'\\x1e' ORDER BY wi.id
+                   ), 'UTF8')), 'hex')
+            FROM {OutboundItem._meta.db_table} oi
+            JOIN {WaveItem._meta.db_table} wi ON wi.id = oi.waveitem_ptr_id
+            JOIN {Item._meta.db_table} i ON i.id = wi.item_id
+            WHERE oi.outbound_id = ANY(%s)
+            GROUP BY oi.outbound_id
+            """,
+            [[outbound.pk for outbound in outbounds]],
+        )
+        lines_hashes = dict(cursor.fetchall())
+
+    name = company_name()
+    today = datetime.date.today().isoformat()
+    return {
+        outbound.pk: hashlib.sha256(
+            "\x1e".join(
+                [
+                    str(TEMPLATE_VERSION),
+                    today,
+                    str(name),
+                    outbound.recipient,
+                    lines_hashes.get(outbound.pk, ""),
+                ]
+            ).encode()
+        ).hexdigest()
+        for outbound in outbounds
+    }
+
+
+def _is_cached(outbound, key: str, path: str) -> bool:
+    return outbound.packing_list_hash == key and os.path.isfile(path)
+
+
+def _tmp_path(path: str) -> str:
+    """
+    Уникальный временный файл рядом с итоговым: готовый лист подменяется атомарно,
+    параллельные формирования одного листа (фоновый поток, запрос, пул) не пишут в один файл
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    return tmp_path
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def get_packing_list(outbound, force: bool = False) -> str:
+    """
+    Возвращает путь к упаковочному листу отгрузки
+    Если содержимое не менялось с прошлого формирования и файл на месте -
+    отдается существующий файл, иначе лист формируется заново
+    """
+    key = packing_list_keys([outbound])[outbound.pk]
+    path = packing_list_path(outbound.get_uploads_dir(), outbound.outbound_number)
+    if not force and _is_cached(outbound, key, path):
+        logger.debug("get_packing_list(out_pk:%s): cached", outbound.pk)
+        return path
+
+    logger.debug("get_packing_list(out_pk:%s): render", outbound.pk)
+    tmp_path = _tmp_path(path)
+    try:
+        render_packing_list_pdf(
+            filename=tmp_path,
+            recipient=outbound.recipient,
+            company_name=company_name(),
+            lines=packing_list_lines(outbound),
+        )
+        os.replace(tmp_path, path)
+    except Exception:
+        _remove(tmp_path)
+        raise
+
+    outbound.packing_list_hash = key
+    Outbound.objects.filter(pk=outbound.pk).update(packing_list_hash=key)
+    return path
+
+
+def collect_packing_list_jobs(outbounds) -> list[dict]:
+    """
+    Задания на отрисовку упаковочных листов группы отгрузок
+    Строки всех отгрузок группы читаются одним запросом и передаются в задание:
+    процессы пула с БД не работают. Группа ограничивается вызывающим кодом
+    (см. PACKING_LIST_CHUNK_SIZE), поэтому память родителя не зависит от числа отгрузок
+    """
+    outbounds = list(outbounds)
+    lines = {outbound.pk: [] for outbound in outbounds}
+    rows = (
+        OutboundItem.objects.filter(outbound_id__in=lines)
+        .order_by("outbound_id", "pk")
+        .values_list(
+            "outbound_id",
+            "item__item_code",
+            "total_quantity",
+            "item__weight",
+            "item__description",
+        )
+    )
+    for outbound_id, item_code, quantity, weight, description in rows.iterator(
+        chunk_size=2000
+    ):
+        lines[outbound_id].append(
+            (item_code, quantity, weight, description_short(description))
+        )
+
+    name = company_name()
+    return [
+        {
+            "pk": outbound.pk,
+            "path": packing_list_path(outbound.get_uploads_dir(), outbound.outbound_number),
+            "recipient": outbound.recipient,
+            "company_name": name,
+            "lines": lines[outbound.pk],
+        }
+        for outbound in outbounds
+    ]
+
+
+def _render_job(job: dict) -> tuple[int, str, int]:
+    """
+    Отрисовка одного упаковочного листа в процессе пула
+    во временный файл рядом с итоговым (создается здесь же, при ошибке удаляется)
+    Возвращает (pk, временный файл, кол-во строк)
+    """
+    tmp_path = _tmp_path(job["path"])
+    try:
+        render_packing_list_pdf(
+            filename=tmp_path,
+            recipient=job["recipient"],
+            company_name=job["company_name"],
+            lines=job["lines"],
+        )
+    except Exception:
+        _remove(tmp_path)
+        raise
+    return job["pk"], tmp_path, len(job["lines"])
+
+
+def regenerate_packing_lists(outbounds, workers: int | None = None, force: bool = False) -> dict:
+    """
+    Пересоздание упаковочных листов группы отгрузок в пуле процессов
+    Отгрузки с неизменившимся содержимым пропускаются (если не force)
+    Строки читаются пачками по PACKING_LIST_CHUNK_SIZE отгрузок (один запрос на пачку)
+    Каждый процесс пула регистрирует шрифты один раз при старте
+    Результат записывается в Outbound.packing_list_status
+
+    Возвращает статистику: documents, lines, skipped, failed, seconds
+    """
+    started = time.perf_counter()
+    outbounds = list(outbounds)
+    keys = packing_list_keys(outbounds)
+    stale = [
+        outbound
+        for outbound in outbounds
+        if force
+        or not _is_cached(
+            outbound,
+            keys[outbound.pk],
+            packing_list_path(outbound.get_uploads_dir(), outbound.outbound_number),
+        )
+    ]
+    logger.debug("regenerate_packing_lists(): jobs = %s, workers = %s", len(stale), workers)
+
+    # соединения с БД не должны наследоваться процессами пула
+    connections.close_all()
+
+    ready, failed, total_lines = [], {}, 0
+    if stale:
+        # fork явно: процессы наследуют настроенный Django (в 3.14 по умолчанию forkserver)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=register_fonts,
+            mp_context=multiprocessing.get_context("fork"),
+        ) as pool:
+            chunk_size = settings.PACKING_LIST_CHUNK_SIZE
+            for start in range(0, len(stale), chunk_size):
+                jobs = collect_packing_list_jobs(stale[start:start + chunk_size])
+                paths = {job["pk"]: job["path"] for job in jobs}
+                futures = {pool.submit(_render_job, job): job["pk"] for job in jobs}
+                for future in as_completed(futures):
+                    pk = futures[future]
+                    try:
+                        _, tmp_path, lines_count = future.result()
+                        os.replace(tmp_path, paths[pk])
+                        ready.append(pk)
+                        total_lines += lines_count
+                    except Exception as e:
+                        logger.error("Error generating packing list out_pk:%s: %s", pk, e)
+                        failed[pk] = str(e)[:500]
+
+    for pk in ready:
+        Outbound.objects.filter(pk=pk).update(
+            packing_list_status="ready", packing_list_error="", packing_list_hash=keys[pk]
+        )
+    for pk, error in failed.items():
+        Outbound.objects.filter(pk=pk).update(
+            packing_list_status="failed", packing_list_error=error
+        )
+
+    return {
+        "documents": len(ready),
+        "lines": total_lines,
+        "skipped": len(outbounds) - len(stale),
+        "failed": len(failed),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def stale_pending_packing_lists(minutes: int | None = None):
+    """
+    Отгрузки, чей упаковочный лист завис в статусе "pending" дольше minutes
+    (по умолчанию PACKING_LIST_PENDING_TIMEOUT): задача фоновой очереди потеряна
+    при перезапуске или падении процесса
+    """
+    if minutes is None:
+        minutes = settings.PACKING_LIST_PENDING_TIMEOUT
+    deadline = timezone.now() - datetime.timedelta(minutes=minutes)
+    return Outbound.objects.filter(packing_list_status="pending").filter(
+        Q(packing_list_requested_at__lt=deadline) | Q(packing_list_requested_at__isnull=True)
+    )
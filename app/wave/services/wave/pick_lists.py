@@ -0,0 +1,41 @@
+import io
+import logging
+
+from wave.models import Outbound
+from wave.pdf_generator.pick_list import (pick_list_data, pick_list_filename,
+                                          render_pick_list_pdf)
+
+logger = logging.getLogger(__name__)
+
+
+def pick_list_route(outbound: Outbound) -> dict:
+    """
+    Строки подбора отгрузки в порядке обхода и метрика маршрута (см. pick_list_data)
+    Длина пути пишется в лог как метрика подбора
+    """
+    data = pick_list_data(outbound)
+    if not data["lines"]:
+        raise Exception(f"По отгрузке {outbound} нет строк подбора")
+    logger.info(
+        "Pick route %s: lines = %s, stops = %s, distance = %s",
+        outbound,
+        len(data["lines"]),
+        data["stops"],
+        data["distance"],
+    )
+    return data
+
+
+def get_pick_list(outbound: Outbound) -> bytes:
+    """
+    Лист подбора отгрузки, формируется в памяти при каждом запросе (строк немного)
+    В папку волны не пишется: не попадает в архив документов и не сбрасывает его кеш
+    """
+    buffer = io.BytesIO()
+    render_pick_list_pdf(
+        filename=buffer,
+        outbound_number=outbound.outbound_number,
+        recipient=outbound.recipient,
+        data=pick_list_route(outbound),
+    )
+    return buffer.getvalue()
@@ -0,0 +1,90 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from wave.models import OutboundPick, OutboundStatusService, PickBatch
+
+logger = logging.getLogger(__name__)
+
+
+def claim_pick_batch(*, user, outbound_id: int | None = None) -> PickBatch | None:
+    """
+    Сборщик берет следующий свободный пакет задач подбора (отгрузки outbound_id или любой)
+    Пакеты, которые в этот момент берут другие сборщики, пропускаются (SKIP LOCKED),
+    поэтому параллельные запросы получают разные пакеты без ожидания блокировок
+    Возвращает пакет или None, если свободных пакетов нет
+    """
+    with transaction.atomic():
+        batches = PickBatch.objects.select_for_update(skip_locked=True, of=("self",)).filter(
+            status="open", outbound__status="in_progress"
+        )
+        if outbound_id is not None:
+            batches = batches.filter(outbound_id=outbound_id)
+        batch = batches.order_by("outbound_id", "number").first()
+        if batch is None:
+            return None
+
+        batch.status = "claimed"
+        batch.claimed_by = user
+        batch.claimed_at = timezone.now()
+        batch.save(update_fields=["status", "claimed_by", "claimed_at"])
+
+    logger.debug("claim_pick_batch(): batch = %s, user = %s", batch.pk, user.pk)
+    return batch
+
+
+def _claimed_batch(batch_id: int, user) -> PickBatch:
+    """Пакет, взятый сборщиком, заблокированный до конца транзакции"""
+    batch = PickBatch.objects.select_for_update().filter(pk=batch_id).first()
+    if batch is None:
+        raise Exception("Пакет подбора не найден")
+    if batch.status != "claimed" or batch.claimed_by_id != user.pk:
+        raise Exception(f"Пакет подбора {batch} не взят этим сборщиком")
+    return batch
+
+
+def confirm_pick_task(*, task_id: int, user) -> OutboundPick:
+    """
+    Подтверждение задачи подбора сборщиком пакета:
+    на OUTBOUND переносится только количество задачи, резерв места снимается
+    Пакет без открытых задач считается собранным
+    """
+    with transaction.atomic():
+        task = (
+            OutboundPick.objects.select_for_update(of=("self",))
+            .select_related("outbound")
+            .filter(pk=task_id)
+            .first()
+        )
+        if task is None:
+            raise Exception("Задача подбора не найдена")
+        if task.status != "open":
+            raise Exception("Задача подбора уже подтверждена")
+        if task.outbound.status != "in_progress":
+            raise Exception(f"Отгрузка {task.outbound} не в процессе подбора")
+        if task.batch_id is None:
+            raise Exception("Задача подбора не входит в пакет")
+        batch = _claimed_batch(task.batch_id, user)
+
+        OutboundStatusService.confirm_picks([task], user)
+
+        if not batch.picks.filter(status="open").exists():
+            batch.status = "done"
+            batch.save(update_fields=["status"])
+
+    logger.debug("confirm_pick_task(): task = %s, user = %s", task.pk, user.pk)
+    return task
+
+
+def release_pick_batch(*, batch_id: int, user) -> PickBatch:
+    """Сборщик возвращает взятый пакет, неподтвержденные задачи достаются другим"""
+    with transaction.atomic():
+        batch = _claimed_batch(batch_id, user)
+        batch.status = "open"
+        batch.claimed_by = None
+        batch.claimed_at = None
+        batch.save(update_fields=["status", "claimed_by", "claimed_at"])
+
+    logger.debug("release_pick_batch(): batch = %s, user = %s", batch.pk, user.pk)
+    return batch
@@ -0,0 +1,120 @@
+import logging
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from warehouse.models import Place, PlaceItem
+from warehouse.services import execute_putaway, lock_putaway, suggest_putaway
+from wave.models import Inbound, InboundItem, WaveItem
+
+logger = logging.getLogger(__name__)
+
+INBOUND_ITEM_TABLE = InboundItem._meta.db_table
+WAVE_ITEM_TABLE = WaveItem._meta.db_table
+
+
+def inbound_putaway_quantities(inbound: Inbound, new_place: Place) -> dict[int, int]:
+    """
+    Количество поставки, ожидающее размещения на NEW {item_id: quantity}
+    Уже размещенное по поставке (InboundItem.putaway_quantity) не учитывается.
+    Адрес NEW общий для всех поставок, поэтому берется не больше,
+    чем осталось разместить по поставке и чем лежит на NEW
+    """
+    if inbound.status != "completed":
+        raise Exception(f"Поставка {inbound} не завершена, товар еще не на NEW")
+
+    wanted = {
+        item_id: remaining
+        for item_id, remaining in (
+            InboundItem.objects.filter(inbound=inbound)
+            .values("item_id")
+            .annotate(remaining=Sum("total_quantity") - Sum("putaway_quantity"))
+            .values_list("item_id", "remaining")
+        )
+        if remaining > 0
+    }
+    if not wanted:
+        raise Exception(f"Поставка {inbound} уже размещена")
+
+    on_new = dict(
+        PlaceItem.objects.filter(place=new_place, item_id__in=wanted).values_list(
+            "item_id", "quantity"
+        )
+    )
+    return {
+        item_id: min(quantity, on_new[item_id])
+        for item_id, quantity in wanted.items()
+        if on_new.get(item_id)
+    }
+
+
+def _record_putaway(inbound: Inbound, moved: list[dict]):
+    """
+    Учет размещенного по поставке: перемещенное количество товара
+    распределяется по позициям поставки по порядку, одним UPDATE ... FROM
+    """
+    totals = {}
+    for line in moved:
+        totals[line["item_id"]] = totals.get(line["item_id"], 0) + line["quantity"]
+    if not totals:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                SELECT * FROM unnest(%s::bigint[], %s::integer[]) AS m(item_id, qty)
+            ),
+            lines AS (
+                SELECT ii.waveitem_ptr_id AS id, m.qty,
+                       wi.total_quantity - ii.putaway_quantity AS remaining,
+                       SUM(wi.total_quantity - ii.putaway_quantity) OVER (
+                           PARTITION BY wi.item_id ORDER BY wi.id
+                       ) - (wi.total_quantity - ii.putaway_quantity) AS before
+                FROM {INBOUND_ITEM_TABLE} ii
+                JOIN {WAVE_ITEM_TABLE} wi ON wi.id = ii.waveitem_ptr_id
+                JOIN moved m ON m.item_id = wi.item_id
+                WHERE ii.inbound_id = %s AND wi.total_quantity > ii.putaway_quantity
+            )
+            UPDATE {INBOUND_ITEM_TABLE} ii
+            SET putaway_quantity = ii.putaway_quantity + LEAST(l.remaining, l.qty - l.before)
+            FROM lines l
+            WHERE ii.waveitem_ptr_id = l.id AND l.qty > l.before
+            """,
+            [list(totals), list(totals.values()), inbound.pk],
+        )
+
+
+def _new_place() -> Place:
+    try:
+        return Place.objects.get(title="NEW")
+    except Place.DoesNotExist:
+        raise Exception("На складе отсутствует технический адрес NEW")
+
+
+def inbound_putaway_plan(inbound: Inbound) -> dict:
+    """План размещения поставки с NEW (без изменения стока), см. suggest_putaway()"""
+    quantities = inbound_putaway_quantities(inbound, _new_place())
+    return suggest_putaway(quantities=quantities, stock_id=inbound.stock_id)
+
+
+def putaway_inbound(*, inbound: Inbound, user) -> dict:
+    """
+    Размещение поставки с NEW по предложенному плану одной транзакцией
+    План строится заново под блокировкой размещения, поэтому
+    места, выбранные параллельным размещением, уже учтены в индексе занятости.
+    Перемещенное записывается в позиции поставки: повторное размещение
+    берет с NEW только остаток поставки, а не товар других поставок
+
+    Возвращает {"lines": исполненные строки, "unplaced": не размещенное}
+    """
+    logger.debug("putaway_inbound(): inbound = %s", inbound.pk)
+    new_place = _new_place()
+    with transaction.atomic():
+        lock_putaway()
+        plan = suggest_putaway(
+            quantities=inbound_putaway_quantities(inbound, new_place),
+            stock_id=inbound.stock_id,
+        )
+        moved = execute_putaway(from_place=new_place, lines=plan["lines"], user=user)
+        _record_putaway(inbound, moved)
+    return {"lines": moved, "unplaced": plan["unplaced"]}
@@ -0,0 +1,42 @@
+from wave.models import ArchivedWave
+
+from .archive import WAVE_ARCHIVE_CONFIG
+
+
+def filter_waves(qs, wave_type: str, data: dict, archived: bool = False):
+    """
+    Фильтры поиска поставок/отгрузок (InboundSearchForm, OutboundSearchForm)
+    Общие для страниц поиска, API и архивных волн
+    archived - qs из ArchivedWave: номер и контрагент в полях number, counterparty
+    """
+    config = WAVE_ARCHIVE_CONFIG[wave_type]
+    number_field = "number" if archived else config["number"]
+    counterparty_field = "counterparty" if archived else config["counterparty"]
+
+    if data.get("stock"):
+        qs = qs.filter(stock=data["stock"])
+
+    if data.get(config["number"]):
+        qs = qs.filter(**{f"{number_field}__icontains": data[config["number"]].strip()})
+
+    if data.get(config["counterparty"]):
+        qs = qs.filter(
+            **{f"{counterparty_field}__icontains": data[config["counterparty"]].strip()}
+        )
+
+    if data.get("status"):
+        qs = qs.filter(status=data["status"])
+
+    if data.get("planned_date"):
+        qs = qs.filter(planned_date__gte=data["planned_date"])
+
+    if data.get("actual_date"):
+        qs = qs.filter(actual_date__lte=data["actual_date"])
+
+    return qs
+
+
+def search_archived_waves(wave_type: str, data: dict):
+    """Архивные волны с фильтрами форм поиска поставок/отгрузок"""
+    qs = ArchivedWave.objects.select_related("stock").filter(wave_type=wave_type)
+    return filter_waves(qs, wave_type, data, archived=True).order_by("-number")
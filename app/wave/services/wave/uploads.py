@@ -0,0 +1,181 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+import magic
+from django.conf import settings
+from django.db import transaction
+
+from wave.models import DocumentUpload
+
+from .documents import StagedBlob, staging_dir
+from .wave_files import (StagedUpload, validate_wave_file,
+                         validate_wave_file_mime)
+
+logger = logging.getLogger(__name__)
+
+
+class UploadOffsetError(Exception):
+    """Часть пришла не с того смещения: клиент должен продолжить с upload.offset"""
+
+    def __init__(self, upload: DocumentUpload):
+        self.upload = upload
+        super().__init__(f"Ожидается смещение {upload.offset}")
+
+
+def upload_staging_path(upload: DocumentUpload) -> str:
+    return os.path.join(staging_dir(), upload.staging_name)
+
+
+def start_upload(*, user, name: str, size: int, expected_hash: str = "") -> DocumentUpload:
+    """Создает сессию загрузки и пустой staging-файл"""
+    upload = DocumentUpload(
+        user=user,
+        name=os.path.basename(name),
+        size=size,
+        expected_hash=expected_hash.lower(),
+    )
+    validate_wave_file(upload)
+    upload.save()
+    open(upload_staging_path(upload), "wb").close()
+    logger.debug("start_upload(): %s %s (%s)", upload.pk, upload.name, upload.size)
+    return upload
+
+
+def _complete_upload(upload: DocumentUpload) -> str | None:
+    """
+    Проверка принятого файла: sha256 всего файла, MIME по первому блоку
+    Возвращает текст ошибки, если содержимое не прошло проверку
+    """
+    digest = hashlib.sha256()
+    mime = None
+    with open(upload_staging_path(upload), "rb") as src:
+        while chunk := src.read(settings.UPLOAD_CHUNK_SIZE):
+            if mime is None:
+                mime = magic.from_buffer(chunk, mime=True)
+            digest.update(chunk)
+    upload.hash = digest.hexdigest()
+    upload.mime = mime or "application/x-empty"
+
+    if upload.expected_hash and upload.expected_hash != upload.hash:
+        return f"Контрольная сумма файла {upload.name} не совпадает"
+    try:
+        validate_wave_file_mime(upload.name, upload.mime)
+    except Exception as e:
+        return str(e)
+    upload.is_complete = True
+    return None
+
+
+def _receive_chunk(stream, length: int, checksum: str) -> str:
+    """
+    Прием части от клиента во временный файл хранилища (без блокировок БД)
+    Возвращает путь временного файла, при обрыве или несовпадении sha256 - исключение
+    """
+    digest = hashlib.sha256()
+    received = 0
+    fd, tmp_path = tempfile.mkstemp(dir=staging_dir(), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as dest:
+            while received < length:
+                chunk = stream.read(min(settings.UPLOAD_CHUNK_SIZE, length - received))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                dest.write(chunk)
+                received += len(chunk)
+        if received != length or (checksum and checksum.lower() != digest.hexdigest()):
+            raise Exception("Часть файла повреждена, повторите отправку")
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+def append_upload_chunk(
+    *, upload_id, user, offset: int, stream, length: int, checksum: str = ""
+) -> DocumentUpload:
+    """
+    Дописывает часть файла в staging-файл
+    Часть принимается только с текущего смещения сессии (иначе UploadOffsetError),
+    поврежденная часть (обрыв, несовпадение sha256) не записывается.
+    Часть сначала читается от клиента во временный файл без блокировки сессии,
+    затем под блокировкой смещение проверяется повторно, часть копируется
+    в staging-файл (локальная запись) и смещение сдвигается: медленный клиент
+    не держит блокировку, параллельные части одной загрузки не смешиваются
+    """
+    upload = DocumentUpload.objects.get(pk=upload_id, user=user)
+    if upload.is_complete:
+        return upload
+    if offset != upload.offset:
+        raise UploadOffsetError(upload)
+    if length > settings.UPLOAD_MAX_CHUNK or offset + length > upload.size:
+        raise Exception("Недопустимый размер части")
+
+    tmp_path = _receive_chunk(stream, length, checksum)
+    try:
+        with transaction.atomic():
+            upload = DocumentUpload.objects.select_for_update().get(pk=upload_id, user=user)
+            if upload.is_complete:
+                return upload
+            if offset != upload.offset:
+                # часть с этого смещения уже принята параллельным запросом
+                raise UploadOffsetError(upload)
+
+            path = upload_staging_path(upload)
+            with open(tmp_path, "rb") as src, open(path, "r+b") as dest:
+                dest.seek(offset)
+                shutil.copyfileobj(src, dest, settings.UPLOAD_CHUNK_SIZE)
+                dest.truncate(offset + length)
+
+            upload.offset = offset + length
+            error = _complete_upload(upload) if upload.offset == upload.size else None
+            if error:
+                # не прошедший проверку файл не докачать: сессия удаляется
+                upload.delete()
+            else:
+                upload.save()
+    finally:
+        os.remove(tmp_path)
+
+    if error:
+        os.remove(path)
+        raise Exception(error)
+
+    logger.debug("append_upload_chunk(): %s %s/%s", upload.pk, upload.offset, upload.size)
+    return upload
+
+
+def claim_uploads(*, user, ids) -> list[StagedUpload]:
+    """
+    Забирает завершенные загрузки пользователя для прикрепления к волне
+    Вызывается в транзакции создания волны: сессии удаляются в ней же,
+    а при откате остаются, и файлы можно прикрепить повторно
+    """
+    ids = list(dict.fromkeys(ids))
+    uploads = {
+        str(upload.pk): upload
+        for upload in DocumentUpload.objects.select_for_update().filter(
+            pk__in=ids, user=user, is_complete=True
+        )
+    }
+    missing = [pk for pk in ids if str(pk) not in uploads]
+    if missing:
+        raise Exception("Загрузка документа не найдена или не завершена")
+
+    staged = [
+        StagedUpload(
+            name=upload.name,
+            blob=StagedBlob(
+                tmp_path=upload_staging_path(upload),
+                hash=upload.hash,
+                size=upload.size,
+                mime=upload.mime,
+            ),
+        )
+        for upload in (uploads[str(pk)] for pk in ids)
+    ]
+    DocumentUpload.objects.filter(pk__in=ids).delete()
+    return staged
@@ -1,6 +1,12 @@
 import logging
+
+from django.db import transaction
+
 from wave.models import Inbound, Outbound
 
+from .wave_files import parse_wave_form_file, validate_and_save_wave_files
+from .wave_items import create_items
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,3 +36,23 @@ def create_wave(*, wave_type, user, data):
         )
 
     raise ValueError("Unknown wave_type")
+
+
+def create_wave_from_form(*, wave_type, user, data, uploads):
+    """
+    Создание волны с позициями по форме INB-FORM / OUT-FORM в одной транзакции
+    uploads - подготовленные файлы (stage_wave_files), первый из них - файл формы,
+    остальные прикрепляются к волне как документы
+    """
+    with transaction.atomic():
+        wave = create_wave(wave_type=wave_type, user=user, data=data)
+        logger.debug("Created %s", wave)
+
+        form_document, *_ = validate_and_save_wave_files(wave=wave, uploads=uploads)
+        df = parse_wave_form_file(
+            file_path=uploads[0].blob.tmp_path,
+            wave_type=wave_type,
+            filename=form_document.name,
+        )
+        create_items(df=df, wave=wave, status=wave.status, wave_type=wave_type)
+    return wave
@@ -1,10 +1,18 @@
-import io
+import hashlib
 import logging
 import os
+import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 
 import pandas as pd
 from django.conf import settings
+from django.db import transaction
+
+from .documents import (StagedBlob, add_wave_document, blob_path, commit_blob,
+                        discard_blob, stage_blob)
 
 logger = logging.getLogger(__name__)
 
@@ -12,12 +20,16 @@ INBOUND_REQUIRED_COLS = {"Партномер", "Вес г", "Количеств
 OUTBOUND_REQUIRED_COLS = {"Партномер", "Количество"}
 
 
-def parse_wave_form_file(file_path: str, wave_type: str):
-    """Проверяет наличие необходимых колонок в форме"""
+def parse_wave_form_file(file_path: str, wave_type: str, filename: str | None = None):
+    """
+    Проверяет наличие необходимых колонок в форме
+    Формат определяется по filename (имя загруженного файла), либо по file_path
+    """
     logger.debug("parse_items_file(): %s", file_path)
-    if file_path.endswith((".xlsx", ".xls")):
+    filename = (filename or file_path).lower()
+    if filename.endswith((".xlsx", ".xls")):
         df = pd.read_excel(file_path, dtype=str)
-    elif file_path.endswith(".csv"):
+    elif filename.endswith(".csv"):
         df = pd.read_csv(file_path, dtype=str)
     else:
         raise Exception("Неподдерживаемый формат файла")
@@ -39,52 +51,331 @@ def parse_wave_form_file(file_path: str, wave_type: str):
     return df
 
 
-def build_zip_from_folder(folder_path: str) -> io.BytesIO | None:
+# уже сжатые форматы: в архив кладутся без повторного сжатия
+ZIP_STORED_EXTS = (
+    ".pdf",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".zip",
+    ".rar",
+    ".xlsx",
+    ".docx",
+)
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+def wave_folder_files(folder_path: str) -> list[str]:
     """
-    Собирает zip-архив из файлов папки в памяти.
-    Возвращает BytesIO с архивом.
+    Сформированные файлы папки волны (без незавершенных временных файлов
+    и листов подбора PICK_*.pdf, которые раньше сохранялись в папку волны)
     """
     if not os.path.exists(folder_path):
-        return None
+        return []
 
-    files = [
+    return sorted(
         f
         for f in os.listdir(folder_path)
         if os.path.isfile(os.path.join(folder_path, f))
+        and not f.endswith(".tmp")
+        and not f.startswith("PICK_")
+    )
+
+
+def wave_archive_entries(wave) -> list[tuple[str, str]]:
+    """
+    Файлы архива волны [(имя в архиве, путь)]
+    Загруженные документы берутся из индекса WaveDocument,
+    сформированные файлы (упаковочный лист) - из папки волны
+    """
+    entries = [
+        (name, blob_path(sha256))
+        for name, sha256 in wave.documents.values_list("name", "hash")
     ]
+    folder_path = wave.get_uploads_dir()
+    names = {name for name, _ in entries}
+    entries += [
+        (filename, os.path.join(folder_path, filename))
+        for filename in wave_folder_files(folder_path)
+        if filename not in names
+    ]
+    return entries
 
-    if not files:
-        return None
 
-    buffer = io.BytesIO()
+class _ZipStream:
+    """
+    Поток для zipfile без seek: записанные байты забираются через pop()
+    zipfile в этом режиме пишет размеры и crc после данных (data descriptor)
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for filename in files:
-            zip_file.write(os.path.join(folder_path, filename), arcname=filename)
 
-    buffer.seek(0)
-    return buffer
+def zip_compress_type(arcname: str) -> int:
+    """Уже сжатые форматы (ZIP_STORED_EXTS) кладутся в архив без сжатия"""
+    if os.path.splitext(arcname)[1].lower() in ZIP_STORED_EXTS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
 
 
-def save_file(folder: str, file) -> str | None:
-    """Функция сохранения файла"""
-    logger.debug("save_file(): %s/%s", folder, file)
-    filename = os.path.basename(file.name)
-    file_path = os.path.join(folder, filename)
-    with open(file_path, "wb+") as dest:
-        for chunk in file.chunks():
-            dest.write(chunk)
-    return file_path
+def _iter_zip(sources):
+    """
+    Генератор zip-архива из [(ZipInfo, функция открытия источника)]
+    Отдает байты архива по мере чтения, в памяти держится один блок
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w") as zip_file:
+        for zinfo, open_source in sources:
+            with open_source() as src, zip_file.open(zinfo, "w") as dest:
+                while chunk := src.read(ZIP_CHUNK_SIZE):
+                    dest.write(chunk)
+                    data = stream.pop()
+                    if data:
+                        yield data
+            yield stream.pop()
+    yield stream.pop()
+
+
+def iter_zip(entries: list[tuple[str, str]]):
+    """Генератор zip-архива из файлов [(имя в архиве, путь)]"""
+    sources = []
+    for arcname, path in entries:
+        zinfo = zipfile.ZipInfo.from_file(path, arcname=arcname)
+        zinfo.compress_type = zip_compress_type(arcname)
+        sources.append((zinfo, partial(open, path, "rb")))
+    return _iter_zip(sources)
+
+
+def iter_zip_members(archive_path: str, prefix: str):
+    """
+    Генератор zip-архива из файлов папки prefix другого архива
+    (документы архивной волны в архиве пакета архивации)
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        sources = []
+        for member in archive.infolist():
+            if member.is_dir() or not member.filename.startswith(prefix):
+                continue
+            arcname = member.filename[len(prefix):]
+            zinfo = zipfile.ZipInfo(arcname, date_time=member.date_time)
+            zinfo.compress_type = zip_compress_type(arcname)
+            sources.append((zinfo, partial(archive.open, member)))
+        yield from _iter_zip(sources)
+
+
+def entries_signature(entries: list[tuple[str, str]]) -> str:
+    """Подпись содержимого архива: имена, размеры и время изменения файлов"""
+    digest = hashlib.sha256()
+    for arcname, path in entries:
+        stat = os.stat(path)
+        digest.update(
+            f"{arcname}\x1f{os.path.basename(path)}\x1f{stat.st_size}"
+            f"\x1f{stat.st_mtime_ns}\x1e".encode()
+        )
+    return digest.hexdigest()[:16]
+
+
+def _archive_prefix(folder_path: str) -> str:
+    """Префикс архивов папки в кеше: inbounds/INB-2025-0001 -> inbounds-INB-2025-0001"""
+    relative = os.path.relpath(folder_path, settings.MEDIA_ROOT)
+    return relative.replace(os.sep, "-")
+
+
+def invalidate_archive(folder_path: str):
+    """Удаляет готовые архивы папки волны из кеша"""
+    prefix = f"{_archive_prefix(folder_path)}."
+    if not os.path.isdir(settings.ARCHIVE_CACHE_DIR):
+        return
+
+    for filename in os.listdir(settings.ARCHIVE_CACHE_DIR):
+        if filename.startswith(prefix) and filename.endswith(".zip"):
+            try:
+                os.remove(os.path.join(settings.ARCHIVE_CACHE_DIR, filename))
+            except FileNotFoundError:
+                pass
+
+
+def _cache_archive(chunks, *, tmp_path: str, archive_path: str):
+    """
+    Отдает байты архива и одновременно пишет их во временный файл кеша
+    Когда архив отдан целиком, файл подменяет archive_path атомарно;
+    при ошибке или обрыве отдачи (клиент закрыл соединение) временный файл удаляется
+    """
+    done = False
+    try:
+        with open(tmp_path, "wb") as dest:
+            for data in chunks:
+                dest.write(data)
+                yield data
+        os.replace(tmp_path, archive_path)
+        done = True
+    finally:
+        if not done:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
 
 
-def validate_and_save_wave_files(*, folder, files):
+def wave_archive(wave):
+    """
+    Zip-архив документов волны: (путь к готовому архиву, None) или (None, поток байт)
+    Архив хранится в ARCHIVE_CACHE_DIR под подписью содержимого:
+    пока документы не менялись, отдается готовый архив. Иначе устаревшие архивы
+    удаляются, а новый отдается потоком (первые байты - сразу) и по ходу отдачи
+    записывается в кеш
+    Возвращает (None, None), если документов нет
+    """
+    entries = wave_archive_entries(wave)
+
+    if not entries:
+        return None, None
+
+    folder_path = wave.get_uploads_dir()
+    prefix = _archive_prefix(folder_path)
+    archive_path = os.path.join(
+        settings.ARCHIVE_CACHE_DIR, f"{prefix}.{entries_signature(entries)}.zip"
+    )
+    if os.path.isfile(archive_path):
+        logger.debug("wave_archive(): cached %s", archive_path)
+        return archive_path, None
+
+    logger.debug("wave_archive(): stream and cache %s", archive_path)
+    invalidate_archive(folder_path)
+    os.makedirs(settings.ARCHIVE_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=settings.ARCHIVE_CACHE_DIR, prefix=f"{prefix}.", suffix=".tmp"
+    )
+    os.close(fd)
+    return None, _cache_archive(iter_zip(entries), tmp_path=tmp_path, archive_path=archive_path)
+
+
+def build_wave_archive(wave) -> str | None:
+    """
+    Путь к zip-архиву документов волны в кеше (см. wave_archive)
+    Холодный архив собирается целиком до возврата
+    Возвращает None, если документов нет
+    """
+    archive_path, stream = wave_archive(wave)
+    if stream is None:
+        return archive_path
+
+    for _ in stream:
+        pass
+    archive_path, _ = wave_archive(wave)
+    return archive_path
+
+
+@dataclass
+class StagedUpload:
+    """Загруженный файл, записанный во временный файл хранилища"""
+
+    name: str
+    blob: StagedBlob
+
+
+def validate_wave_file(file):
     """Функция проверки размера и расширения файла"""
+    if file.size > settings.MAX_FILE_SIZE:
+        raise Exception(f"Файл {file.name} слишком большой")
+
+    ext = os.path.splitext(file.name)[1].lower()
+    if ext not in settings.ALLOWED_EXTS_DOCS:
+        raise Exception(f"Недопустимое расширение: {file.name}")
+
+
+def validate_wave_file_mime(name: str, mime: str):
+    """Проверка соответствия содержимого файла (libmagic) его расширению"""
+    ext = os.path.splitext(name)[1].lower()
+    allowed = settings.ALLOWED_MIME_DOCS.get(ext, ())
+    if not mime.startswith(allowed):
+        raise Exception(f"Содержимое файла {name} не соответствует расширению ({mime})")
+
+
+def _stage_file(file) -> StagedUpload:
+    """Запись файла во временный файл хранилища с проверкой содержимого"""
+    blob = stage_blob(file.chunks(settings.UPLOAD_CHUNK_SIZE))
+    try:
+        validate_wave_file_mime(file.name, blob.mime)
+    except Exception:
+        discard_blob(blob)
+        raise
+    return StagedUpload(name=file.name, blob=blob)
+
+
+def stage_wave_files(files) -> list[StagedUpload]:
+    """
+    Проверяет загруженные файлы и записывает их во временные файлы хранилища
+    Файлы обрабатываются параллельно в пуле потоков: запись, sha256, MIME.
+    Вызывается до транзакции создания волны, чтобы не удлинять ее
+    При ошибке любого файла временные файлы удаляются
+    """
     for file in files:
-        if file.size > settings.MAX_FILE_SIZE:
-            raise Exception(f"Файл {file.name} слишком большой")
+        validate_wave_file(file)
+    if not files:
+        return []
+
+    workers = min(len(files), settings.UPLOAD_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="upload") as pool:
+        futures = [pool.submit(_stage_file, file) for file in files]
+
+    staged, errors = [], []
+    for future in futures:
+        try:
+            staged.append(future.result())
+        except Exception as e:
+            errors.append(e)
+    if errors:
+        discard_staged(staged)
+        raise errors[0]
+
+    logger.debug("stage_wave_files(): %s", [upload.name for upload in staged])
+    return staged
+
+
+def discard_staged(uploads: list[StagedUpload]):
+    """Удаляет временные файлы, не перенесенные в хранилище"""
+    for upload in uploads:
+        discard_blob(upload.blob)
+
+
+def validate_and_save_wave_files(*, wave, uploads: list[StagedUpload]) -> list:
+    """
+    Добавляет подготовленные файлы в документы волны
+    Записи WaveDocument создаются в текущей транзакции, перенос файлов
+    в хранилище - после ее фиксации (при откате файлы удаляются discard_staged)
+    Возвращает список WaveDocument в порядке uploads
+    """
+    documents = [
+        add_wave_document(wave=wave, name=upload.name, blob=upload.blob)
+        for upload in uploads
+    ]
+    if uploads:
+        blobs = [upload.blob for upload in uploads]
+        folder_path = wave.get_uploads_dir()
 
-        ext = os.path.splitext(file.name)[1].lower()
-        if ext not in settings.ALLOWED_EXTS_DOCS:
-            raise Exception(f"Недопустимое расширение: {file.name}")
+        def commit_files():
+            for blob in blobs:
+                commit_blob(blob)
+            invalidate_archive(folder_path)
 
-        save_file(folder, file)
+        transaction.on_commit(commit_files)
+    return documents
@@ -1,5 +1,5 @@
 import logging
-from django.db.models import Sum
+from django.db.models import F, Sum
 
 from wave.models import InboundItem, OutboundItem
 from warehouse.models import Item, Place, PlaceItem
@@ -82,11 +82,11 @@ def create_items_by_out_form(df, wave_status, outbound_place) -> list[tuple[Item
         except Item.DoesNotExist:
             raise Exception(f"Товар {item_code} не найден")
 
-        # общий остаток по складу кроме адреса OUTBOUND со статусом ok
+        # общий остаток по складу кроме адреса OUTBOUND со статусом ok, без резерва подбора
         available_qty = (
                 PlaceItem.objects.filter(item=item, status="ok")
                 .exclude(place=outbound_place)
-                .aggregate(total=Sum("quantity"))["total"]
+                .aggregate(total=Sum(F("quantity") - F("reserved")))["total"]
                 or 0
         )
 
@@ -111,7 +111,7 @@ def create_items_by_out_form(df, wave_status, outbound_place) -> list[tuple[Item
                 if to_move <= 0:
                     break
 
-                delta = min(pi.quantity, to_move)
+                delta = min(pi.quantity - pi.reserved, to_move)
                 pi.quantity -= delta
                 to_move -= delta
 
@@ -141,7 +141,7 @@ def create_items_by_out_form(df, wave_status, outbound_place) -> list[tuple[Item
                 if to_move <= 0:
                     break
 
-                delta = min(pi.quantity, to_move)
+                delta = min(pi.quantity - pi.reserved, to_move)
                 pi.quantity -= delta
                 to_move -= delta
 
@@ -0,0 +1,120 @@
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Фоновые задачи процесса: выполняются вне запроса и вне его транзакции
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PACKING_LIST_WORKERS, thread_name_prefix="wave-task"
+)
+_gc_lock = threading.Lock()
+_gc_pending = False
+
+
+def generate_packing_list_task(outbound_pk: int):
+    """
+    Формирование упаковочного листа в фоновом потоке
+    Неизменившийся лист не перерисовывается (см. get_packing_list)
+    Результат записывается в Outbound.packing_list_status / packing_list_error
+    """
+    from wave.models import Outbound
+    from wave.services import get_packing_list
+
+    logger.debug("generate_packing_list_task(out_pk:%s)", outbound_pk)
+    close_old_connections()
+    try:
+        outbound = Outbound.objects.get(pk=outbound_pk)
+        pdf_path = get_packing_list(outbound)
+        Outbound.objects.filter(pk=outbound_pk).update(
+            packing_list_status="ready", packing_list_error=""
+        )
+        logger.debug("Packing list created: %s", pdf_path)
+    except Exception as e:
+        logger.exception("Error generating packing list out_pk:%s: %s", outbound_pk, e)
+        Outbound.objects.filter(pk=outbound_pk).update(
+            packing_list_status="failed", packing_list_error=str(e)[:500]
+        )
+    finally:
+        connection.close()
+
+
+def schedule_packing_list(outbound):
+    """
+    Ставит формирование упаковочного листа в очередь после фиксации транзакции
+    Откат транзакции отменяет и задачу
+    Очередь живет в памяти процесса: задачи, потерянные при перезапуске,
+    переставляет команда requeue_packing_lists (по packing_list_requested_at)
+    """
+    logger.debug("schedule_packing_list(out_pk:%s)", outbound.pk)
+    outbound.packing_list_status = "pending"
+    outbound.packing_list_error = ""
+    outbound.packing_list_requested_at = timezone.now()
+    type(outbound).objects.filter(pk=outbound.pk).update(
+        packing_list_status="pending",
+        packing_list_error="",
+        packing_list_requested_at=outbound.packing_list_requested_at,
+    )
+    transaction.on_commit(
+        lambda: _executor.submit(generate_packing_list_task, outbound.pk)
+    )
+
+
+def collect_document_garbage_task():
+    """Удаление содержимого документов, на которое больше нет ссылок"""
+    from wave.services import collect_document_garbage
+
+    global _gc_pending
+    with _gc_lock:
+        _gc_pending = False
+    close_old_connections()
+    try:
+        stats = collect_document_garbage()
+        logger.debug("collect_document_garbage_task(): %s", stats)
+    except Exception as e:
+        logger.exception("Error collecting document garbage: %s", e)
+    finally:
+        connection.close()
+
+
+def _submit_document_gc():
+    """Сборка мусора ставится в очередь один раз, пока предыдущая не началась"""
+    global _gc_pending
+    with _gc_lock:
+        if _gc_pending:
+            return
+        _gc_pending = True
+    _executor.submit(collect_document_garbage_task)
+
+
+def schedule_document_gc():
+    """Ставит сборку мусора хранилища документов в очередь после фиксации транзакции"""
+    transaction.on_commit(_submit_document_gc)
+
+
+def cleanup_wave_files_task(wave_folder: str):
+    """Удаление сформированных файлов и готовых архивов удаленной волны"""
+    from wave.services import invalidate_archive
+
+    try:
+        invalidate_archive(wave_folder)
+        if os.path.isdir(wave_folder):
+            shutil.rmtree(wave_folder)
+            logger.debug("Folder %s successfully deleted", wave_folder)
+    except Exception as e:
+        logger.error(f"Error deleting folder {wave_folder}: {e}")
+
+
+def schedule_wave_cleanup(wave_folder: str):
+    """
+    Ставит удаление файлов волны в очередь после фиксации транзакции
+    Запрос (или команда архивации) не ждет rmtree, откат транзакции файлы не трогает
+    """
+    transaction.on_commit(lambda: _executor.submit(cleanup_wave_files_task, wave_folder))
+    schedule_document_gc()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import zipfile
+from datetime import date
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from warehouse.models import Stock
+from wave.models import ArchivedWave, Outbound
+from wave.services.wave.archive import pack_wave_documents
+from wave.services.wave.search import search_archived_waves
+
+
+class PackWaveDocumentsTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(tmp.name, "media"),
+            ARCHIVE_COLD_DIR=os.path.join(tmp.name, "cold"),
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.cold = os.path.join(tmp.name, "cold")
+
+        stock = Stock.objects.create(title="1")
+        self.outbounds = []
+        for n in range(3):
+            outbound = Outbound.objects.create(stock=stock, planned_date=date.today())
+            folder = outbound.get_uploads_dir()
+            os.makedirs(folder)
+            with open(os.path.join(folder, "PL.pdf"), "wb") as f:
+                f.write(b"%PDF" + bytes([n]))
+            self.outbounds.append(outbound)
+
+    def test_archive_per_batch(self):
+        first = pack_wave_documents(self.outbounds[:2], "outbound")
+        first_name = first[self.outbounds[0].pk][0]
+        self.assertEqual(first[self.outbounds[1].pk][0], first_name)
+        first_path = os.path.join(self.cold, first_name)
+        first_mtime = os.stat(first_path).st_mtime_ns
+
+        second = pack_wave_documents(self.outbounds[2:], "outbound")
+        second_name = second[self.outbounds[2].pk][0]
+
+        self.assertNotEqual(second_name, first_name)
+        self.assertEqual(os.path.dirname(second_name), os.path.dirname(first_name))
+        # архив предыдущего пакета не переписывается
+        self.assertEqual(os.stat(first_path).st_mtime_ns, first_mtime)
+        with zipfile.ZipFile(first_path) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                sorted(f"{outbound.outbound_number}/PL.pdf" for outbound in self.outbounds[:2]),
+            )
+        with zipfile.ZipFile(os.path.join(self.cold, second_name)) as archive:
+            self.assertEqual(archive.namelist(), [f"{self.outbounds[2].outbound_number}/PL.pdf"])
+
+    def test_repack_overwrites(self):
+        name = pack_wave_documents(self.outbounds[:1], "outbound")[self.outbounds[0].pk][0]
+        self.assertEqual(
+            pack_wave_documents(self.outbounds[:1], "outbound")[self.outbounds[0].pk][0], name
+        )
+        with zipfile.ZipFile(os.path.join(self.cold, name)) as archive:
+            self.assertEqual(len(archive.namelist()), 1)
+        folder = os.path.dirname(os.path.join(self.cold, name))
+        self.assertEqual(os.listdir(folder), [os.path.basename(name)])
+
+
+class SearchArchivedWavesTests(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(title="1")
+        now = timezone.now()
+        for n, (counterparty, status) in enumerate(
+            [("Alpha", "completed"), ("Beta", "completed"), ("Alpha", "cancelled")]
+        ):
+            ArchivedWave.objects.create(
+                original_id=n + 1,
+                wave_type="outbound",
+                number=f"OUT-{n + 1}",
+                counterparty=counterparty,
+                stock=self.stock,
+                status=status,
+                planned_date=date(2025, 1, n + 1),
+                created_at=now,
+                updated_at=now,
+            )
+
+    def test_filters(self):
+        data = {"recipient": " alpha ", "status": "completed"}
+        self.assertEqual(
+            list(search_archived_waves("outbound", data).values_list("number", flat=True)),
+            ["OUT-1"],
+        )
+        data = {"outbound_number": "OUT", "planned_date": date(2025, 1, 2)}
+        self.assertEqual(
+            list(search_archived_waves("outbound", data).values_list("number", flat=True)),
+            ["OUT-3", "OUT-2"],
+        )
+        self.assertFalse(search_archived_waves("inbound", {}).exists())
@@ -0,0 +1,154 @@
+import os
+import tempfile
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from wave.services.wave.hot_folder import (PollingWatcher,
+                                           claim_hot_folder_file,
+                                           hot_folder_files,
+                                           ingest_hot_folder_file,
+                                           parse_hot_folder_name,
+                                           prepare_hot_folder)
+
+
+class ParseHotFolderNameTests(SimpleTestCase):
+    def test_date_suffix(self):
+        self.assertEqual(
+            parse_hot_folder_name("INB-FORM_ООО Ромашка_2026-03-15.xlsx"),
+            ("inbound", "ООО Ромашка", date(2026, 3, 15)),
+        )
+
+    def test_without_date(self):
+        self.assertEqual(
+            parse_hot_folder_name("out-form_Магазин_12.csv"),
+            ("outbound", "Магазин 12", None),
+        )
+
+    def test_invalid_date_is_partner(self):
+        self.assertEqual(
+            parse_hot_folder_name("OUT-FORM_Склад_2026-13-01.csv"),
+            ("outbound", "Склад 2026-13-01", None),
+        )
+
+    def test_missing_partner(self):
+        with self.assertRaisesMessage(Exception, "не указан поставщик"):
+            parse_hot_folder_name("INB-FORM_2026-03-15.xlsx")
+        with self.assertRaisesMessage(Exception, "не указан заказчик"):
+            parse_hot_folder_name("OUT-FORM.csv")
+
+    def test_unknown_prefix(self):
+        with self.assertRaisesMessage(Exception, "INB-FORM или OUT-FORM"):
+            parse_hot_folder_name("FORM_Ромашка.xlsx")
+
+
+class HotFolderFilesTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        prepare_hot_folder(self.root)
+
+    def _write(self, *parts, content: bytes = b"data") -> str:
+        path = os.path.join(self.root, *parts)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _listdir(self, subdir: str) -> list[str]:
+        return sorted(os.listdir(os.path.join(self.root, subdir)))
+
+    def test_skip_hidden_and_temporary(self):
+        for name in ("INB-FORM_A.xlsx", ".hidden", "~$INB-FORM_A.xlsx", "x.tmp", "y.part"):
+            self._write(name)
+        self.assertEqual(hot_folder_files(self.root), ["INB-FORM_A.xlsx"])
+
+    def test_claim(self):
+        self._write("INB-FORM_A.xlsx")
+        self._write("processing", "INB-FORM_A.xlsx")
+
+        path = claim_hot_folder_file(self.root, "INB-FORM_A.xlsx")
+
+        self.assertEqual(path, os.path.join(self.root, "processing", "INB-FORM_A-1.xlsx"))
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(hot_folder_files(self.root), [])
+        # файл уже забран другим обработчиком
+        self.assertIsNone(claim_hot_folder_file(self.root, "INB-FORM_A.xlsx"))
+
+    def test_failed_with_report(self):
+        """Файл с ошибкой переносится в failed, рядом - отчет .error.txt"""
+        self._write("FORM_A.xlsx")
+        path = claim_hot_folder_file(self.root, "FORM_A.xlsx")
+
+        target = ingest_hot_folder_file(
+            root=self.root, path=path, user=None, stock=None, status="planned"
+        )
+
+        self.assertEqual(target, os.path.join(self.root, "failed", "FORM_A.xlsx"))
+        self.assertEqual(self._listdir("failed"), ["FORM_A.xlsx", "FORM_A.xlsx.error.txt"])
+        self.assertEqual(self._listdir("processing"), [])
+        with open(f"{target}.error.txt", encoding="utf-8") as report:
+            self.assertIn("INB-FORM или OUT-FORM", report.read())
+
+    def test_failed_name_collision(self):
+        for _ in range(2):
+            self._write("FORM_A.xlsx")
+            path = claim_hot_folder_file(self.root, "FORM_A.xlsx")
+            ingest_hot_folder_file(
+                root=self.root, path=path, user=None, stock=None, status="planned"
+            )
+        self.assertEqual(
+            self._listdir("failed"),
+            ["FORM_A-1.xlsx", "FORM_A-1.xlsx.error.txt", "FORM_A.xlsx", "FORM_A.xlsx.error.txt"],
+        )
+
+    def test_crash_recovery(self):
+        """Файлы, оставшиеся в processing, переносятся в failed, а не обрабатываются снова"""
+        self._write("processing", "INB-FORM_A.xlsx")
+        self._write("processing", "OUT-FORM_B.csv")
+
+        prepare_hot_folder(self.root)
+
+        self.assertEqual(self._listdir("processing"), [])
+        self.assertEqual(
+            self._listdir("failed"),
+            [
+                "INB-FORM_A.xlsx",
+                "INB-FORM_A.xlsx.error.txt",
+                "OUT-FORM_B.csv",
+                "OUT-FORM_B.csv.error.txt",
+            ],
+        )
+        self.assertEqual(self._listdir("done"), [])
+        self.assertEqual(hot_folder_files(self.root), [])
+
+
+class PollingWatcherTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.watcher = PollingWatcher(self.root, interval=0)
+
+    def _write(self, name: str, content: bytes, mode: str = "wb"):
+        with open(os.path.join(self.root, name), mode) as f:
+            f.write(content)
+
+    def test_settle(self):
+        """Файл готов, когда размер и время изменения не поменялись между опросами"""
+        self._write("INB-FORM_A.xlsx", b"part")
+        self.assertEqual(self.watcher.wait(0), [])
+
+        # копирование продолжается
+        self._write("INB-FORM_A.xlsx", b"-more", mode="ab")
+        self.assertEqual(self.watcher.wait(0), [])
+
+        self.assertEqual(self.watcher.wait(0), ["INB-FORM_A.xlsx"])
+        # готовый файл отдается один раз
+        self.assertEqual(self.watcher.wait(0), [])
+
+    def test_skip_temporary(self):
+        self._write("~$INB-FORM_A.xlsx", b"lock")
+        self._write("OUT-FORM_B.csv.part", b"data")
+        self.watcher.wait(0)
+        self.assertEqual(self.watcher.wait(0), [])
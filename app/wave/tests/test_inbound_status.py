@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.test import TestCase
+
+from warehouse.models import Item, Place, PlaceItem, Stock, Zone
+from wave.models import Inbound, InboundItem, InboundStatusService
+
+
+class InboundStatusTests(TestCase):
+    def setUp(self):
+        self.stock = Stock.objects.create(title="1")
+        zone = Zone.objects.create(title="RED", stock=self.stock)
+        self.inbound_place = Place.objects.create(title="INBOUND", zone=zone)
+        self.new_place = Place.objects.create(title="NEW", zone=zone)
+        self.item_a = Item.objects.create(item_code="A")
+        self.item_b = Item.objects.create(item_code="B")
+
+    def _inbound(self, lines) -> Inbound:
+        inbound = Inbound.objects.create(stock=self.stock, planned_date=date.today())
+        for item, quantity in lines:
+            InboundItem.objects.create(inbound=inbound, item=item, total_quantity=quantity)
+        return inbound
+
+    def _stock(self, place) -> dict:
+        return dict(
+            PlaceItem.objects.filter(place=place).values_list("item__item_code", "quantity")
+        )
+
+    def test_shared_technical_places(self):
+        """Поставки с общими товарами делят INBOUND / NEW без конфликтов ключей"""
+        first = self._inbound([(self.item_a, 2), (self.item_a, 3), (self.item_b, 1)])
+        second = self._inbound([(self.item_a, 4)])
+
+        results = InboundStatusService.change_status_bulk(
+            pks=[first.pk, second.pk], new_status="in_progress"
+        )
+
+        self.assertTrue(all(result["ok"] for result in results))
+        self.assertEqual(self._stock(self.inbound_place), {"A": 9, "B": 1})
+        self.assertEqual(
+            set(PlaceItem.objects.filter(place=self.inbound_place).values_list("status", flat=True)),
+            {"inbound"},
+        )
+
+        first.refresh_from_db()
+        InboundStatusService.change_status(inbound=first, new_status="completed")
+        self.assertEqual(self._stock(self.inbound_place), {"A": 4})
+        self.assertEqual(self._stock(self.new_place), {"A": 5, "B": 1})
+
+        second.refresh_from_db()
+        InboundStatusService.change_status(inbound=second, new_status="cancelled")
+        self.assertEqual(self._stock(self.inbound_place), {})
+        self.assertEqual(self._stock(self.new_place), {"A": 5, "B": 1})
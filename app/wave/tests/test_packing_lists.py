@@ -0,0 +1,55 @@
+import glob
+import os
+import tempfile
+from datetime import date
+
+from django.test import TransactionTestCase, override_settings
+
+from warehouse.models import Item, Stock
+from wave.models import Outbound, OutboundItem
+from wave.services.wave.packing_lists import (collect_packing_list_jobs,
+                                              regenerate_packing_lists)
+
+
+class RegeneratePackingListsTests(TransactionTestCase):
+    """Пул процессов закрывает соединения родителя, поэтому тесты без общей транзакции"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name, PACKING_LIST_CHUNK_SIZE=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media = tmp.name
+
+        stock = Stock.objects.create(title="1")
+        items = [
+            Item.objects.create(item_code=f"P{n}", weight=10, description="описание\nстрока")
+            for n in range(4)
+        ]
+        self.outbounds = []
+        for n in range(5):
+            outbound = Outbound.objects.create(
+                stock=stock, planned_date=date.today(), recipient=f"заказчик {n}"
+            )
+            for item in items[: n + 1 if n < 4 else 1]:
+                OutboundItem.objects.create(outbound=outbound, item=item, total_quantity=n + 1)
+            self.outbounds.append(outbound)
+
+    def test_jobs_lines_in_bulk(self):
+        with self.assertNumQueries(1):
+            jobs = collect_packing_list_jobs(self.outbounds[:3])
+        self.assertEqual([len(job["lines"]) for job in jobs], [1, 2, 3])
+        self.assertEqual(jobs[1]["lines"][0], ("P0", 2, 10, "описание\nстрока"))
+
+    def test_regenerate(self):
+        stats = regenerate_packing_lists(Outbound.objects.order_by("pk"), workers=2)
+
+        self.assertEqual((stats["documents"], stats["lines"], stats["failed"]), (5, 11, 0))
+        for outbound in Outbound.objects.all():
+            self.assertEqual(outbound.packing_list_status, "ready")
+        self.assertEqual(len(glob.glob(os.path.join(self.media, "**", "*.pdf"), recursive=True)), 5)
+        self.assertEqual(glob.glob(os.path.join(self.media, "**", "*.tmp"), recursive=True), [])
+
+        stats = regenerate_packing_lists(Outbound.objects.order_by("pk"), workers=2)
+        self.assertEqual((stats["documents"], stats["skipped"]), (0, 5))
@@ -0,0 +1,57 @@
+import os
+import re
+import tempfile
+
+from django.test import SimpleTestCase
+
+from wave.pdf_generator.packing_list import render_packing_list_pdf
+from wave.pdf_generator.tables import StreamingProductsTable, products_table
+
+
+class StreamingProductsTableTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def _render(self, lines) -> str:
+        return render_packing_list_pdf(
+            filename=os.path.join(self.dir.name, "PACK_TEST.pdf"),
+            recipient="ооо тест",
+            company_name="ООО «Компания»",
+            lines=iter(lines),
+        )
+
+    def test_multiline_description(self):
+        """Строки с переносами в описании верстаются без LayoutError"""
+        lines = [
+            (f"P{i}", 1, 10, "строка 1\nстрока 2\nстрока 3" if i % 7 == 0 else "описание")
+            for i in range(300)
+        ]
+        with open(self._render(lines), "rb") as f:
+            pages = re.findall(rb"/Type /Page\b", f.read())
+        self.assertGreater(len(pages), 1)
+
+    def test_rows_split_like_table(self):
+        """Разбивка на страницы не теряет и не дублирует строки"""
+        rows = [[f"P{i}", "шт", "1", "10", "a\nb" if i % 3 == 0 else "c"] for i in range(100)]
+        table = StreamingProductsTable(["h"] * 5, rows)
+        seen, parts = [], [table]
+        while parts:
+            part = parts.pop(0)
+            width, height = part.wrap(500, 400)
+            if height <= 400:
+                seen.extend(part.table._cellvalues[1:] if part.table else [])
+                continue
+            head, rest = part.split(500, 400)
+            self.assertLessEqual(head.wrap(500, 400)[1], 400)
+            seen.extend(head._cellvalues[1:])
+            parts.append(rest)
+        self.assertEqual(seen, rows)
+
+    def test_row_height_by_lines(self):
+        table = StreamingProductsTable(["h"] * 5, [])
+        table._measure(500)
+        one = products_table([["h"] * 5, ["a"] * 5]).wrap(500, 0)[1] - table.header_height
+        three = products_table([["h"] * 5, ["a\nb\nc"] + ["a"] * 4]).wrap(500, 0)[1]
+        self.assertEqual(table._row_height(["a"] * 5), one)
+        self.assertEqual(table._row_height(["a\nb\nc"] + ["a"] * 4), three - table.header_height)
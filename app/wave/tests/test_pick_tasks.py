@@ -0,0 +1,129 @@
+import threading
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from warehouse.models import Item, Place, PlaceItem, Stock, Zone
+from wave.models import (Outbound, OutboundItem, OutboundPick,
+                         OutboundStatusService)
+from wave.services.wave.pick_tasks import claim_pick_batch, confirm_pick_task
+
+
+class PickFixtureMixin:
+    """Отгрузка из двух товаров на двух местах: две задачи подбора в двух пакетах"""
+
+    def setUp(self):
+        self.stock = Stock.objects.create(title="1")
+        red = Zone.objects.create(title="RED", stock=self.stock)
+        self.new_place = Place.objects.create(title="NEW", zone=red)
+        self.outbound_place = Place.objects.create(title="OUTBOUND", zone=red)
+        zone = Zone.objects.create(title="A", stock=self.stock)
+        self.places = [
+            Place.objects.create(title=f"0{n}", zone=zone, walk_sequence=n) for n in (1, 2)
+        ]
+        self.items = [Item.objects.create(item_code=f"I{n}") for n in (1, 2)]
+        for place, item in zip(self.places, self.items):
+            PlaceItem.objects.create(place=place, item=item, quantity=10, status="ok")
+        self.user = User.objects.create_user("picker")
+
+    def _outbound(self, quantities) -> Outbound:
+        outbound = Outbound.objects.create(stock=self.stock, planned_date=date.today())
+        for item, quantity in zip(self.items, quantities):
+            if quantity:
+                OutboundItem.objects.create(outbound=outbound, item=item, total_quantity=quantity)
+        OutboundStatusService.change_status(outbound=outbound, new_status="in_progress")
+        outbound.refresh_from_db()
+        return outbound
+
+    def _stock(self, place) -> dict:
+        return {
+            code: (quantity, reserved)
+            for code, quantity, reserved in PlaceItem.objects.filter(place=place).values_list(
+                "item__item_code", "quantity", "reserved"
+            )
+        }
+
+
+@override_settings(PICK_BATCH_SIZE=1)
+class ClaimPickBatchConcurrencyTests(PickFixtureMixin, TransactionTestCase):
+    """Блокировки видны только между соединениями, поэтому без общей транзакции"""
+
+    def test_parallel_claims_skip_locked(self):
+        outbound = self._outbound([3, 4])
+        other = User.objects.create_user("picker2")
+        claimed, done = threading.Event(), threading.Event()
+        first = {}
+
+        def hold_claim():
+            try:
+                with transaction.atomic():
+                    first["batch"] = claim_pick_batch(user=self.user)
+                    claimed.set()
+                    done.wait(10)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_claim)
+        thread.start()
+        try:
+            self.assertTrue(claimed.wait(10))
+            # пакет первого сборщика заблокирован до фиксации: второй получает другой без ожидания
+            second = claim_pick_batch(user=other)
+            third = claim_pick_batch(user=other)
+        finally:
+            done.set()
+            thread.join()
+
+        self.assertEqual(first["batch"].outbound_id, outbound.pk)
+        self.assertNotEqual(second.pk, first["batch"].pk)
+        self.assertIsNone(third)
+
+
+@override_settings(PICK_BATCH_SIZE=1)
+class PickTaskTests(PickFixtureMixin, TestCase):
+    def test_confirm_task_moves_only_its_quantity(self):
+        self._outbound([3, 4])
+        batch = claim_pick_batch(user=self.user)
+        task = batch.picks.get()
+
+        confirm_pick_task(task_id=task.pk, user=self.user)
+
+        self.assertEqual(self._stock(self.places[0]), {"I1": (7, 0)})
+        self.assertEqual(self._stock(self.places[1]), {"I2": (10, 4)})
+        self.assertEqual(self._stock(self.outbound_place), {"I1": (3, 0)})
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, "done")
+
+    def test_cancel_with_open_picks(self):
+        outbound = self._outbound([3, 4])
+        task = claim_pick_batch(user=self.user).picks.get()
+        confirm_pick_task(task_id=task.pk, user=self.user)
+
+        OutboundStatusService.change_status(outbound=outbound, new_status="cancelled")
+
+        self.assertEqual(self._stock(self.places[0]), {"I1": (7, 0)})
+        self.assertEqual(self._stock(self.places[1]), {"I2": (10, 0)})
+        self.assertEqual(self._stock(self.outbound_place), {})
+        self.assertEqual(self._stock(self.new_place), {"I1": (3, 0)})
+        self.assertFalse(OutboundPick.objects.filter(outbound=outbound).exists())
+
+    def test_bulk_complete_reports_deleted_place(self):
+        broken = self._outbound([3, 0])
+        ok = self._outbound([0, 4])
+        self.places[0].delete()
+
+        results = OutboundStatusService.change_status_bulk(
+            pks=[broken.pk, ok.pk], new_status="completed"
+        )
+
+        by_pk = {result["pk"]: result for result in results}
+        self.assertFalse(by_pk[broken.pk]["ok"])
+        self.assertIn("удалено", by_pk[broken.pk]["error"])
+        self.assertTrue(by_pk[ok.pk]["ok"])
+        broken.refresh_from_db()
+        ok.refresh_from_db()
+        self.assertEqual((broken.status, ok.status), ("in_progress", "completed"))
+        self.assertEqual(self._stock(self.places[1]), {"I2": (6, 0)})
+        self.assertEqual(self._stock(self.outbound_place), {})
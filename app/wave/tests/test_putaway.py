@@ -0,0 +1,88 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from warehouse.models import Item, Place, PlaceItem, Stock, Zone
+from wave.models import Inbound, InboundItem
+from wave.services.wave.putaway import inbound_putaway_plan, putaway_inbound
+
+
+class InboundPutawayTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="putaway")
+        self.stock = Stock.objects.create(title="1")
+        self.zone = Zone.objects.create(title="RED", stock=self.stock)
+        self.new_place = Place.objects.create(title="NEW", zone=self.zone)
+        self.place = Place.objects.create(title="01", zone=self.zone, capacity=2)
+        self.item_a = Item.objects.create(item_code="A")
+        self.item_b = Item.objects.create(item_code="B")
+
+        # две завершенные поставки, товар обеих лежит на общем NEW
+        self.first = self._inbound([(self.item_a, 2), (self.item_a, 1), (self.item_b, 2)])
+        self.second = self._inbound([(self.item_a, 6)])
+        PlaceItem.objects.create(place=self.new_place, item=self.item_a, quantity=9)
+        PlaceItem.objects.create(place=self.new_place, item=self.item_b, quantity=2)
+
+    def _inbound(self, lines) -> Inbound:
+        inbound = Inbound.objects.create(
+            stock=self.stock, status="completed", planned_date=date.today()
+        )
+        for item, quantity in lines:
+            InboundItem.objects.create(inbound=inbound, item=item, total_quantity=quantity)
+        return inbound
+
+    def _on_new(self) -> dict:
+        return dict(
+            PlaceItem.objects.filter(place=self.new_place).values_list(
+                "item__item_code", "quantity"
+            )
+        )
+
+    def _putaway(self, inbound) -> list:
+        return list(
+            inbound.inbound_items.order_by("pk").values_list(
+                "item__item_code", "total_quantity", "putaway_quantity"
+            )
+        )
+
+    def test_repeated_putaway_takes_only_remainder(self):
+        """Повторное размещение берет остаток поставки, а не товар других поставок"""
+        result = putaway_inbound(inbound=self.first, user=self.user)
+
+        # на 01 помещается 2 шт, размещенное распределяется по позициям по порядку
+        self.assertEqual(
+            [(line["item_code"], line["quantity"]) for line in result["lines"]], [("A", 2)]
+        )
+        self.assertEqual(
+            [(line["item_code"], line["quantity"]) for line in result["unplaced"]],
+            [("A", 1), ("B", 2)],
+        )
+        self.assertEqual(self._putaway(self.first), [("A", 2, 2), ("A", 1, 0), ("B", 2, 0)])
+
+        Place.objects.create(title="02", zone=self.zone)
+        result = putaway_inbound(inbound=self.first, user=self.user)
+
+        self.assertEqual(
+            sorted((line["item_code"], line["quantity"]) for line in result["lines"]),
+            [("A", 1), ("B", 2)],
+        )
+        self.assertEqual(result["unplaced"], [])
+        self.assertEqual(self._putaway(self.first), [("A", 2, 2), ("A", 1, 1), ("B", 2, 2)])
+        # на NEW остался только товар второй поставки
+        self.assertEqual(self._on_new(), {"A": 6})
+
+    def test_second_full_putaway_rejected(self):
+        self.place.capacity = None
+        self.place.save()
+        putaway_inbound(inbound=self.first, user=self.user)
+
+        with self.assertRaisesMessage(Exception, "уже размещена"):
+            putaway_inbound(inbound=self.first, user=self.user)
+        with self.assertRaisesMessage(Exception, "уже размещена"):
+            inbound_putaway_plan(self.first)
+        self.assertEqual(self._on_new(), {"A": 6})
+
+        putaway_inbound(inbound=self.second, user=self.user)
+        self.assertEqual(self._on_new(), {})
+        self.assertEqual(self._putaway(self.second), [("A", 6, 6)])
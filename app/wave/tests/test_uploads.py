@@ -0,0 +1,94 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+
+from wave.models import DocumentUpload
+from wave.services.wave.uploads import (UploadOffsetError,
+                                        append_upload_chunk, start_upload,
+                                        upload_staging_path)
+
+CONTENT = b"%PDF-1.4\n" + b"x" * 5000 + b"\n%%EOF\n"
+
+
+class _Stream(io.BytesIO):
+    """Тело запроса: запоминает, была ли открыта транзакция во время чтения"""
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.read_in_transaction = False
+
+    def read(self, size=-1):
+        self.read_in_transaction |= connection.in_atomic_block
+        return super().read(size)
+
+
+class AppendUploadChunkTests(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(DOCUMENT_STORE_DIR=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.staging = os.path.join(tmp.name, "staging")
+
+        self.user = User.objects.create(username="uploader")
+        self.upload = start_upload(
+            user=self.user,
+            name="doc.pdf",
+            size=len(CONTENT),
+            expected_hash=hashlib.sha256(CONTENT).hexdigest(),
+        )
+
+    def _append(self, offset: int, data: bytes, checksum: str = "", length=None):
+        stream = _Stream(data)
+        upload = append_upload_chunk(
+            upload_id=self.upload.pk,
+            user=self.user,
+            offset=offset,
+            stream=stream,
+            length=len(data) if length is None else length,
+            checksum=checksum,
+        )
+        self.assertFalse(stream.read_in_transaction)
+        return upload
+
+    def test_chunks_complete(self):
+        """Части читаются от клиента вне транзакции, файл собирается по смещениям"""
+        self.assertEqual(self._append(0, CONTENT[:3000]).offset, 3000)
+        upload = self._append(
+            3000, CONTENT[3000:], checksum=hashlib.sha256(CONTENT[3000:]).hexdigest()
+        )
+
+        self.assertTrue(upload.is_complete)
+        self.assertEqual(upload.mime, "application/pdf")
+        with open(upload_staging_path(upload), "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertEqual(
+            [name for name in os.listdir(self.staging) if name.endswith(".tmp")], []
+        )
+
+    def test_wrong_offset(self):
+        self._append(0, CONTENT[:1000])
+        with self.assertRaises(UploadOffsetError) as ctx:
+            self._append(500, CONTENT[500:1500])
+        self.assertEqual(ctx.exception.upload.offset, 1000)
+
+    def test_broken_chunk_not_written(self):
+        """Оборванная или поврежденная часть не записывается, смещение не сдвигается"""
+        self._append(0, CONTENT[:1000])
+        with self.assertRaisesMessage(Exception, "повреждена"):
+            self._append(1000, CONTENT[1000:2000], checksum="0" * 64)
+        with self.assertRaisesMessage(Exception, "повреждена"):
+            self._append(1000, CONTENT[1000:1500], length=1000)
+
+        self.assertEqual(DocumentUpload.objects.get().offset, 1000)
+        self.assertEqual(os.path.getsize(upload_staging_path(self.upload)), 1000)
+        self.assertEqual(
+            [name for name in os.listdir(self.staging) if name.endswith(".tmp")], []
+        )
+        self.assertEqual(self._append(1000, CONTENT[1000:]).is_complete, True)
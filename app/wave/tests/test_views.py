@@ -0,0 +1,91 @@
+import os
+import tempfile
+from datetime import date
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from warehouse.models import Item, Stock
+from wave.models import Outbound, OutboundPick
+from wave.services.wave.wave_files import wave_folder_files
+
+
+class DownloadPermissionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="viewer", password="secret")
+        self.client.force_login(self.user)
+
+    def _grant(self, codename: str):
+        self.user.user_permissions.add(
+            Permission.objects.get(content_type__app_label="wave", codename=codename)
+        )
+
+    def test_wave_docs_require_view_permission(self):
+        url = reverse("wave:download_outbound_docs", args=[999])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self._grant("view_outbound")
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.assertEqual(
+            self.client.get(reverse("wave:download_inbound_docs", args=[999])).status_code,
+            403,
+        )
+
+    def test_outbound_lists_require_view_permission(self):
+        urls = [
+            reverse("wave:download_packing_list", args=[999]),
+            reverse("wave:download_pick_list", args=[999]),
+        ]
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 403)
+
+        self._grant("view_outbound")
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(reverse("wave:download_packing_list", args=[999]))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("login", response["Location"])
+
+
+class PickListDownloadTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = User.objects.create_user(username="picker")
+        user.user_permissions.add(
+            Permission.objects.get(content_type__app_label="wave", codename="view_outbound")
+        )
+        self.client.force_login(user)
+        self.outbound = Outbound.objects.create(
+            stock=Stock.objects.create(title="1"), planned_date=date.today()
+        )
+        OutboundPick.objects.create(
+            outbound=self.outbound,
+            item=Item.objects.create(item_code="I1"),
+            item_code="I1",
+            full_address="1/A/01",
+            quantity=2,
+        )
+
+    def test_rendered_in_memory(self):
+        response = self.client.get(reverse("wave:download_pick_list", args=[self.outbound.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b"%PDF"))
+        self.assertIn(f"PICK_{self.outbound.outbound_number}.pdf", response["Content-Disposition"])
+        self.assertFalse(os.path.exists(self.outbound.get_uploads_dir()))
+
+    def test_legacy_pick_list_not_in_wave_files(self):
+        folder = self.outbound.get_uploads_dir()
+        os.makedirs(folder)
+        for name in ("PICK_1.pdf", "PL_1.pdf"):
+            open(os.path.join(folder, name), "wb").close()
+        self.assertEqual(wave_folder_files(folder), ["PL_1.pdf"])
@@ -43,22 +43,56 @@ urlpatterns = [
         {"wave_type": "outbound"},
         name="download_outbound_docs",
     ),
+    path(
+        "archive/<int:pk>/docs/",
+        download_archived_wave_docs,
+        name="download_archived_wave_docs",
+    ),
+    path(
+        "outbound/<int:pk>/packing_list/",
+        download_packing_list,
+        name="download_packing_list",
+    ),
+    path(
+        "outbound/<int:pk>/pick_list/",
+        download_pick_list,
+        name="download_pick_list",
+    ),
     path(
         "outbound/form/",
         download_wave_form,
         {"wave_type": "outbound"},
         name="download_outbound_form",
     ),
+    path("uploads/", document_upload_start, name="document_upload_start"),
+    path(
+        "uploads/<uuid:pk>/", document_upload_detail, name="document_upload_detail"
+    ),
+    path(
+        "uploads/<uuid:pk>/chunk/", document_upload_chunk, name="document_upload_chunk"
+    ),
     path(
         "inbound/<int:pk>/change_status/",
         inbound_change_status,
         name="inbound_change_status",
     ),
     path("inbound/<int:pk>/items/", inbound_items, name="inbound_items"),
+    path(
+        "inbound/bulk_change_status/",
+        wave_bulk_change_status,
+        {"wave_type": "inbound"},
+        name="inbound_bulk_change_status",
+    ),
     path(
         "outbound/<int:pk>/change_status/",
         outbound_change_status,
         name="outbound_change_status",
     ),
     path("outbound/<int:pk>/items/", outbound_items, name="outbound_items"),
+    path(
+        "outbound/bulk_change_status/",
+        wave_bulk_change_status,
+        {"wave_type": "outbound"},
+        name="outbound_bulk_change_status",
+    ),
 ]
@@ -3,22 +3,31 @@ import os
 
 from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.decorators import (login_required,
+                                            permission_required,
+                                            user_passes_test)
 from django.contrib.auth.mixins import (LoginRequiredMixin,
                                         PermissionRequiredMixin)
+from django.core.exceptions import PermissionDenied
 from django.db import transaction
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.views.decorators.http import require_http_methods, require_POST
 from django.views.generic import FormView, ListView
 from warehouse.models import Item, Place, PlaceItem
 
 from .forms import (InboundCreateForm, InboundSearchForm, OutboundCreateForm,
                     OutboundSearchForm)
-from .models import Inbound, InboundStatusService, Outbound, OutboundStatusService
-from .services import (build_zip_from_folder, create_items, create_wave,
-                       parse_wave_form_file, save_file,
-                       validate_and_save_wave_files)
+from .models import (ArchivedWave, DocumentUpload, Inbound,
+                     InboundStatusService, Outbound, OutboundStatusService,
+                     Wave)
+from .services import (UploadOffsetError, append_upload_chunk,
+                       archived_documents_path, claim_uploads,
+                       create_wave_from_form, discard_staged, filter_waves,
+                       get_packing_list, get_pick_list, iter_zip_members,
+                       pick_list_filename, search_archived_waves, send_file,
+                       stage_wave_files, start_upload, wave_archive)
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +55,7 @@ class InboundSearchView(LoginRequiredMixin, ListView):
         supplier       - частичное совпадение поставщика
         planned_date   - фильтрация по >= плановой дате поставки
         actual_date    - фильтрация по <= фактической дате поставки
+        include_archived - дополнительно вывести архивные поставки
 
     Возвращает:
         QuerySet - отфильтрованный набор Inbound или пустой набор
@@ -68,29 +78,19 @@ class InboundSearchView(LoginRequiredMixin, ListView):
         if not form.is_valid():
             return qs.none()
 
-        data = form.cleaned_data
-
-        if data["stock"]:
-            qs = qs.filter(stock=data["stock"])
-
-        if data["inbound_number"]:
-            qs = qs.filter(inbound_number__icontains=data["inbound_number"].strip())
-
-        if data["supplier"]:
-            qs = qs.filter(supplier__icontains=data["supplier"].strip())
-
-        if data["status"]:
-            qs = qs.filter(status=data["status"])
-
-        if data["planned_date"]:
-            qs = qs.filter(planned_date__gte=data["planned_date"])
-
-        if data["actual_date"]:
-            qs = qs.filter(actual_date__lte=data["actual_date"])
-
+        qs = filter_waves(qs, "inbound", form.cleaned_data)
         qs = qs.order_by("-inbound_number")
         return qs
 
+    def get_archived_waves(self):
+        """Архивные поставки по тем же фильтрам (параметр include_archived)"""
+        form = InboundSearchForm(self.request.GET)
+        if not self.request.GET or not form.is_valid():
+            return None
+        if not form.cleaned_data["include_archived"]:
+            return None
+        return search_archived_waves("inbound", form.cleaned_data)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
@@ -99,6 +99,12 @@ class InboundSearchView(LoginRequiredMixin, ListView):
         context["user_is_operator"] = user.groups.filter(name="operator").exists()
         context["form"] = InboundSearchForm(self.request.GET or None)
         context["total"] = self.get_queryset().count()
+        archived_waves = self.get_archived_waves()
+        if archived_waves is not None:
+            # архивные волны выводятся без пагинации: первые paginate_by и общее кол-во
+            context["archived_total"] = archived_waves.count()
+            archived_waves = archived_waves[:self.paginate_by]
+        context["archived_waves"] = archived_waves
 
         return context
 
@@ -121,6 +127,7 @@ class OutboundSearchView(LoginRequiredMixin, ListView):
         recipient       - частичное совпадение заказчика
         planned_date   - фильтрация по >= плановой дате отгрузки
         actual_date    - фильтрация по <= фактической дате отгрузки
+        include_archived - дополнительно вывести архивные отгрузки
 
     Возвращает:
         QuerySet - отфильтрованный набор Outbound или пустой набор
@@ -143,29 +150,19 @@ class OutboundSearchView(LoginRequiredMixin, ListView):
         if not form.is_valid():
             return qs.none()
 
-        data = form.cleaned_data
-
-        if data["stock"]:
-            qs = qs.filter(stock=data["stock"])
-
-        if data["outbound_number"]:
-            qs = qs.filter(outbound_number__icontains=data["outbound_number"].strip())
-
-        if data["recipient"]:
-            qs = qs.filter(supplier__icontains=data["recipient"].strip())
-
-        if data["status"]:
-            qs = qs.filter(status=data["status"])
-
-        if data["planned_date"]:
-            qs = qs.filter(planned_date__gte=data["planned_date"])
-
-        if data["actual_date"]:
-            qs = qs.filter(actual_date__lte=data["actual_date"])
-
+        qs = filter_waves(qs, "outbound", form.cleaned_data)
         qs = qs.order_by("-outbound_number")
         return qs
 
+    def get_archived_waves(self):
+        """Архивные отгрузки по тем же фильтрам (параметр include_archived)"""
+        form = OutboundSearchForm(self.request.GET)
+        if not self.request.GET or not form.is_valid():
+            return None
+        if not form.cleaned_data["include_archived"]:
+            return None
+        return search_archived_waves("outbound", form.cleaned_data)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
@@ -174,6 +171,12 @@ class OutboundSearchView(LoginRequiredMixin, ListView):
         context["user_is_operator"] = user.groups.filter(name="operator").exists()
         context["form"] = OutboundSearchForm(self.request.GET or None)
         context["total"] = self.get_queryset().count()
+        archived_waves = self.get_archived_waves()
+        if archived_waves is not None:
+            # архивные волны выводятся без пагинации: первые paginate_by и общее кол-во
+            context["archived_total"] = archived_waves.count()
+            archived_waves = archived_waves[:self.paginate_by]
+        context["archived_waves"] = archived_waves
 
         return context
 
@@ -185,7 +188,9 @@ def download_wave_docs(request, pk, wave_type) -> HttpResponse:
     Получает id поставки из url
     Определяет тип волны и получает объект
     Находит волну или отдает ошибку
-    Формирует архив в памяти и отдает его
+    Отдает готовый архив из кеша, при изменении документов новый архив
+    отдается потоком и одновременно записывается в кеш
+    Нужно право просмотра волн этого типа (wave.view_inbound / wave.view_outbound)
     """
     if wave_type == "inbound":
         model = Inbound
@@ -196,6 +201,8 @@ def download_wave_docs(request, pk, wave_type) -> HttpResponse:
     else:
         messages.error(request, "Некорректный тип волны")
         return redirect(request.META.get("HTTP_REFERER", "/"))
+    if not request.user.has_perm(f"wave.view_{wave_type}"):
+        raise PermissionDenied
 
     try:
         wave = model.objects.get(pk=pk)
@@ -203,15 +210,93 @@ def download_wave_docs(request, pk, wave_type) -> HttpResponse:
         messages.error(request, "Волна не найдена")
         return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
 
-    buffer = build_zip_from_folder(folder_path=wave.get_uploads_dir())
+    archive_path, stream = wave_archive(wave)
 
-    if buffer is None:
+    if archive_path is None and stream is None:
         messages.warning(request, "Документы не найдены")
         return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
 
-    response = HttpResponse(buffer.read(), content_type="application/zip")
-    response["Content-Disposition"] = f'attachment; filename="{wave}.zip"'
+    if stream is not None:
+        # первое скачивание: архив отдается потоком и по ходу пишется в кеш
+        response = StreamingHttpResponse(stream, content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="{wave}.zip"'
+        return response
+
+    return send_file(archive_path, filename=f"{wave}.zip", content_type="application/zip")
+
+
+@login_required
+def download_archived_wave_docs(request, pk) -> HttpResponse:
+    """
+    Функция для отдачи документов архивной волны
+    Документы извлекаются из архива пакета потоком
+    Нужно право просмотра волн того же типа (wave.view_inbound / wave.view_outbound)
+    """
+    archived_wave = get_object_or_404(ArchivedWave, pk=pk)
+    if not request.user.has_perm(f"wave.view_{archived_wave.wave_type}"):
+        raise PermissionDenied
+    search_url = f"wave:{archived_wave.wave_type}-search"
+    archive_path = archived_documents_path(archived_wave)
 
+    if archive_path is None or not os.path.exists(archive_path):
+        messages.warning(request, "Документы не найдены")
+        return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
+
+    response = StreamingHttpResponse(
+        iter_zip_members(archive_path, f"{archived_wave.number}/"),
+        content_type="application/zip",
+    )
+    response["Content-Disposition"] = f'attachment; filename="{archived_wave.number}.zip"'
+    return response
+
+
+@login_required
+@permission_required("wave.view_outbound", raise_exception=True)
+def download_packing_list(request, pk) -> HttpResponse:
+    """
+    Функция для отдачи упаковочного листа отгрузки отдельно от архива документов
+    Неизменившийся лист отдается готовым файлом, иначе формируется заново
+    """
+    search_url = "wave:outbound-search"
+    try:
+        outbound = Outbound.objects.get(pk=pk)
+    except Outbound.DoesNotExist:
+        messages.error(request, "Отгрузка не найдена")
+        return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
+
+    try:
+        pdf_path = get_packing_list(outbound)
+    except Exception as e:
+        logger.exception("Ошибка формирования упаковочного листа outbound #%s: %s", pk, e)
+        messages.error(request, "Ошибка формирования упаковочного листа")
+        return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
+
+    return send_file(
+        pdf_path, filename=os.path.basename(pdf_path), content_type="application/pdf"
+    )
+
+
+@login_required
+@permission_required("wave.view_outbound", raise_exception=True)
+def download_pick_list(request, pk) -> HttpResponse:
+    """Функция для отдачи листа подбора отгрузки (строки в порядке обхода склада)"""
+    search_url = "wave:outbound-search"
+    try:
+        outbound = Outbound.objects.get(pk=pk)
+    except Outbound.DoesNotExist:
+        messages.error(request, "Отгрузка не найдена")
+        return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
+
+    try:
+        pdf = get_pick_list(outbound)
+    except Exception as e:
+        logger.exception("Ошибка формирования листа подбора outbound #%s: %s", pk, e)
+        messages.error(request, f"Ошибка формирования листа подбора: {e}")
+        return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
+
+    response = HttpResponse(pdf, content_type="application/pdf")
+    filename = pick_list_filename(outbound.outbound_number)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
 
@@ -234,13 +319,92 @@ def download_wave_form(request, wave_type) -> HttpResponse:
         logger.error("Отсутствует обязательный файл: %s", file_path)
         return redirect(request.META.get("HTTP_REFERER", reverse_lazy(search_url)))
 
-    with open(file_path, "rb") as f:
-        response = HttpResponse(
-            f.read(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    return send_file(
+        file_path,
+        filename=filename,
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+def _upload_json(upload) -> dict:
+    return {
+        "id": str(upload.pk),
+        "name": upload.name,
+        "size": upload.size,
+        "offset": upload.offset,
+        "complete": upload.is_complete,
+    }
+
+
+@require_POST
+@login_required
+def document_upload_start(request) -> JsonResponse:
+    """
+    Начало докачиваемой загрузки документа
+    Принимает имя (name), размер (size) и необязательный sha256 файла
+    Возвращает id сессии, с которым части отправляются в document_upload_chunk
+    """
+    try:
+        size = int(request.POST.get("size", ""))
+    except ValueError:
+        return JsonResponse({"error": "Некорректный размер файла"}, status=400)
+
+    try:
+        upload = start_upload(
+            user=request.user,
+            name=request.POST.get("name", ""),
+            size=size,
+            expected_hash=request.POST.get("sha256", ""),
         )
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
-        return response
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(
+        {**_upload_json(upload), "chunk_size": settings.UPLOAD_MAX_CHUNK}, status=201
+    )
+
+
+@login_required
+def document_upload_detail(request, pk) -> JsonResponse:
+    """Состояние загрузки: с какого смещения продолжать после обрыва"""
+    upload = get_object_or_404(DocumentUpload, pk=pk, user=request.user)
+    return JsonResponse(_upload_json(upload))
+
+
+@require_http_methods(["PUT"])
+@login_required
+def document_upload_chunk(request, pk) -> JsonResponse:
+    """
+    Прием части файла
+    Тело запроса - байты части, заголовки:
+        Upload-Offset   - смещение части в файле
+        Upload-Checksum - sha256 части (необязательно)
+    При несовпадении смещения отвечает 409 с текущим смещением
+    """
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return JsonResponse({"error": "Некорректное смещение"}, status=400)
+
+    try:
+        upload = append_upload_chunk(
+            upload_id=pk,
+            user=request.user,
+            offset=offset,
+            stream=request,
+            length=length,
+            checksum=request.headers.get("Upload-Checksum", ""),
+        )
+    except DocumentUpload.DoesNotExist:
+        return JsonResponse({"error": "Загрузка не найдена"}, status=404)
+    except UploadOffsetError as e:
+        return JsonResponse(_upload_json(e.upload), status=409)
+    except Exception as e:
+        logger.error("Ошибка загрузки части %s: %s", pk, e)
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(_upload_json(upload))
 
 
 class BaseWaveCreateView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
@@ -273,32 +437,30 @@ class BaseWaveCreateView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
         return super().form_invalid(form)
 
     def form_valid(self, form):
+        """
+        Файлы проверяются и записываются во временное хранилище до транзакции,
+        в транзакции создаются только записи, перенос файлов - после фиксации
+        """
+        uploads = []
         try:
+            form_file = self.request.FILES.get(self.form_file_id)
+            if not form_file:
+                raise Exception("Файл Форма не загружен. Позиции не будут добавлены.")
+
+            files = self.request.FILES.getlist("documents")
+            upload_ids = self.request.POST.getlist("upload_ids")
+            if not files and not upload_ids:
+                logger.debug("Creating %s: files not found", self.wave_type)
+            uploads = stage_wave_files([form_file, *files])
+
             with transaction.atomic():
-                wave = create_wave(
+                # файлы, загруженные заранее частями (document_upload_chunk)
+                claimed = claim_uploads(user=self.request.user, ids=upload_ids)
+                wave = create_wave_from_form(
                     wave_type=self.wave_type,
                     user=self.request.user,
                     data=form.cleaned_data,
-                )
-                logger.debug("Created %s", wave)
-                wave_dir = wave.get_uploads_dir()
-
-                files = self.request.FILES.getlist("documents")
-                if not files:
-                    logger.debug("Creating %s: files not found", wave)
-                else:
-                    validate_and_save_wave_files(folder=wave_dir, files=files)
-
-                form_file = self.request.FILES.get(self.form_file_id)
-                if not form_file:
-                    raise Exception(
-                        "Файл Форма не загружен. Позиции не будут добавлены."
-                    )
-                file_path = save_file(folder=wave_dir, file=form_file)
-                status = form.cleaned_data["status"]
-                df = parse_wave_form_file(file_path=file_path, wave_type=self.wave_type)
-                create_items(
-                    df=df, wave=wave, status=wave.status, wave_type=self.wave_type
+                    uploads=[*uploads, *claimed],
                 )
 
             messages.success(
@@ -314,6 +476,9 @@ class BaseWaveCreateView(LoginRequiredMixin, PermissionRequiredMixin, FormView):
             messages.error(self.request, f"{e}")
             return self.form_invalid(form)
 
+        finally:
+            discard_staged(uploads)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
@@ -399,6 +564,42 @@ def outbound_change_status(request, pk):
     return redirect("/")
 
 
+@require_POST
+@login_required
+@user_passes_test(is_operator_or_director_or_admin)
+def wave_bulk_change_status(request, wave_type) -> JsonResponse:
+    """
+    Массовое изменение статуса волн
+    Принимает список id волн (ids) и целевой статус (status)
+    Все переходы выполняются в одной транзакции, возвращает результат по каждой волне
+    """
+    if wave_type == "inbound":
+        service = InboundStatusService
+    elif wave_type == "outbound":
+        service = OutboundStatusService
+    else:
+        return JsonResponse({"error": "Некорректный тип волны"}, status=400)
+
+    status_value = request.POST.get("status")
+    if status_value not in dict(Wave.STATUS_CHOICES):
+        return JsonResponse({"error": f"Некорректный статус: {status_value}"}, status=400)
+
+    try:
+        pks = [int(pk) for pk in request.POST.getlist("ids")]
+    except ValueError:
+        return JsonResponse({"error": "Некорректный список волн"}, status=400)
+    if not pks:
+        return JsonResponse({"error": "Не выбраны волны"}, status=400)
+
+    try:
+        results = service.change_status_bulk(pks=pks, new_status=status_value)
+    except Exception as e:
+        logger.exception("Ошибка при массовой смене статуса %s: %s", wave_type, e)
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"status": status_value, "results": results})
+
+
 @login_required
 def inbound_items(request, pk):
     logger.debug("inbound_items(%s)", pk)